@@ -1,3 +1,23 @@
+from .async_audio_controller import AsyncAudioController
 from .audio_controller import AudioController
+from .player_backend import BackendError, PlayerBackend, UnsupportedError
+from .playerctl_backend import PlayerctlBackend
+from .mpris_backend import MprisBackend
+from .pactl_volume_backend import PactlVolumeBackend
+from .pulse_volume_backend import PulseVolumeBackend
+from .volume_backend import VolumeBackend
+from .wpctl_volume_backend import WpctlVolumeBackend
 
-__all__ = ["AudioController"]
+__all__ = [
+    "AsyncAudioController",
+    "AudioController",
+    "BackendError",
+    "PlayerBackend",
+    "PlayerctlBackend",
+    "MprisBackend",
+    "PactlVolumeBackend",
+    "PulseVolumeBackend",
+    "UnsupportedError",
+    "VolumeBackend",
+    "WpctlVolumeBackend",
+]
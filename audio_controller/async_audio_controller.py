@@ -0,0 +1,234 @@
+from collections.abc import Awaitable, Coroutine
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, TypeVar
+import asyncio
+import logging
+import threading
+import time
+
+from data_classes import PlayerSnapshot, VolumeState
+from .audio_controller import AudioController
+from .capability_cache import capability_cache
+from .player_backend import BackendError, PlayerBackend
+from .volume_backend import VolumeBackend
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncAudioController:
+    """
+    Async variant of the controller's queries. Independent queries are run
+    concurrently on an event loop in a background thread, so a listener
+    waits for the slowest query instead of the sum of all of them. Actions
+    stay on AudioController, as they have to run one after the other.
+    """
+
+    "Seconds a single backend query may take"
+    call_timeout: float = 2.0
+    "Seconds a listener waits for all of its queries together"
+    run_timeout: float = 3.0
+    __loop: asyncio.AbstractEventLoop | None = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get_loop() -> asyncio.AbstractEventLoop:
+        """
+        Returns the event loop the queries run on, starting it on first use
+
+        Returns:
+            asyncio.AbstractEventLoop: The running event loop
+        """
+        with AsyncAudioController.__lock:
+            if AsyncAudioController.__loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="audio-controller-loop", daemon=True
+                ).start()
+                AsyncAudioController.__loop = loop
+
+            return AsyncAudioController.__loop
+
+    @staticmethod
+    def run(coroutine: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """
+        Run a coroutine on the event loop and block until it is done, for
+        callers that are not async themselves like the event listeners
+
+        Parameters:
+            coroutine (Coroutine[Any, Any, T]): The queries to run
+            timeout (float | None): Seconds to wait, run_timeout if not given
+
+        Returns:
+            T: The result of the coroutine
+
+        Raises:
+            BackendError: If the coroutine did not finish in time, it is cancelled
+        """
+        timeout = AsyncAudioController.run_timeout if timeout is None else timeout
+        future = asyncio.run_coroutine_threadsafe(
+            coroutine, AsyncAudioController.get_loop()
+        )
+
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError as e:
+            future.cancel()
+            raise BackendError(f"The player did not answer within {timeout}s") from e
+
+    @staticmethod
+    async def call(awaitable: Awaitable[T], timeout: float | None = None) -> T:
+        """
+        Await a single query, cancelling it once it takes too long
+
+        Parameters:
+            awaitable (Awaitable[T]): The query
+            timeout (float | None): Seconds to wait, call_timeout if not given
+
+        Returns:
+            T: The result of the query
+
+        Raises:
+            BackendError: If the query timed out
+        """
+        timeout = AsyncAudioController.call_timeout if timeout is None else timeout
+
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as e:
+            raise BackendError(f"The player did not answer within {timeout}s") from e
+
+    @staticmethod
+    async def get_backend() -> PlayerBackend:
+        """
+        Returns the player backend, picked in a thread on first use as that
+        imports libraries and connects to the session bus
+
+        Returns:
+            PlayerBackend: The player backend
+        """
+        backend: PlayerBackend | None = AudioController.backend
+
+        if backend is not None:
+            return backend
+
+        return await asyncio.to_thread(AudioController.get_backend)
+
+    @staticmethod
+    async def get_volume_backend() -> VolumeBackend:
+        """
+        Returns the volume backend, picked in a thread on first use as that
+        connects to the sound server
+
+        Returns:
+            VolumeBackend: The volume backend
+        """
+        backend: VolumeBackend | None = AudioController.volume_backend
+
+        if backend is not None:
+            return backend
+
+        return await asyncio.to_thread(AudioController.get_volume_backend)
+
+    @staticmethod
+    async def get_snapshot() -> PlayerSnapshot:
+        """
+        Get the player status and the current media like
+        AudioController.get_snapshot, which runs in a thread unless the
+        snapshot is remembered. The commands it runs time out before the
+        call does, so a hung player does not keep the thread busy.
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        snapshot: PlayerSnapshot | None = AudioController.get_remembered_snapshot()
+
+        if snapshot is not None:
+            return snapshot
+
+        return await AsyncAudioController.call(
+            asyncio.to_thread(AudioController.get_snapshot)
+        )
+
+    @staticmethod
+    async def get_media_players(max_age: float = 0) -> list[str]:
+        """
+        Returns a list of media players that are currently running
+
+        Parameters:
+            max_age (float): Seconds a previously read list may be reused for
+
+        Returns:
+            list[str]: A list of media players
+        """
+        # Without players playerctl exits with an error, it is not asked
+        if AudioController.breaker.is_open:
+            return []
+
+        read_at, players = AudioController.media_players
+
+        if max_age <= 0 or time.monotonic() - read_at > max_age:
+            backend: PlayerBackend = await AsyncAudioController.get_backend()
+            players = await AsyncAudioController.call(backend.get_media_players_async())
+            AudioController.media_players = (time.monotonic(), players)
+            capability_cache.retain(players)
+
+        return list(players)
+
+    @staticmethod
+    async def get_volume(max_age: float = 0) -> VolumeState:
+        """
+        Get the global volume
+
+        Parameters:
+            max_age (float): Seconds a previously read volume may be reused for
+
+        Returns:
+            VolumeState: The volume level and whether it is muted
+        """
+        read_at, volume = AudioController.volume_state
+
+        if volume is None or max_age <= 0 or time.monotonic() - read_at > max_age:
+            backend: VolumeBackend = await AsyncAudioController.get_volume_backend()
+            volume = await AsyncAudioController.call(backend.get_volume_async())
+            AudioController.volume_state = (time.monotonic(), volume)
+
+        return volume
+
+    @staticmethod
+    async def get_state(
+        players_max_age: float = 0, volume_max_age: float = 0
+    ) -> tuple[PlayerSnapshot, list[str], VolumeState | None]:
+        """
+        Read the snapshot, the player list and the volume concurrently
+
+        Parameters:
+            players_max_age (float): Seconds a previously read list may be reused for
+            volume_max_age (float): Seconds a previously read volume may be reused for
+
+        Returns:
+            tuple[PlayerSnapshot, list[str], VolumeState | None]: The snapshot, the
+                running players and the volume. The list is empty if the players
+                could not be listed, and the volume None if it could not be read.
+        """
+        snapshot, players, volume = await asyncio.gather(
+            AsyncAudioController.get_snapshot(),
+            AsyncAudioController.get_media_players(players_max_age),
+            AsyncAudioController.get_volume(volume_max_age),
+            return_exceptions=True,
+        )
+
+        if isinstance(snapshot, BaseException):
+            raise snapshot
+
+        if isinstance(players, BaseException):
+            # playerctl exits with an error when there are no players
+            logger.debug(f"Could not list the players: {players}")
+            players = []
+
+        if isinstance(volume, BaseException):
+            logger.warning(f"Could not read the volume: {volume}")
+            volume = None
+
+        return snapshot, players, volume
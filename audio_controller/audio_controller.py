@@ -1,17 +1,37 @@
-import glob
-import os
+from collections.abc import Callable
+from contextlib import nullcontext
 from pathlib import Path
-import subprocess
 import logging
-import re
+import shutil
+import threading
+import time
+from typing import ContextManager
 
 from data_classes import (
+    Actions,
     CurrentMedia,
-    MediaPlaybackState,
+    PlayerSnapshot,
     PlayerStatus,
-    RepeatState,
-    ShuffleState,
+    VolumeState,
 )
+from instrumentation import recorder
+from .http_fetcher import FetchError, HttpFetcher
+from .mpris_backend import MprisBackend
+from .pactl_volume_backend import PactlVolumeBackend
+from .capability_cache import capability_cache
+from .circuit_breaker import CircuitBreaker
+from .optimistic_state import OptimisticState
+from .player_backend import BackendError, PlayerBackend
+from .playback_history import PlaybackHistory
+from .player_follower import PlayerFollower
+from .pulse_volume_backend import PulseVolumeBackend
+from .status_cache import StatusCache
+from .thumbnail_store import ThumbnailStore
+from .thumbnail_transcoder import ThumbnailTranscoder
+from .thumbnail_worker import ThumbnailWorker
+from .playerctl_backend import PlayerctlBackend
+from .volume_backend import VolumeBackend
+from .wpctl_volume_backend import WpctlVolumeBackend
 
 logger = logging.getLogger(__name__)
 
@@ -19,45 +39,186 @@ logger = logging.getLogger(__name__)
 class AudioController:
     """Controller for audio actions"""
 
-    media_cover_path: Path = Path("/tmp/ulauncher-media-player/media-thumbnails")
+    "The player backend, picked on first use"
+    backend: PlayerBackend | None = None
+    "The volume backend, picked on first use"
+    volume_backend: VolumeBackend | None = None
+    "Keeps the snapshot current in the background, once started"
+    follower: PlayerFollower | None = None
+    "Seconds between reads when waiting for a change without the follower"
+    poll_interval: float = 0.1
+    "Reuses pulled snapshots between keystrokes while the follower is not running"
+    status_cache: StatusCache = StatusCache()
+    "Stops reading the backend while it is missing or has no players"
+    breaker: CircuitBreaker = CircuitBreaker()
+    "Shows what toggles lead to before the player reports it"
+    optimistic_state: OptimisticState = OptimisticState()
+    thumbnail_worker: ThumbnailWorker = ThumbnailWorker()
+    thumbnail_store: ThumbnailStore = ThumbnailStore(ThumbnailStore.default_directory())
+    thumbnail_transcoder: ThumbnailTranscoder = ThumbnailTranscoder()
+    http_fetcher: HttpFetcher = HttpFetcher()
+    "Every track seen playing, for the recent view"
+    playback_history: PlaybackHistory = PlaybackHistory(PlaybackHistory.default_path())
+    "When the player list was last read, and the list"
+    media_players: tuple[float, list[str]] = (0.0, [])
+    "When the volume was last read, and the volume"
+    volume_state: tuple[float, VolumeState | None] = (0.0, None)
+    "The level to restore when unmuting a volume that was set to 0"
+    volume_before_mute: int | None = None
+    default_thumbnail: Path = Path("images/icon.png")
+    "Guards picking the backends, the warm-up may do it while a query does"
+    __lock: threading.Lock = threading.Lock()
 
     @staticmethod
-    def __run_command(command: list[str], check: bool = True) -> str:
+    def get_backend() -> PlayerBackend:
         """
-        Run a command and return the output
+        Returns the player backend, preferring D-Bus over playerctl
+
+        Returns:
+            PlayerBackend: The player backend
         """
-        result = subprocess.run(
-            command,
-            check=check,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
-        logger.debug(result.stdout)
-        return result.stdout
+        with AudioController.__lock:
+            if AudioController.backend is None:
+                AudioController.backend = MprisBackend.create() or PlayerctlBackend()
+                logger.info(f"Using the {AudioController.backend.name} backend")
+
+            return AudioController.backend
+
+    @staticmethod
+    def get_volume_backend() -> VolumeBackend:
+        """
+        Returns the volume backend, preferring the native protocol over
+        pactl, and pactl over wpctl
+
+        Returns:
+            VolumeBackend: The volume backend
+        """
+        with AudioController.__lock:
+            if AudioController.volume_backend is None:
+                backend: VolumeBackend | None = PulseVolumeBackend.create()
+
+                if backend is None:
+                    if shutil.which("pactl") is None and shutil.which("wpctl"):
+                        backend = WpctlVolumeBackend()
+                    else:
+                        backend = PactlVolumeBackend()
+
+                AudioController.volume_backend = backend
+                logger.info(f"Using the {backend.name} volume backend")
+
+            return AudioController.volume_backend
+
+    @staticmethod
+    def start_follower() -> None:
+        """Start following player changes so snapshots can be read from memory"""
+        if AudioController.follower is None:
+            AudioController.follower = PlayerFollower(
+                AudioController.get_backend(), AudioController.on_follower_refresh
+            )
+
+        AudioController.follower.start()
+
+    @staticmethod
+    @recorder.timed("warm-up")
+    def warm_up() -> None:
+        """
+        Do the slow first-time work ahead of the first query: pick the
+        backends, which imports their libraries, start the follower, load
+        the thumbnail index, open the playback history and read the player,
+        the player list and the volume once
+        """
+        AudioController.start_follower()
+        AudioController.thumbnail_store.load()
+        AudioController.playback_history.open()
+
+        if not AudioController.thumbnail_transcoder.available:
+            logger.info("GdkPixbuf is not available, thumbnails are not downscaled")
+
+        AudioController.get_snapshot()
+        AudioController.get_media_players()
+
+        try:
+            AudioController.get_volume()
+        except BackendError as e:
+            logger.warning(f"Could not read the volume: {e}")
 
     @staticmethod
     def playpause() -> None:
         """Toggle play/pause"""
-        AudioController.__run_command(["playerctl", "-p", "playerctld", "play-pause"])
+        AudioController.get_backend().playpause()
+        AudioController.status_cache.invalidate()
 
     @staticmethod
-    def next() -> None:
-        """Skip to the next track"""
-        AudioController.__run_command(["playerctl", "-p", "playerctld", "next"])
+    def next(count: int = 1) -> float:
+        """
+        Skip to the next track
+
+        Parameters:
+            count (int): The number of tracks to skip, sent back to back
+
+        Returns:
+            float: The monotonic time the player had answered every skip
+        """
+        backend: PlayerBackend = AudioController.get_backend()
+
+        with AudioController.__held_follower(count):
+            for _ in range(count):
+                backend.next()
+
+            answered_at: float = time.monotonic()
+
+        AudioController.status_cache.invalidate()
+
+        return answered_at
 
     @staticmethod
-    def prev() -> None:
-        """Skip to the previous track"""
-        AudioController.__run_command(["playerctl", "-p", "playerctld", "previous"])
+    def prev(count: int = 1) -> float:
+        """
+        Skip to the previous track
+
+        Parameters:
+            count (int): The number of tracks to go back, sent back to back
+
+        Returns:
+            float: The monotonic time the player had answered every skip
+        """
+        backend: PlayerBackend = AudioController.get_backend()
+
+        with AudioController.__held_follower(count):
+            for _ in range(count):
+                backend.prev()
+
+            answered_at: float = time.monotonic()
+
+        AudioController.status_cache.invalidate()
+
+        return answered_at
 
     @staticmethod
-    def jump(pos: str) -> None:
-        """Jump to a specific position in the track"""
-        # TODO: Implement this
-        AudioController.__run_command(
-            ["playerctl", "-p", "playerctld", "position", pos]
-        )
+    def __held_follower(count: int) -> ContextManager[None]:
+        """Hold back the follower while more than one action is sent"""
+        follower: PlayerFollower | None = AudioController.follower
+
+        if follower is None or count <= 1:
+            return nullcontext()
+
+        return follower.held()
+
+    @staticmethod
+    def set_position(track_id: str | None, position: int) -> None:
+        """
+        Jump to a position in the current track
+
+        Parameters:
+            track_id (str | None): The track id of the media the position is in
+            position (int): The position in microseconds
+        """
+        AudioController.get_backend().set_position(track_id, position)
+        AudioController.status_cache.invalidate()
+
+        # Not every backend reports seeks, so the follower reads the new position
+        if AudioController.follower is not None:
+            AudioController.follower.refresh()
 
     @staticmethod
     def global_volume(set_vol: int) -> None:
@@ -67,76 +228,228 @@ class AudioController:
         Parameters:
             set_vol (int): The volume to set
         """
-        cleaned_vol: str = str(max(0, min(set_vol, 100)))
-        AudioController.__run_command(
-            ["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{cleaned_vol}%"]
-        )
+        AudioController.get_volume_backend().set_volume(max(0, min(set_vol, 100)))
+        AudioController.volume_state = (0.0, None)
 
     @staticmethod
-    def shuffle() -> None:
-        """Toggle shuffle"""
-        AudioController.__run_command(
-            ["playerctl", "-p", "playerctld", "shuffle", "toggle"]
-        )
+    def change_volume(delta: int) -> VolumeState:
+        """
+        Change the global volume relative to the current level
+
+        Parameters:
+            delta (int): The change, e.g. 5 or -5
+
+        Returns:
+            VolumeState: The volume after the change
+        """
+        volume: VolumeState = AudioController.get_volume_backend().change_volume(delta)
+        AudioController.volume_state = (0.0, None)
+
+        return volume
+
+    @staticmethod
+    def toggle_mute() -> None:
+        """
+        Mute the global volume, or unmute it and restore the previous level
+        if the volume had been set to 0
+        """
+        backend: VolumeBackend = AudioController.get_volume_backend()
+        volume: VolumeState = backend.get_volume()
+
+        if volume.muted or volume.level == 0:
+            backend.set_mute(False)
+
+            if volume.level == 0 and AudioController.volume_before_mute:
+                backend.set_volume(AudioController.volume_before_mute)
+        else:
+            AudioController.volume_before_mute = volume.level
+            backend.set_mute(True)
+
+        AudioController.volume_state = (0.0, None)
+
+    @staticmethod
+    @recorder.timed("volume")
+    def get_volume(max_age: float = 0) -> VolumeState:
+        """
+        Get the global volume
+
+        Parameters:
+            max_age (float): Seconds a previously read volume may be reused for
+
+        Returns:
+            VolumeState: The volume level and whether it is muted
+        """
+        read_at, volume = AudioController.volume_state
+
+        if volume is None or max_age <= 0 or time.monotonic() - read_at > max_age:
+            volume = AudioController.get_volume_backend().get_volume()
+            AudioController.volume_state = (time.monotonic(), volume)
+
+        return volume
+
+    @staticmethod
+    def shuffle(player_status: PlayerStatus) -> None:
+        """
+        Toggle shuffle
+
+        Parameters:
+            player_status (PlayerStatus): The current player status
+        """
+        AudioController.get_backend().shuffle(player_status.shuffle_state)
+        AudioController.status_cache.invalidate()
 
     @staticmethod
     def repeat(player_status: PlayerStatus) -> None:
-        next_state = player_status.repeat_state.next()
-        AudioController.__run_command(
-            ["playerctl", "-p", "playerctld", "loop", next_state.value]
-        )
+        AudioController.get_backend().repeat(player_status.repeat_state.next())
+        AudioController.status_cache.invalidate()
 
     @staticmethod
-    def get_player_status() -> PlayerStatus:
+    def predict(
+        action: Actions,
+        snapshot: PlayerSnapshot,
+        on_correction: Callable[[PlayerSnapshot], None] | None = None,
+    ) -> PlayerSnapshot:
         """
-        Get the playing status of the player
+        Show the state a toggle that was just sent leads to right away, and
+        confirm it against the player in the background
 
         Parameters:
-            player (str): The player to check, defaults to "playerctld"
+            action (Actions): The toggle, e.g. Actions.REPEAT
+            snapshot (PlayerSnapshot): The snapshot before the toggle
+            on_correction (Callable[[PlayerSnapshot], None], optional): Called
+                with the real snapshot if the player did not agree in time
 
         Returns:
-            PlayerStatus: The status of the player
+            PlayerSnapshot: The predicted snapshot, the same one if it cannot be told
         """
-        player_status = AudioController.__run_command(["playerctl", "status"], False)
-        shuffle_status = AudioController.__run_command(
-            ["playerctl", "-p", "playerctld", "shuffle"], False
-        )
-        loop_status = AudioController.__run_command(
-            ["playerctl", "-p", "playerctld", "loop"], False
+        predicted: PlayerSnapshot = AudioController.optimistic_state.apply(
+            action, snapshot
         )
 
-        media_state: MediaPlaybackState = Parser.parse_media_state(player_status)
-        shuffle_state: ShuffleState = Parser.parse_shuffle_state(shuffle_status)
-        loop_state: RepeatState = Parser.parse_loop_state(loop_status)
+        if predicted is not snapshot:
+            threading.Thread(
+                target=AudioController.__confirm,
+                args=(action, predicted, on_correction),
+                name="confirm-toggle",
+                daemon=True,
+            ).start()
 
-        return PlayerStatus(
-            playback_state=media_state,
-            shuffle_state=shuffle_state,
-            repeat_state=loop_state,
-        )
+        return predicted
 
     @staticmethod
-    def get_media_players() -> list[str]:
+    def __confirm(
+        action: Actions,
+        predicted: PlayerSnapshot,
+        on_correction: Callable[[PlayerSnapshot], None] | None,
+    ) -> None:
+        """Wait for the player to agree with a prediction, or roll it back"""
+        optimistic_state: OptimisticState = AudioController.optimistic_state
+
+        try:
+            snapshot: PlayerSnapshot = AudioController.wait_for_change(
+                lambda new: optimistic_state.agrees(action, predicted, new)
+                or not optimistic_state.is_shown(action, predicted),
+                optimistic_state.timeout,
+            )
+        except (OSError, BackendError) as e:
+            logger.error(f"Could not confirm {action.name.lower()}: {e}")
+            optimistic_state.discard(action, predicted)
+            return
+
+        # A read agreed already, or a later toggle is confirmed on its own
+        if not optimistic_state.discard(action, predicted):
+            return
+
+        if optimistic_state.agrees(action, predicted, snapshot):
+            return
+
+        logger.info(f"Rolling back the predicted {action.name.lower()} state")
+
+        if on_correction is not None:
+            on_correction(snapshot)
+
+    @staticmethod
+    def mark_unsupported(player: str, action: Actions) -> None:
+        """
+        Remember that the player could not perform the action, so that it
+        is no longer offered or tried
+
+        Parameters:
+            player (str): The player instance
+            action (Actions): The action that failed
+        """
+        capability_cache.mark_unsupported(player, action)
+        AudioController.status_cache.invalidate()
+
+        # The snapshot in memory still offers the action
+        if AudioController.follower is not None:
+            AudioController.follower.refresh()
+
+    @staticmethod
+    def get_player_status() -> PlayerStatus:
+        """
+        Get the playing status of the player
+
+        Returns:
+            PlayerStatus: The status of the player
+        """
+        return AudioController.get_snapshot().status
+
+    @staticmethod
+    def get_media_players(max_age: float = 0) -> list[str]:
         """
         Returns a list of media players that are currently running
 
+        Parameters:
+            max_age (float): Seconds a previously read list may be reused for
+
         Returns:
             list[str]: A list of media players
         """
-        return AudioController.__run_command(["playerctl", "-l"]).splitlines()
+        if AudioController.breaker.is_open:
+            return []
+
+        read_at, players = AudioController.media_players
+
+        if max_age <= 0 or time.monotonic() - read_at > max_age:
+            players = AudioController.get_backend().get_media_players()
+            AudioController.media_players = (time.monotonic(), players)
+            capability_cache.retain(players)
+
+        return list(players)
 
     @staticmethod
-    def change_player(player: str) -> None:
+    @recorder.timed("player snapshots")
+    def get_player_snapshots() -> dict[str, PlayerSnapshot]:
         """
-        Pauses all players and plays the specified player
+        Get the status and current media of every running player with one
+        batched backend query
+
+        Returns:
+            dict[str, PlayerSnapshot]: The snapshot of each player, by player
+        """
+        if AudioController.breaker.is_open:
+            return {}
+
+        return AudioController.get_backend().get_player_snapshots()
+
+    @staticmethod
+    def change_player(player: str) -> PlayerSnapshot:
+        """
+        Make the player the active one and play it, pausing all others
 
         Parameters:
             player (str): The player
+
+        Returns:
+            PlayerSnapshot: The status and current media of the now active player
         """
-        AudioController.__run_command(["playerctl", "--all-players", "pause"])
-        AudioController.__run_command(["playerctl", "-p", player, "play"])
-        AudioController.__run_command(["playerctl", "-p", player, "pause"])
-        AudioController.__run_command(["playerctl", "-p", player, "play-pause"])
+        snapshot: PlayerSnapshot = AudioController.get_backend().change_player(player)
+        AudioController.breaker.record(snapshot)
+        AudioController.status_cache.update(snapshot)
+        AudioController.media_players = (0.0, [])
+
+        return snapshot
 
     @staticmethod
     def get_current_media() -> CurrentMedia:
@@ -146,162 +459,256 @@ class AudioController:
         Returns:
             CurrentMedia: The current playing media metadata
         """
-        result = AudioController.__run_command(
-            [
-                "playerctl",
-                "metadata",
-                "--format",
-                "artUrl:{{mpris:artUrl}}\nartist:{{xesam:artist}}\ntitle:{{xesam:title}}\nalbum:{{xesam:album}}\nplayerName:{{playerName}}\nposition:{{position}}",
-            ]
-        )
+        media: CurrentMedia | None = AudioController.get_snapshot().media
 
-        artUrl = Parser.extract_regex_item("artUrl", result)
-        artist = Parser.extract_regex_item("artist", result)
-        title = Parser.extract_regex_item("title", result)
-        player = Parser.extract_regex_item("playerName", result).capitalize()
-        album = Parser.extract_regex_item("album", result, ok_if_empty=True)
-        position = Parser.extract_regex_item("position", result, ok_if_empty=True)
-
-        return CurrentMedia(
-            thumbnail_path=artUrl,
-            artist=artist,
-            title=title,
-            player=player,
-            album=album,
-            position=int(position) if position else None,
-        )
+        if media is None:
+            raise ValueError("No media is currently playing")
+
+        return media
 
     @staticmethod
-    def get_media_thumbnail(media: CurrentMedia) -> Path:
+    @recorder.timed("snapshot")
+    def get_snapshot() -> PlayerSnapshot:
         """
-        Get the media thumbnail
+        Get the player status and the current media, from memory if the
+        follower is current, otherwise from the status cache or with a
+        single backend query
 
-        Parameters:
-            media (CurrentMedia): The current media
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        snapshot: PlayerSnapshot | None = AudioController.get_remembered_snapshot()
+
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = AudioController.status_cache.get(AudioController.read_snapshot)
+        AudioController.record_history(snapshot)
+
+        return AudioController.optimistic_state.overlay(snapshot)
+
+    @staticmethod
+    def get_remembered_snapshot() -> PlayerSnapshot | None:
+        """
+        Get the player status and the current media without asking the
+        backend, from memory if the follower is current or from the status
+        cache
 
         Returns:
-            Path: The path to the media thumbnail
+            PlayerSnapshot | None: The snapshot, None if the backend has to be read
         """
-        cover_path: Path = AudioController.media_cover_path
+        follower: PlayerFollower | None = AudioController.follower
 
-        if not cover_path.exists():
-            cover_path.mkdir(parents=True, exist_ok=True)
+        if follower is not None and not follower.is_stale:
+            snapshot: PlayerSnapshot | None = follower.snapshot
 
-        local_filename = Path(
-            cover_path,
-            f"{'-'.join(media.title.split())}-{'-'.join(media.artist.split())}.png",
-        )
+            if snapshot is not None:
+                return AudioController.optimistic_state.overlay(snapshot)
 
-        if local_filename.exists():
-            return local_filename
+        snapshot = AudioController.status_cache.peek()
 
-        old_thumbnails = glob.glob(f"{cover_path}/*.png")
-        if len(old_thumbnails) > 50:
-            old_thumbnails.sort(key=os.path.getctime)
-            for icon in old_thumbnails[:35]:
-                os.remove(icon)
+        if snapshot is None:
+            return None
 
-        if not os.path.exists(local_filename):
-            thumbnail_url: str = media.thumbnail_path
+        AudioController.record_history(snapshot)
 
-            if thumbnail_url.startswith("file://"):
-                local_filename = Path(thumbnail_url[7:])
-            elif thumbnail_url.startswith("http"):
-                AudioController.__download_thumbnail(media, local_filename)
+        return AudioController.optimistic_state.overlay(snapshot)
 
-        return local_filename if local_filename.exists() else Path("images/icon.png")
+    @staticmethod
+    def read_snapshot() -> PlayerSnapshot:
+        """
+        Read the snapshot from the backend, unless the circuit breaker is
+        open and answers for it
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        breaker: CircuitBreaker = AudioController.breaker
+        snapshot: PlayerSnapshot | None = breaker.check()
+
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            return breaker.record(AudioController.get_backend().get_snapshot())
+        except (OSError, BackendError) as e:
+            snapshot = breaker.record_error(e)
+
+            if snapshot is None:
+                raise
+
+            return snapshot
 
     @staticmethod
-    def __download_thumbnail(media: CurrentMedia, local_filename: Path) -> None:
+    def on_follower_refresh(snapshot: PlayerSnapshot) -> None:
         """
-        Download the thumbnail of the media
+        Called with every snapshot the follower reads, a player appearing
+        closes the circuit breaker right away
+        """
+        AudioController.breaker.record(snapshot)
+        AudioController.record_history(snapshot)
+
+    @staticmethod
+    def record_history(snapshot: PlayerSnapshot) -> None:
+        """Add the media of a read snapshot to the playback history"""
+        AudioController.playback_history.record(snapshot.media)
+
+    @staticmethod
+    def wait_for_change(
+        predicate: Callable[[PlayerSnapshot], bool],
+        timeout: float,
+        since: float = 0.0,
+    ) -> PlayerSnapshot:
+        """
+        Wait until the player snapshot satisfies the predicate. Wakes up as soon
+        as the follower reports a change, and only polls without a follower.
 
         Parameters:
-            media (CurrentMedia): The current media
-            local_filename (Path): The local filename to save the thumbnail
+            predicate (Callable[[PlayerSnapshot], bool]): The condition to wait for
+            timeout (float): The maximum time to wait in seconds
+            since (float): The monotonic time the snapshot has to be read after,
+                polled snapshots always are
+
+        Returns:
+            PlayerSnapshot: The latest snapshot, even if the wait timed out
         """
-        try:
-            result = subprocess.run(
-                [
-                    "wget",
-                    "-t",
-                    "1",
-                    "-T",
-                    "0.2",
-                    "-O",
-                    str(local_filename),
-                    media.thumbnail_path,
-                ],
-                check=True,
+        follower: PlayerFollower | None = AudioController.follower
+
+        if follower is not None and not follower.is_stale:
+            snapshot: PlayerSnapshot | None = follower.wait_for(
+                predicate, timeout, since
             )
-            if result.returncode != 0:
-                os.remove(local_filename)
-                logger.error(f"Failed to download image from {media.thumbnail_path}")
-        except subprocess.CalledProcessError as e:
-            if local_filename.exists():
-                os.remove(local_filename)
-            logger.error(f"Failed to download image from {media.thumbnail_path}: {e}")
 
+            if snapshot is not None:
+                return snapshot
+
+        deadline: float = time.monotonic() + timeout
+        snapshot = AudioController.read_snapshot()
+
+        while not predicate(snapshot) and time.monotonic() < deadline:
+            time.sleep(AudioController.poll_interval)
+            snapshot = AudioController.read_snapshot()
+
+        return snapshot
 
-class Parser:
     @staticmethod
-    def parse_media_state(player_status: str) -> MediaPlaybackState:
-        if "No players found" in player_status:
-            return MediaPlaybackState.NO_PLAYER
+    @recorder.timed("thumbnail lookup")
+    def get_cached_thumbnail(media: CurrentMedia) -> Path | None:
+        """
+        Get the media thumbnail if it is available without downloading it.
+        When images can be transcoded, only the icon-sized copy is returned.
 
-        if "Playing" in player_status:
-            return MediaPlaybackState.PLAYING
+        Parameters:
+            media (CurrentMedia): The current media
 
-        if "Paused" in player_status:
-            return MediaPlaybackState.PAUSED
+        Returns:
+            Path | None: The path to the media thumbnail, if available
+        """
+        transcoder: ThumbnailTranscoder = AudioController.thumbnail_transcoder
+
+        if transcoder.available:
+            return AudioController.thumbnail_store.get(
+                media.thumbnail_path, transcoder.variant
+            )
 
-        return MediaPlaybackState.ERROR
+        return AudioController.__get_original_thumbnail(media)
 
     @staticmethod
-    def parse_shuffle_state(shuffle_status: str) -> ShuffleState:
-        if "On" in shuffle_status:
-            return ShuffleState.ON
+    def __get_original_thumbnail(media: CurrentMedia) -> Path | None:
+        """Get the thumbnail as served by the player, if available locally"""
+        thumbnail_url: str = media.thumbnail_path
 
-        if "Off" in shuffle_status:
-            return ShuffleState.OFF
+        if thumbnail_url.startswith("file://"):
+            local_filename = Path(thumbnail_url[7:])
+            return local_filename if local_filename.exists() else None
 
-        return ShuffleState.UNAVAILABLE
+        return AudioController.thumbnail_store.get(thumbnail_url)
 
     @staticmethod
-    def parse_loop_state(loop_status: str) -> RepeatState:
-        if "Track" in loop_status:
-            return RepeatState.TRACK
+    def request_thumbnail(
+        media: CurrentMedia, on_ready: Callable[[Path], None]
+    ) -> None:
+        """
+        Download the media thumbnail in the background
+
+        Parameters:
+            media (CurrentMedia): The current media
+            on_ready (Callable[[Path], None]): Called with the path once downloaded
+        """
+        AudioController.thumbnail_worker.request(
+            media.thumbnail_path,
+            lambda: AudioController.fetch_thumbnail(media),
+            on_ready,
+        )
 
-        if "Playlist" in loop_status:
-            return RepeatState.PLAYLIST
+    @staticmethod
+    def get_media_thumbnail(media: CurrentMedia) -> Path:
+        """
+        Get the media thumbnail, downloading it if needed
 
-        if "None" in loop_status:
-            return RepeatState.OFF
+        Parameters:
+            media (CurrentMedia): The current media
 
-        return RepeatState.UNAVAILABLE
+        Returns:
+            Path: The path to the media thumbnail
+        """
+        thumbnail: Path | None = AudioController.fetch_thumbnail(media)
+        return thumbnail if thumbnail else AudioController.default_thumbnail
 
     @staticmethod
-    def extract_regex_item(
-        item: str, search_str: str, ok_if_empty: bool = False
-    ) -> str:
+    @recorder.timed("thumbnail fetch")
+    def fetch_thumbnail(media: CurrentMedia) -> Path | None:
         """
-        Extract an item from a string using regex, used to extract metadata
+        Get the media thumbnail, blocking while it is downloaded
 
         Parameters:
-            item (str): The item to extract
-            search_str (str): The string to search
-            ok_if_empty (bool): Whether to return an empty string if the item is not found
+            media (CurrentMedia): The current media
 
         Returns:
-            str: The extracted item string
+            Path | None: The path to the media thumbnail, if it could be fetched
         """
+        cached: Path | None = AudioController.get_cached_thumbnail(media)
 
-        match = re.search(rf"{item}:(.+)", search_str)
+        if cached is not None:
+            return cached
 
-        if match is None:
-            if ok_if_empty:
-                return ""
+        original: Path | None = AudioController.__get_original_thumbnail(media)
 
-            raise ValueError(f"Could not find {item} in result")
+        if original is None:
+            if not media.thumbnail_path.startswith("http"):
+                return None
+
+            original = AudioController.thumbnail_store.put(
+                media.thumbnail_path,
+                lambda local_filename: AudioController.__download_thumbnail(
+                    media, local_filename
+                ),
+            )
 
-        return match.group(1)
+        transcoder: ThumbnailTranscoder = AudioController.thumbnail_transcoder
+
+        if original is None or not transcoder.available:
+            return original
+
+        source: Path = original
+        icon: Path | None = AudioController.thumbnail_store.put(
+            media.thumbnail_path,
+            lambda local_filename: transcoder.transcode(source, local_filename),
+            transcoder.variant,
+        )
+
+        return icon if icon else original
+
+    @staticmethod
+    def __download_thumbnail(media: CurrentMedia, local_filename: Path) -> None:
+        """
+        Download the thumbnail of the media
+
+        Parameters:
+            media (CurrentMedia): The current media
+            local_filename (Path): The local filename to save the thumbnail
+        """
+        try:
+            AudioController.http_fetcher.fetch(media.thumbnail_path, local_filename)
+        except FetchError as e:
+            logger.error(f"Failed to download image from {media.thumbnail_path}: {e}")
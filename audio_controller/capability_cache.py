@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+import threading
+
+from data_classes import Actions, PlayerCapabilities
+
+
+class CapabilityCache:
+    """
+    Remembers what every player turned out not to support, by player
+    instance. Players report most of their capabilities with every
+    snapshot, the rest is only found out by failing an action. Combining
+    both into every snapshot lets the menu hide the action and keeps it
+    from being tried again, until the player goes away or moves on to
+    another track, which the action may work for.
+    """
+
+    def __init__(self, max_players: int = 32) -> None:
+        """
+        Parameters:
+            max_players (int): The most players remembered, least recently seen go first
+        """
+        self.max_players: int = max_players
+        # The identity and track last seen, and what failed since, by player
+        self.__learned: OrderedDict[str, tuple[Hashable, PlayerCapabilities]] = (
+            OrderedDict()
+        )
+        self.__lock = threading.Lock()
+
+    def resolve(
+        self, player: str, reported: PlayerCapabilities, context: Hashable
+    ) -> PlayerCapabilities:
+        """
+        Combine what a player reports with what it failed at before, as long
+        as it plays the same track under the same identity
+
+        Parameters:
+            player (str): The player instance
+            reported (PlayerCapabilities): What the player reports to support
+            context (Hashable): The identity and track id of the player
+
+        Returns:
+            PlayerCapabilities: What the player can be asked to do
+        """
+        with self.__lock:
+            entry = self.__learned.get(player)
+
+            if entry is None or entry[0] != context:
+                self.__remember(player, context, PlayerCapabilities())
+                return reported
+
+            self.__learned.move_to_end(player)
+
+        return reported.combine(entry[1])
+
+    def mark_unsupported(self, player: str, action: Actions) -> None:
+        """
+        Remember that a player could not perform an action, until it is
+        seen with another track or identity
+
+        Parameters:
+            player (str): The player instance
+            action (Actions): The action that failed
+        """
+        with self.__lock:
+            context, learned = self.__learned.get(player, (None, PlayerCapabilities()))
+            self.__remember(player, context, learned.without(action))
+
+    def retain(self, players: Iterable[str]) -> None:
+        """
+        Forget the players that are no longer running, a player started
+        again gets another chance
+
+        Parameters:
+            players (Iterable[str]): The running player instances
+        """
+        running: set[str] = set(players)
+
+        with self.__lock:
+            gone: list[str] = [
+                player for player in self.__learned if player not in running
+            ]
+
+            for player in gone:
+                del self.__learned[player]
+
+    def __remember(
+        self, player: str, context: Hashable, learned: PlayerCapabilities
+    ) -> None:
+        """Store what was learned about a player, with the lock held"""
+        self.__learned[player] = (context, learned)
+        self.__learned.move_to_end(player)
+
+        while len(self.__learned) > self.max_players:
+            self.__learned.popitem(last=False)
+
+
+capability_cache: CapabilityCache = CapabilityCache()
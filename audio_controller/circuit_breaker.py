@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+
+from data_classes import (
+    MediaPlaybackState,
+    PlayerSnapshot,
+    PlayerStatus,
+    RepeatState,
+    ShuffleState,
+)
+from instrumentation import recorder
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops asking the player backend while it has nothing to tell. A missing
+    playerctl binary or an empty player list is remembered at once, errors
+    and timeouts once they repeat. While open, reads are answered with the
+    remembered snapshot, and after a delay that doubles with every failure
+    one read is let through to probe the backend. Any snapshot with a player
+    in it, e.g. read by the follower once a player appears, closes it again.
+    """
+
+    "Seconds the breaker stays open after the first failure"
+    BASE_DELAY: float = 1.0
+    "The longest the breaker stays open without a probe"
+    MAX_DELAY: float = 30.0
+    "Errors in a row after which the breaker opens"
+    FAILURE_THRESHOLD: int = 3
+
+    def __init__(
+        self,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        failure_threshold: int = FAILURE_THRESHOLD,
+    ) -> None:
+        """
+        Parameters:
+            base_delay (float): Seconds the breaker stays open after the first failure
+            max_delay (float): The longest the breaker stays open without a probe
+            failure_threshold (int): Errors in a row after which the breaker opens
+        """
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.failure_threshold: int = failure_threshold
+        self.__failures: int = 0
+        # The snapshot reads are answered with while open
+        self.__snapshot: PlayerSnapshot | None = None
+        self.__retry_at: float = 0.0
+        self.__lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the backend is not to be asked until the next probe"""
+        return self.__snapshot is not None and time.monotonic() < self.__retry_at
+
+    def check(self) -> PlayerSnapshot | None:
+        """
+        Returns the snapshot to use instead of reading the backend, or None
+        if the backend may be read. Once the delay is over, only the first
+        caller is let through as the probe.
+
+        Returns:
+            PlayerSnapshot | None: The remembered snapshot while open
+        """
+        with self.__lock:
+            snapshot: PlayerSnapshot | None = self.__snapshot
+
+            if snapshot is None:
+                return None
+
+            now: float = time.monotonic()
+
+            # The others wait for the probe, or for another one should it
+            # never be recorded, e.g. because it was cancelled
+            if now >= self.__retry_at:
+                self.__retry_at = now + self.base_delay
+                return None
+
+        recorder.count("short-circuit")
+        return snapshot
+
+    def record(self, snapshot: PlayerSnapshot) -> PlayerSnapshot:
+        """
+        Record a snapshot read from the backend. No players opens the
+        breaker, errors count towards opening it and anything else closes it.
+
+        Parameters:
+            snapshot (PlayerSnapshot): The snapshot that was read
+
+        Returns:
+            PlayerSnapshot: The snapshot
+        """
+        playback_state: MediaPlaybackState = snapshot.status.playback_state
+
+        if playback_state == MediaPlaybackState.NO_PLAYER:
+            self.__fail(snapshot, "no players", definite=True)
+        elif playback_state == MediaPlaybackState.ERROR:
+            self.__fail(snapshot, "the player could not be read", definite=False)
+        else:
+            self.close()
+
+        return snapshot
+
+    def record_error(self, error: Exception) -> PlayerSnapshot | None:
+        """
+        Record a read that failed. A binary that could not be started opens
+        the breaker at once, other errors once they repeat.
+
+        Parameters:
+            error (Exception): The error the read raised
+
+        Returns:
+            PlayerSnapshot | None: The snapshot to use instead if the breaker
+                is open, None if the error is to be raised
+        """
+        snapshot = PlayerSnapshot(
+            status=PlayerStatus(
+                playback_state=MediaPlaybackState.ERROR,
+                shuffle_state=ShuffleState.UNAVAILABLE,
+                repeat_state=RepeatState.UNAVAILABLE,
+            ),
+            media=None,
+        )
+
+        if self.__fail(snapshot, str(error), definite=isinstance(error, OSError)):
+            return snapshot
+
+        return None
+
+    def close(self) -> None:
+        """Let every read through again, e.g. once a player appeared"""
+        with self.__lock:
+            if self.__snapshot is not None:
+                logger.info("The player backend is back")
+
+            self.__failures = 0
+            self.__snapshot = None
+
+    def __fail(self, snapshot: PlayerSnapshot, reason: str, definite: bool) -> bool:
+        """Count a failure and open the breaker if needed, returns whether it is open"""
+        with self.__lock:
+            self.__failures += 1
+
+            if not definite and self.__failures < self.failure_threshold:
+                return False
+
+            if self.__snapshot is None:
+                logger.info(f"Not asking the player backend for now: {reason}")
+
+            # Errors only start backing off from the read that opened it
+            exponent: int = self.__failures - (
+                1 if definite else self.failure_threshold
+            )
+            delay: float = min(self.base_delay * 2 ** min(exponent, 32), self.max_delay)
+            self.__snapshot = snapshot
+            self.__retry_at = time.monotonic() + delay
+
+            return True
@@ -0,0 +1,152 @@
+import asyncio
+import subprocess
+import logging
+import time
+
+from instrumentation import recorder
+from .player_backend import BackendError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a command may run before it is killed, so that a hung player or
+# D-Bus peer fails the read instead of blocking it. Below the call timeout
+# of the async controller, so a read run in a thread ends before the call
+# gives up on it.
+COMMAND_TIMEOUT: float = 1.5
+
+
+def run_command(
+    command: list[str], check: bool = True, timeout: float | None = None
+) -> str:
+    """
+    Run a command and return the output. The process is killed if it takes
+    too long.
+
+    Parameters:
+        command (list[str]): The command and its arguments
+        check (bool): Whether to raise if the command exits with an error
+        timeout (float | None): Seconds to wait, COMMAND_TIMEOUT if not given
+
+    Returns:
+        str: The combined stdout and stderr of the command
+
+    Raises:
+        BackendError: If the command timed out
+    """
+    timeout = COMMAND_TIMEOUT if timeout is None else timeout
+    recorder.count(f"spawn {command[0]}")
+
+    with recorder.time(f"command {command[0]}"):
+        try:
+            result = subprocess.run(
+                command,
+                check=check,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired as e:
+            recorder.count(f"timeout {command[0]}")
+            raise BackendError(f"{command[0]} did not answer within {timeout}s") from e
+
+    logger.debug(result.stdout)
+    return result.stdout
+
+
+def run_commands(
+    commands: list[list[str]], check: bool = True, timeout: float | None = None
+) -> list[str]:
+    """
+    Run the commands concurrently and return their outputs once all are
+    done. Every process is killed if they take too long together.
+
+    Parameters:
+        commands (list[list[str]]): The commands and their arguments
+        check (bool): Whether to raise if any command exits with an error
+        timeout (float | None): Seconds to wait for all of them,
+            COMMAND_TIMEOUT if not given
+
+    Returns:
+        list[str]: The combined stdout and stderr of each command, in order
+
+    Raises:
+        BackendError: If the commands timed out
+    """
+    timeout = COMMAND_TIMEOUT if timeout is None else timeout
+    deadline: float = time.monotonic() + timeout
+    processes: list[subprocess.Popen[str]] = []
+
+    with recorder.time("concurrent commands"):
+        for command in commands:
+            recorder.count(f"spawn {command[0]}")
+            processes.append(
+                subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
+            )
+
+        try:
+            outputs: list[str] = [
+                process.communicate(timeout=max(0.0, deadline - time.monotonic()))[0]
+                for process in processes
+            ]
+        except subprocess.TimeoutExpired as e:
+            for process in processes:
+                process.kill()
+                process.communicate()
+
+            recorder.count(f"timeout {e.cmd[0]}")
+            raise BackendError(f"{e.cmd[0]} did not answer within {timeout}s") from e
+
+    for command, process, output in zip(commands, processes, outputs):
+        logger.debug(output)
+
+        if check and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, output)
+
+    return outputs
+
+
+async def run_command_async(
+    command: list[str], check: bool = True, timeout: float | None = None
+) -> str:
+    """
+    Run a command without blocking the event loop and return the output.
+    The process is killed if the call times out or is cancelled.
+
+    Parameters:
+        command (list[str]): The command and its arguments
+        check (bool): Whether to raise if the command exits with an error
+        timeout (float | None): Seconds to wait for the command, None waits forever
+
+    Returns:
+        str: The combined stdout and stderr of the command
+    """
+    recorder.count(f"spawn {command[0]}")
+
+    with recorder.time(f"command {command[0]}"):
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await asyncio.shield(process.wait())
+            raise
+
+    output: str = stdout.decode(errors="replace")
+    logger.debug(output)
+
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command, output)
+
+    return output
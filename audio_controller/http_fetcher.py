@@ -0,0 +1,204 @@
+from http.client import HTTPConnection, HTTPException, HTTPResponse, HTTPSConnection
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+import logging
+import ssl
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class FetchError(Exception):
+    """Raised when an image could not be downloaded"""
+
+
+class HttpFetcher:
+    """
+    Downloads images in-process. Connections are kept alive and pooled per
+    host, since streaming services serve all their art from a few CDN hosts.
+    """
+
+    REDIRECT_CODES: tuple[int, ...] = (301, 302, 303, 307, 308)
+    CHUNK_SIZE: int = 64 * 1024
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_redirects: int = 3,
+        max_idle_per_host: int = 2,
+    ) -> None:
+        """
+        Parameters:
+            timeout (float): Seconds to wait for connecting and for each read
+            max_bytes (int): The largest image that will be downloaded
+            max_redirects (int): The number of redirects that will be followed
+            max_idle_per_host (int): Idle connections kept open per host
+        """
+        self.timeout: float = timeout
+        self.max_bytes: int = max_bytes
+        self.max_redirects: int = max_redirects
+        self.max_idle_per_host: int = max_idle_per_host
+        self.__pool: dict[tuple[str, str, int | None], list[HTTPConnection]] = {}
+        self.__lock = threading.Lock()
+        self.__ssl_context: ssl.SSLContext | None = None
+
+    def fetch(self, url: str, destination: Path) -> None:
+        """
+        Download an image, streaming it to disk
+
+        Parameters:
+            url (str): The image URL
+            destination (Path): Where to write the image
+
+        Raises:
+            FetchError: If the image could not be downloaded, nothing is left
+                at the destination in that case
+        """
+        try:
+            for _ in range(self.max_redirects + 1):
+                location: str | None = self.__fetch_once(url, destination)
+
+                if location is None:
+                    return
+
+                url = urljoin(url, location)
+
+            raise FetchError(f"Too many redirects for {url}")
+        except (OSError, HTTPException, ValueError) as e:
+            destination.unlink(missing_ok=True)
+            raise FetchError(f"Could not download {url}: {e}") from e
+        except FetchError:
+            destination.unlink(missing_ok=True)
+            raise
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self.__lock:
+            connections = [c for pool in self.__pool.values() for c in pool]
+            self.__pool.clear()
+
+        for connection in connections:
+            connection.close()
+
+    def __fetch_once(self, url: str, destination: Path) -> str | None:
+        """Request the URL once, returns the redirect location if there is one"""
+        parts = urlsplit(url)
+
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise FetchError(f"Unsupported URL {url}")
+
+        key = (parts.scheme, parts.hostname, parts.port)
+        path: str = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        connection, reused = self.__acquire(key)
+
+        try:
+            response = self.__request(connection, path)
+        except (OSError, HTTPException):
+            connection.close()
+
+            # Idle connections may have been closed by the server meanwhile
+            if not reused:
+                raise
+
+            connection, _ = self.__acquire(key, fresh=True)
+            response = self.__request(connection, path)
+
+        try:
+            location = self.__handle_response(response, url, destination)
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.__release(key, connection)
+
+        return location
+
+    def __request(self, connection: HTTPConnection, path: str) -> HTTPResponse:
+        connection.request(
+            "GET",
+            path,
+            headers={
+                "Accept": "image/*",
+                "User-Agent": "ulauncher-media-controller",
+            },
+        )
+        return connection.getresponse()
+
+    def __handle_response(
+        self, response: HTTPResponse, url: str, destination: Path
+    ) -> str | None:
+        if response.status in self.REDIRECT_CODES:
+            response.read()
+            location = response.getheader("Location")
+
+            if not location:
+                raise FetchError(f"Redirect without a location from {url}")
+
+            return location
+
+        if response.status != 200:
+            raise FetchError(f"{url} answered {response.status} {response.reason}")
+
+        content_type: str = response.getheader("Content-Type", "")
+        if not content_type.startswith("image/"):
+            raise FetchError(f"{url} is not an image but {content_type or 'unknown'}")
+
+        content_length = response.getheader("Content-Length")
+        if content_length and int(content_length) > self.max_bytes:
+            raise FetchError(f"{url} is larger than {self.max_bytes} bytes")
+
+        received: int = 0
+        with open(destination, "wb") as file:
+            while chunk := response.read(self.CHUNK_SIZE):
+                received += len(chunk)
+
+                if received > self.max_bytes:
+                    raise FetchError(f"{url} is larger than {self.max_bytes} bytes")
+
+                file.write(chunk)
+
+        return None
+
+    def __acquire(
+        self, key: tuple[str, str, int | None], fresh: bool = False
+    ) -> tuple[HTTPConnection, bool]:
+        """Returns an idle connection to the host, or a new one"""
+        if not fresh:
+            with self.__lock:
+                idle = self.__pool.get(key)
+                if idle:
+                    return idle.pop(), True
+
+        scheme, host, port = key
+
+        if scheme == "https":
+            if self.__ssl_context is None:
+                self.__ssl_context = ssl.create_default_context()
+
+            return (
+                HTTPSConnection(
+                    host, port, timeout=self.timeout, context=self.__ssl_context
+                ),
+                False,
+            )
+
+        return HTTPConnection(host, port, timeout=self.timeout), False
+
+    def __release(
+        self, key: tuple[str, str, int | None], connection: HTTPConnection
+    ) -> None:
+        with self.__lock:
+            idle = self.__pool.setdefault(key, [])
+
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+
+        connection.close()
@@ -0,0 +1,604 @@
+from collections.abc import Callable
+from functools import cache
+import logging
+import threading
+import time
+from typing import Any
+
+from data_classes import (
+    CurrentMedia,
+    MediaPlaybackState,
+    PlayerCapabilities,
+    PlayerSnapshot,
+    PlayerStatus,
+    RepeatState,
+    ShuffleState,
+)
+from instrumentation import recorder
+from .capability_cache import capability_cache
+from .parser import Parser
+from .player_backend import BackendError, PlayerBackend, UnsupportedError
+
+logger = logging.getLogger(__name__)
+
+# PyGObject takes a while to load, it is imported once the backend is created
+Gio: Any = None
+GLib: Any = None
+
+MPRIS_PREFIX: str = "org.mpris.MediaPlayer2."
+MPRIS_PATH: str = "/org/mpris/MediaPlayer2"
+PLAYER_INTERFACE: str = "org.mpris.MediaPlayer2.Player"
+PROPERTIES_INTERFACE: str = "org.freedesktop.DBus.Properties"
+PLAYERCTLD_NAME: str = f"{MPRIS_PREFIX}playerctld"
+PLAYERCTLD_INTERFACE: str = "com.github.altdesktop.playerctld"
+# The errors of players refusing a call or property they do not support
+UNSUPPORTED_ERRORS: tuple[str, ...] = (
+    "org.freedesktop.DBus.Error.NotSupported",
+    "org.freedesktop.DBus.Error.UnknownMethod",
+    "org.freedesktop.DBus.Error.UnknownProperty",
+    "org.freedesktop.DBus.Error.PropertyReadOnly",
+)
+
+
+@cache
+def import_gio() -> bool:
+    """
+    Import Gio and GLib on first use
+
+    Returns:
+        bool: Whether PyGObject is available
+    """
+    global Gio, GLib
+
+    try:
+        from gi.repository import Gio, GLib
+    except ImportError:
+        return False
+
+    return True
+
+
+class MprisBackend(PlayerBackend):
+    """
+    Backend that talks to the players over D-Bus, reusing one connection
+    and reading all player properties with a single GetAll call
+    """
+
+    name: str = "mpris"
+    "Timeout for a single D-Bus call in milliseconds"
+    timeout_ms: int = 500
+    "Milliseconds between checks of the stop event while following"
+    poll_interval_ms: int = 250
+
+    def __init__(self, connection: "Gio.DBusConnection") -> None:
+        self.__connection = connection
+
+    @staticmethod
+    def create(address: str | None = None) -> "MprisBackend | None":
+        """
+        Connect to the session bus, or to the bus at the given address
+
+        Parameters:
+            address (str, optional): A D-Bus address, e.g. of a private dbus-daemon
+
+        Returns:
+            MprisBackend | None: The backend, or None if D-Bus is unavailable
+        """
+        if not import_gio():
+            logger.info("PyGObject is not available, cannot use the MPRIS backend")
+            return None
+
+        try:
+            if address is None:
+                connection = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            else:
+                connection = Gio.DBusConnection.new_for_address_sync(
+                    address,
+                    Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+                    | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                    None,
+                    None,
+                )
+        except GLib.Error as e:
+            logger.warning(f"Could not connect to the session bus: {e.message}")
+            return None
+
+        return MprisBackend(connection)
+
+    @property
+    def connection(self) -> "Gio.DBusConnection":
+        return self.__connection
+
+    def call(
+        self,
+        bus_name: str,
+        object_path: str,
+        interface: str,
+        method: str,
+        parameters: "GLib.Variant | None" = None,
+        reply_type: str | None = None,
+    ) -> tuple[Any, ...]:
+        """
+        Call a D-Bus method and return the unpacked reply
+
+        Raises:
+            UnsupportedError: If the player does not support the call
+            BackendError: If the call failed otherwise or timed out
+        """
+        try:
+            result = self.__connection.call_sync(
+                bus_name,
+                object_path,
+                interface,
+                method,
+                parameters,
+                GLib.VariantType(reply_type) if reply_type else None,
+                Gio.DBusCallFlags.NONE,
+                self.timeout_ms,
+                None,
+            )
+        except GLib.Error as e:
+            message: str = f"{method} failed on {bus_name}: {e.message}"
+
+            if Gio.DBusError.get_remote_error(e) in UNSUPPORTED_ERRORS:
+                raise UnsupportedError(message) from e
+
+            raise BackendError(message) from e
+
+        return result.unpack() if result is not None else ()
+
+    def list_bus_names(self) -> list[str]:
+        """
+        Returns the bus names of all MPRIS players, including playerctld
+
+        Returns:
+            list[str]: The bus names
+        """
+        (names,) = self.call(
+            "org.freedesktop.DBus",
+            "/org/freedesktop/DBus",
+            "org.freedesktop.DBus",
+            "ListNames",
+            reply_type="(as)",
+        )
+        return [name for name in names if name.startswith(MPRIS_PREFIX)]
+
+    def get_active_player(self) -> str | None:
+        """
+        Returns the bus name of the active player, which is the most recently
+        active player according to playerctld, or the first player otherwise
+
+        Returns:
+            str | None: The bus name, or None if there are no players
+        """
+        names = self.list_bus_names()
+
+        if PLAYERCTLD_NAME in names:
+            try:
+                (player_names,) = self.call(
+                    PLAYERCTLD_NAME,
+                    MPRIS_PATH,
+                    PROPERTIES_INTERFACE,
+                    "Get",
+                    GLib.Variant("(ss)", (PLAYERCTLD_INTERFACE, "PlayerNames")),
+                    "(v)",
+                )
+                if player_names:
+                    return player_names[0]
+            except BackendError as e:
+                logger.debug(e)
+
+        players = [name for name in names if name != PLAYERCTLD_NAME]
+        return players[0] if players else None
+
+    def get_properties(self, bus_name: str) -> dict[str, Any]:
+        """
+        Read every property of the player interface with a single call
+
+        Parameters:
+            bus_name (str): The bus name of the player
+
+        Returns:
+            dict[str, Any]: The unpacked properties
+        """
+        (properties,) = self.call(
+            bus_name,
+            MPRIS_PATH,
+            PROPERTIES_INTERFACE,
+            "GetAll",
+            GLib.Variant("(s)", (PLAYER_INTERFACE,)),
+            "(a{sv})",
+        )
+        return properties
+
+    def call_concurrently(
+        self, calls: list[tuple[str, str, str, "GLib.Variant | None", str | None]]
+    ) -> list[tuple[Any, ...] | BackendError]:
+        """
+        Call several methods on the player objects, sending every call before
+        waiting for the first reply
+
+        Parameters:
+            calls (list[tuple]): The bus name, interface, method, parameters
+                and reply type of each call
+
+        Returns:
+            list[tuple[Any, ...] | BackendError]: The unpacked reply or the error of each call
+        """
+        # Replies are dispatched to the thread default context while calling
+        context = GLib.MainContext.new()
+        context.push_thread_default()
+        replies: dict[int, tuple[Any, ...] | BackendError] = {}
+
+        def on_reply(
+            connection: "Gio.DBusConnection", result: "Gio.AsyncResult", index: int
+        ) -> None:
+            bus_name, _, method, _, _ = calls[index]
+
+            try:
+                reply = connection.call_finish(result)
+                replies[index] = reply.unpack() if reply is not None else ()
+            except GLib.Error as e:
+                replies[index] = BackendError(
+                    f"{method} failed on {bus_name}: {e.message}"
+                )
+
+        try:
+            for index, (
+                bus_name,
+                interface,
+                method,
+                parameters,
+                reply_type,
+            ) in enumerate(calls):
+                self.__connection.call(
+                    bus_name,
+                    MPRIS_PATH,
+                    interface,
+                    method,
+                    parameters,
+                    GLib.VariantType(reply_type) if reply_type else None,
+                    Gio.DBusCallFlags.NONE,
+                    self.timeout_ms,
+                    None,
+                    on_reply,
+                    index,
+                )
+
+            # Every call times out eventually, so this always ends
+            while len(replies) < len(calls):
+                context.iteration(True)
+        finally:
+            context.pop_thread_default()
+
+        return [replies[index] for index in range(len(calls))]
+
+    def get_all_properties(self, bus_names: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Read the player properties of several players with concurrent GetAll calls
+
+        Parameters:
+            bus_names (list[str]): The bus names of the players
+
+        Returns:
+            dict[str, dict[str, Any]]: The unpacked properties of each player that replied
+        """
+        replies = self.call_concurrently(
+            [
+                (
+                    bus_name,
+                    PROPERTIES_INTERFACE,
+                    "GetAll",
+                    GLib.Variant("(s)", (PLAYER_INTERFACE,)),
+                    "(a{sv})",
+                )
+                for bus_name in bus_names
+            ]
+        )
+        properties: dict[str, dict[str, Any]] = {}
+
+        for bus_name, reply in zip(bus_names, replies):
+            if isinstance(reply, BackendError):
+                logger.debug(reply)
+            else:
+                (properties[bus_name],) = reply
+
+        return properties
+
+    def set_property(self, name: str, value: "GLib.Variant") -> None:
+        self.call(
+            self.__require_player(),
+            MPRIS_PATH,
+            PROPERTIES_INTERFACE,
+            "Set",
+            GLib.Variant("(ssv)", (PLAYER_INTERFACE, name, value)),
+        )
+
+    def player_call(
+        self,
+        method: str,
+        parameters: "GLib.Variant | None" = None,
+        bus_name: str | None = None,
+    ) -> None:
+        """Call a method of the player interface, on the active player by default"""
+        self.call(
+            bus_name if bus_name else self.__require_player(),
+            MPRIS_PATH,
+            PLAYER_INTERFACE,
+            method,
+            parameters,
+        )
+
+    def __require_player(self) -> str:
+        player = self.get_active_player()
+
+        if player is None:
+            raise BackendError("No players found")
+
+        return player
+
+    @staticmethod
+    @recorder.timed("parse")
+    def parse_properties(bus_name: str, properties: dict[str, Any]) -> PlayerSnapshot:
+        """
+        Build a snapshot from the properties of the player interface
+
+        Parameters:
+            bus_name (str): The bus name of the player
+            properties (dict[str, Any]): The unpacked GetAll reply
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        player: str = bus_name.removeprefix(MPRIS_PREFIX)
+        shuffle = properties.get("Shuffle")
+        metadata: dict[str, Any] = properties.get("Metadata", {})
+        track_id = metadata.get("mpris:trackid")
+        reported = PlayerCapabilities(
+            can_go_next=bool(properties.get("CanGoNext", True)),
+            can_go_previous=bool(properties.get("CanGoPrevious", True)),
+            can_seek=bool(properties.get("CanSeek", True)),
+            can_shuffle=shuffle is not None,
+            can_repeat="LoopStatus" in properties,
+        )
+        player_status = PlayerStatus(
+            playback_state=Parser.parse_media_state(
+                properties.get("PlaybackStatus", "")
+            ),
+            shuffle_state=Parser.parse_shuffle_state(
+                "" if shuffle is None else str(shuffle).lower()
+            ),
+            repeat_state=Parser.parse_loop_state(properties.get("LoopStatus", "")),
+            capabilities=capability_cache.resolve(
+                player, reported, (MprisBackend.player_name(bus_name), str(track_id))
+            ),
+        )
+
+        if player_status.playback_state not in [
+            MediaPlaybackState.PLAYING,
+            MediaPlaybackState.PAUSED,
+        ]:
+            return PlayerSnapshot(status=player_status, media=None, player=player)
+
+        artist = metadata.get("xesam:artist", [])
+        names = artist if isinstance(artist, list) else [artist]
+        artists = tuple(str(name) for name in names if name)
+        position = properties.get("Position")
+        length = metadata.get("mpris:length")
+        rate = properties.get("Rate")
+
+        media = CurrentMedia(
+            thumbnail_path=str(metadata.get("mpris:artUrl", "")),
+            artist=", ".join(artists),
+            title=str(metadata.get("xesam:title", "")),
+            player=MprisBackend.player_name(bus_name).capitalize(),
+            album=str(metadata.get("xesam:album", "")),
+            position=int(position) if isinstance(position, int) else None,
+            artists=artists,
+            length=int(length) if isinstance(length, int) else None,
+            trackid=str(track_id) if track_id else None,
+            rate=float(rate) if isinstance(rate, (int, float)) else 1.0,
+        )
+
+        return PlayerSnapshot(
+            status=player_status,
+            media=media,
+            player=player,
+            sampled_at=time.monotonic(),
+        )
+
+    @staticmethod
+    def player_name(bus_name: str) -> str:
+        """Returns the player name without the MPRIS prefix and instance suffix"""
+        return bus_name.removeprefix(MPRIS_PREFIX).split(".")[0]
+
+    def playpause(self) -> None:
+        self.player_call("PlayPause")
+
+    def next(self) -> None:
+        self.player_call("Next")
+
+    def prev(self) -> None:
+        self.player_call("Previous")
+
+    def set_position(self, track_id: str | None, position: int) -> None:
+        if not track_id:
+            raise BackendError("The current track has no track id")
+
+        self.player_call("SetPosition", GLib.Variant("(ox)", (track_id, position)))
+
+    def shuffle(self, shuffle_state: ShuffleState) -> None:
+        if shuffle_state == ShuffleState.UNAVAILABLE:
+            raise UnsupportedError("The player does not support shuffle")
+
+        self.set_property(
+            "Shuffle", GLib.Variant("b", shuffle_state != ShuffleState.ON)
+        )
+
+    def repeat(self, repeat_state: RepeatState) -> None:
+        if repeat_state == RepeatState.UNAVAILABLE:
+            raise UnsupportedError("The player does not support repeating")
+
+        self.set_property("LoopStatus", GLib.Variant("s", repeat_state.value))
+
+    def get_snapshot(self) -> PlayerSnapshot:
+        player = self.get_active_player()
+
+        if player is None:
+            return PlayerSnapshot(
+                status=PlayerStatus(
+                    playback_state=MediaPlaybackState.NO_PLAYER,
+                    shuffle_state=ShuffleState.UNAVAILABLE,
+                    repeat_state=RepeatState.UNAVAILABLE,
+                ),
+                media=None,
+            )
+
+        try:
+            properties = self.get_properties(player)
+        except BackendError as e:
+            logger.error(e)
+            return PlayerSnapshot(
+                status=PlayerStatus(
+                    playback_state=MediaPlaybackState.ERROR,
+                    shuffle_state=ShuffleState.UNAVAILABLE,
+                    repeat_state=RepeatState.UNAVAILABLE,
+                ),
+                media=None,
+            )
+
+        return MprisBackend.parse_properties(player, properties)
+
+    def get_player_snapshots(self) -> dict[str, PlayerSnapshot]:
+        bus_names = [name for name in self.list_bus_names() if name != PLAYERCTLD_NAME]
+        replies = self.get_all_properties(bus_names)
+
+        return {
+            bus_name.removeprefix(MPRIS_PREFIX): MprisBackend.parse_properties(
+                bus_name, replies[bus_name]
+            )
+            for bus_name in bus_names
+            if bus_name in replies
+        }
+
+    def get_media_players(self) -> list[str]:
+        return [
+            name.removeprefix(MPRIS_PREFIX)
+            for name in self.list_bus_names()
+            if name != PLAYERCTLD_NAME
+        ]
+
+    def change_player(self, player: str) -> PlayerSnapshot:
+        target = f"{MPRIS_PREFIX}{player}"
+        names = self.list_bus_names()
+
+        # Pause the others while the target starts, so it never stops
+        replies = self.call_concurrently(
+            [
+                (bus_name, PLAYER_INTERFACE, "Pause", None, None)
+                for bus_name in names
+                if bus_name not in (PLAYERCTLD_NAME, target)
+            ]
+            + [(target, PLAYER_INTERFACE, "Play", None, None)]
+        )
+
+        if isinstance(replies[-1], BackendError):
+            raise replies[-1]
+
+        # playerctld promotes a player once it starts playing, so one
+        # that already was has to be restarted
+        if PLAYERCTLD_NAME in names and not self.wait_for_promotion(target):
+            try:
+                self.player_call("Pause", bus_name=target)
+                self.player_call("Play", bus_name=target)
+            except BackendError as e:
+                logger.warning(f"Could not restart {player}: {e}")
+
+        return MprisBackend.parse_properties(target, self.get_properties(target))
+
+    def wait_for_promotion(self, target: str) -> bool:
+        """
+        Wait until playerctld has promoted the player, which it does shortly
+        after the player reports that it started
+
+        Parameters:
+            target (str): The bus name of the player
+
+        Returns:
+            bool: Whether the player is the active one
+        """
+        deadline: float = time.monotonic() + self.promotion_timeout
+
+        while self.get_active_player() != target:
+            if time.monotonic() >= deadline:
+                return False
+
+            time.sleep(self.promotion_interval)
+
+        return True
+
+    def follow(self, on_change: Callable[[], None], stop: threading.Event) -> None:
+        # Signals are dispatched to the main context that is the thread
+        # default while subscribing, so the follower gets its own loop
+        context = GLib.MainContext.new()
+        context.push_thread_default()
+        loop = GLib.MainLoop.new(context, False)
+
+        def properties_changed(*_: Any) -> None:
+            on_change()
+
+        def name_owner_changed(*args: Any) -> None:
+            name, _, _ = args[5].unpack()
+            if name.startswith(MPRIS_PREFIX):
+                loop.quit()
+
+        def check_stop(*_: Any) -> bool:
+            if stop.is_set() or self.__connection.is_closed():
+                loop.quit()
+                return False
+            return True
+
+        subscriptions = [
+            self.__connection.signal_subscribe(
+                None,
+                PROPERTIES_INTERFACE,
+                "PropertiesChanged",
+                MPRIS_PATH,
+                None,
+                Gio.DBusSignalFlags.NONE,
+                properties_changed,
+            ),
+            self.__connection.signal_subscribe(
+                None,
+                PLAYER_INTERFACE,
+                "Seeked",
+                MPRIS_PATH,
+                None,
+                Gio.DBusSignalFlags.NONE,
+                properties_changed,
+            ),
+            self.__connection.signal_subscribe(
+                "org.freedesktop.DBus",
+                "org.freedesktop.DBus",
+                "NameOwnerChanged",
+                "/org/freedesktop/DBus",
+                None,
+                Gio.DBusSignalFlags.NONE,
+                name_owner_changed,
+            ),
+        ]
+
+        timeout = GLib.timeout_source_new(self.poll_interval_ms)
+        timeout.set_callback(check_stop)
+        timeout.attach(context)
+
+        try:
+            loop.run()
+
+            if self.__connection.is_closed():
+                raise BackendError("The session bus connection was closed")
+        finally:
+            timeout.destroy()
+            for subscription in subscriptions:
+                self.__connection.signal_unsubscribe(subscription)
+            context.pop_thread_default()
@@ -0,0 +1,173 @@
+from dataclasses import replace
+from typing import Any
+import threading
+import time
+
+from data_classes import Actions, MediaPlaybackState, PlayerSnapshot, PlayerStatus
+
+
+class OptimisticState:
+    """
+    Holds the state a toggle is expected to lead to, so it can be shown
+    before the player reports it. Every snapshot read shows the predicted
+    state on top of the real one, until the player agrees, the prediction
+    times out or another player becomes the active one.
+    """
+
+    "The status field each toggle changes"
+    FIELDS: dict[Actions, str] = {
+        Actions.PLAYPAUSE: "playback_state",
+        Actions.SHUFFLE: "shuffle_state",
+        Actions.REPEAT: "repeat_state",
+    }
+    "Seconds a prediction is shown without the player agreeing"
+    TIMEOUT: float = 3.0
+
+    def __init__(self, timeout: float = TIMEOUT) -> None:
+        """
+        Parameters:
+            timeout (float): Seconds a prediction is shown without the player agreeing
+        """
+        self.timeout: float = timeout
+        # The player, the predicted value and until when it is shown, by toggle
+        self.__predictions: dict[Actions, tuple[str, Any, float]] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def predict(action: Actions, status: PlayerStatus) -> PlayerStatus | None:
+        """
+        Work out the status a toggle leads to
+
+        Parameters:
+            action (Actions): The toggle
+            status (PlayerStatus): The status before the toggle
+
+        Returns:
+            PlayerStatus | None: The expected status, None if it cannot be told
+        """
+        if action == Actions.PLAYPAUSE:
+            predicted = replace(status, playback_state=status.playback_state.toggled())
+        elif action == Actions.SHUFFLE:
+            predicted = replace(status, shuffle_state=status.shuffle_state.toggled())
+        elif action == Actions.REPEAT:
+            predicted = replace(status, repeat_state=status.repeat_state.next())
+        else:
+            return None
+
+        return predicted if predicted != status else None
+
+    @staticmethod
+    def agrees(
+        action: Actions, predicted: PlayerSnapshot, snapshot: PlayerSnapshot
+    ) -> bool:
+        """Whether the player reports the state the toggle was predicted to lead to"""
+        name: str = OptimisticState.FIELDS[action]
+        return getattr(snapshot.status, name) == getattr(predicted.status, name)
+
+    def apply(self, action: Actions, snapshot: PlayerSnapshot) -> PlayerSnapshot:
+        """
+        Predict the state after a toggle that was just sent, and show it on
+        every read until the player agrees
+
+        Parameters:
+            action (Actions): The toggle
+            snapshot (PlayerSnapshot): The snapshot before the toggle
+
+        Returns:
+            PlayerSnapshot: The predicted snapshot, the same one if it cannot be told
+        """
+        status: PlayerStatus | None = OptimisticState.predict(action, snapshot.status)
+
+        if status is None:
+            return snapshot
+
+        value: Any = getattr(status, OptimisticState.FIELDS[action])
+
+        with self.__lock:
+            self.__predictions[action] = (
+                snapshot.player,
+                value,
+                time.monotonic() + self.timeout,
+            )
+
+        return replace(snapshot, status=status)
+
+    def is_shown(self, action: Actions, predicted: PlayerSnapshot) -> bool:
+        """
+        Whether a prediction is still shown, it is no longer once a read
+        agreed with it, it timed out or a later toggle replaced it
+
+        Parameters:
+            action (Actions): The toggle
+            predicted (PlayerSnapshot): The snapshot apply returned for it
+
+        Returns:
+            bool: Whether the prediction is still shown
+        """
+        value: Any = getattr(predicted.status, OptimisticState.FIELDS[action])
+        prediction = self.__predictions.get(action)
+
+        return prediction is not None and prediction[:2] == (predicted.player, value)
+
+    def discard(self, action: Actions, predicted: PlayerSnapshot) -> bool:
+        """
+        Stop showing a prediction, unless a later toggle replaced it
+
+        Parameters:
+            action (Actions): The toggle
+            predicted (PlayerSnapshot): The snapshot apply returned for it
+
+        Returns:
+            bool: Whether the prediction was still shown
+        """
+        with self.__lock:
+            if not self.is_shown(action, predicted):
+                return False
+
+            del self.__predictions[action]
+            return True
+
+    def clear(self) -> None:
+        """Stop showing every prediction"""
+        with self.__lock:
+            self.__predictions.clear()
+
+    def overlay(self, snapshot: PlayerSnapshot) -> PlayerSnapshot:
+        """
+        Show the pending predictions on top of a snapshot read from the
+        player, dropping the ones it agrees with or that are too old
+
+        Parameters:
+            snapshot (PlayerSnapshot): The snapshot read from the player
+
+        Returns:
+            PlayerSnapshot: The snapshot as it is expected to be
+        """
+        if not self.__predictions:
+            return snapshot
+
+        changes: dict[str, Any] = {}
+        now: float = time.monotonic()
+        has_player: bool = snapshot.status.playback_state in (
+            MediaPlaybackState.PLAYING,
+            MediaPlaybackState.PAUSED,
+        )
+
+        with self.__lock:
+            for action, (player, value, until) in list(self.__predictions.items()):
+                name: str = OptimisticState.FIELDS[action]
+
+                if (
+                    not has_player
+                    or player != snapshot.player
+                    or now >= until
+                    or getattr(snapshot.status, name) == value
+                ):
+                    del self.__predictions[action]
+                else:
+                    changes[name] = value
+
+        if not changes:
+            return snapshot
+
+        return replace(snapshot, status=replace(snapshot.status, **changes))
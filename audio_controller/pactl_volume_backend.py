@@ -0,0 +1,67 @@
+from subprocess import CalledProcessError
+import asyncio
+import re
+
+from data_classes import VolumeState
+from .command_runner import run_command, run_command_async
+from .player_backend import BackendError
+from .volume_backend import VolumeBackend
+
+
+class PactlVolumeBackend(VolumeBackend):
+    """Backend that shells out to pactl, used without pulsectl"""
+
+    name: str = "pactl"
+    sink: str = "@DEFAULT_SINK@"
+
+    def get_volume(self) -> VolumeState:
+        return self.parse_volume(
+            self.__run(["pactl", "get-sink-volume", self.sink]),
+            self.__run(["pactl", "get-sink-mute", self.sink]),
+        )
+
+    async def get_volume_async(self) -> VolumeState:
+        try:
+            volume, mute = await asyncio.gather(
+                run_command_async(["pactl", "get-sink-volume", self.sink]),
+                run_command_async(["pactl", "get-sink-mute", self.sink]),
+            )
+        except (CalledProcessError, OSError) as e:
+            raise BackendError(f"pactl failed: {e}") from e
+
+        return self.parse_volume(volume, mute)
+
+    def set_volume(self, level: int) -> None:
+        cleaned_level: int = max(0, min(level, 100))
+        self.__run(["pactl", "set-sink-volume", self.sink, f"{cleaned_level}%"])
+
+    def set_mute(self, muted: bool) -> None:
+        self.__run(["pactl", "set-sink-mute", self.sink, "1" if muted else "0"])
+
+    @staticmethod
+    def parse_volume(volume: str, mute: str) -> VolumeState:
+        """
+        Parse the output of pactl get-sink-volume and get-sink-mute
+
+        Parameters:
+            volume (str): e.g. "Volume: front-left: 26214 /  40% / -23.88 dB, ..."
+            mute (str): e.g. "Mute: no"
+
+        Returns:
+            VolumeState: The volume, averaged over the channels
+        """
+        levels: list[int] = [int(level) for level in re.findall(r"(\d+)%", volume)]
+
+        if not levels:
+            raise BackendError(f"Could not parse the volume: {volume}")
+
+        return VolumeState(
+            level=round(sum(levels) / len(levels)),
+            muted=mute.split(":")[-1].strip() == "yes",
+        )
+
+    def __run(self, command: list[str]) -> str:
+        try:
+            return run_command(command)
+        except (CalledProcessError, OSError) as e:
+            raise BackendError(f"pactl failed: {e}") from e
@@ -0,0 +1,188 @@
+import re
+
+from data_classes import MediaPlaybackState, RepeatState, ShuffleState
+
+
+class Parser:
+    """
+    Parses what playerctl prints: the playback, shuffle and loop states, and
+    the framed records the snapshot and follow formats print. A record holds
+    the values of its keys separated by control characters, so the values
+    may contain anything the player reports, e.g. newlines or braces.
+    """
+
+    "Separates the fields of a framed record, the ASCII unit separator"
+    FIELD_SEPARATOR: str = "\x1f"
+    "Ends a framed record, the ASCII record separator"
+    RECORD_SEPARATOR: str = "\x1e"
+
+    @staticmethod
+    def parse_media_state(player_status: str) -> MediaPlaybackState:
+        if "No players found" in player_status:
+            return MediaPlaybackState.NO_PLAYER
+
+        if "Playing" in player_status:
+            return MediaPlaybackState.PLAYING
+
+        if "Paused" in player_status:
+            return MediaPlaybackState.PAUSED
+
+        return MediaPlaybackState.ERROR
+
+    @staticmethod
+    def parse_shuffle_state(shuffle_status: str) -> ShuffleState:
+        # `playerctl shuffle` prints On/Off, format strings print true/false
+        if "On" in shuffle_status or "true" in shuffle_status:
+            return ShuffleState.ON
+
+        if "Off" in shuffle_status or "false" in shuffle_status:
+            return ShuffleState.OFF
+
+        return ShuffleState.UNAVAILABLE
+
+    @staticmethod
+    def parse_loop_state(loop_status: str) -> RepeatState:
+        if "Track" in loop_status:
+            return RepeatState.TRACK
+
+        if "Playlist" in loop_status:
+            return RepeatState.PLAYLIST
+
+        if "None" in loop_status:
+            return RepeatState.OFF
+
+        return RepeatState.UNAVAILABLE
+
+    @staticmethod
+    def extract_regex_item(
+        item: str, search_str: str, ok_if_empty: bool = False
+    ) -> str:
+        """
+        Extract an item from a string using regex, used to extract metadata
+
+        Parameters:
+            item (str): The item to extract
+            search_str (str): The string to search
+            ok_if_empty (bool): Whether to return an empty string if the item is not found
+
+        Returns:
+            str: The extracted item string
+        """
+
+        match = re.search(rf"{item}:(.+)", search_str)
+
+        if match is None:
+            if ok_if_empty:
+                return ""
+
+            raise ValueError(f"Could not find {item} in result")
+
+        return match.group(1)
+
+    @staticmethod
+    def frame_format(keys: tuple[str, ...]) -> str:
+        """
+        Build a playerctl format that prints the given keys as one framed record
+
+        Parameters:
+            keys (tuple[str, ...]): The metadata keys, e.g. "xesam:title"
+
+        Returns:
+            str: The format, fields separated and the record terminated by control characters
+        """
+        fields = Parser.FIELD_SEPARATOR.join(f"{{{{{key}}}}}" for key in keys)
+        return fields + Parser.RECORD_SEPARATOR
+
+    @staticmethod
+    def parse_frame(keys: tuple[str, ...], output: str) -> dict[str, str] | None:
+        """
+        Split the record printed with `frame_format` into its fields in one pass.
+        Values may contain newlines or other keys, and the last key may even
+        contain the field separator, it takes whatever is left of the record.
+
+        Parameters:
+            keys (tuple[str, ...]): The keys the format was built from
+            output (str): The command output
+
+        Returns:
+            dict[str, str] | None: The value of every key, None if there is no record
+        """
+        record, separator, _ = output.rpartition(Parser.RECORD_SEPARATOR)
+
+        if not separator:
+            return None
+
+        fields = record.split(Parser.FIELD_SEPARATOR, len(keys) - 1)
+
+        if len(fields) != len(keys):
+            return None
+
+        return dict(zip(keys, fields))
+
+    @staticmethod
+    def parse_frames(keys: tuple[str, ...], output: str) -> list[dict[str, str]]:
+        """
+        Split the records printed with `frame_format` for several players, e.g.
+        by `playerctl --all-players`. The first key must not hold newlines,
+        anything before its line is dropped, like the warnings of players
+        that could not be read. Records end at a record separator followed by
+        a newline, so values may hold the separator on its own.
+
+        Parameters:
+            keys (tuple[str, ...]): The keys the format was built from
+            output (str): The command output
+
+        Returns:
+            list[dict[str, str]]: The value of every key, one dict per complete record
+        """
+        terminator: str = Parser.RECORD_SEPARATOR + "\n"
+        frames: list[dict[str, str]] = []
+
+        # The newline after the last record may be missing, what follows the
+        # last terminator is never a complete record
+        for record in (output + "\n").split(terminator)[:-1]:
+            first, separator, rest = record.partition(Parser.FIELD_SEPARATOR)
+            fields = [first.rpartition("\n")[2]]
+
+            if separator:
+                fields.extend(rest.split(Parser.FIELD_SEPARATOR, len(keys) - 2))
+
+            if len(fields) == len(keys):
+                frames.append(dict(zip(keys, fields)))
+
+        return frames
+
+    @staticmethod
+    def split_frames(buffer: bytes) -> tuple[list[bytes], bytes]:
+        """
+        Split the complete records off the output of a followed frame format.
+        playerctl prints an empty line instead when the player goes away,
+        which is returned as an empty record.
+
+        Parameters:
+            buffer (bytes): The output read so far
+
+        Returns:
+            tuple[list[bytes], bytes]: The complete records and the unfinished rest
+        """
+        terminator: bytes = Parser.RECORD_SEPARATOR.encode() + b"\n"
+        records: list[bytes] = []
+
+        while True:
+            if buffer.startswith(b"\n"):
+                records.append(b"")
+                buffer = buffer[1:]
+                continue
+
+            end = buffer.find(terminator)
+
+            if end < 0:
+                return records, buffer
+
+            records.append(buffer[:end])
+            buffer = buffer[end + len(terminator) :]
+
+    @staticmethod
+    def parse_optional_int(value: str) -> int | None:
+        """Returns the value as an int, None if it is empty or not a whole number"""
+        return int(value) if value.isdecimal() else None
@@ -0,0 +1,309 @@
+from functools import cache
+from pathlib import Path
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from data_classes import CurrentMedia, HistoryEntry
+from instrumentation import recorder
+
+logger = logging.getLogger(__name__)
+
+# sqlite3 takes a while to load, it is imported once the history is opened
+sqlite3: Any = None
+
+# Identifies a track in the history: title, artist, album and player
+TrackKey = tuple[str, str, str, str]
+
+
+@cache
+def import_sqlite3() -> bool:
+    """
+    Import sqlite3 on first use
+
+    Returns:
+        bool: Whether sqlite3 is available, Python may be built without it
+    """
+    global sqlite3
+
+    try:
+        import sqlite3
+    except ImportError:
+        return False
+
+    return True
+
+
+class PlaybackHistory:
+    """
+    Remembers every track that was seen playing in an SQLite database.
+    Recording only touches an in-memory batch, which a background timer
+    writes in a single transaction. A track that is seen again is moved to
+    a new row id, so the row ids are in the order the tracks were last
+    seen: searches of the full-text index on title, artist and album walk
+    it newest first and stop at the limit, and the oldest tracks are the
+    ones dropped once the history is full.
+    """
+
+    "Seconds recorded tracks are batched before they are written"
+    FLUSH_DELAY: float = 2.0
+    "Seconds between updates of when the same track was last seen"
+    TOUCH_INTERVAL: float = 60.0
+    SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            player TEXT NOT NULL,
+            art_url TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            UNIQUE (title, artist, album, player)
+        );
+    """
+    "The full-text index, short prefixes included as the first keystrokes match most"
+    SEARCH_SCHEMA: str = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS history_search USING fts5(
+            title, artist, album, content='history', content_rowid='id', prefix='1 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS history_insert AFTER INSERT ON history BEGIN
+            INSERT INTO history_search (rowid, title, artist, album)
+            VALUES (new.id, new.title, new.artist, new.album);
+        END;
+        CREATE TRIGGER IF NOT EXISTS history_delete AFTER DELETE ON history BEGIN
+            INSERT INTO history_search (history_search, rowid, title, artist, album)
+            VALUES ('delete', old.id, old.title, old.artist, old.album);
+        END;
+    """
+    COLUMNS: str = "title, artist, album, player, art_url, first_seen, last_seen"
+
+    def __init__(self, path: Path, max_entries: int = 100_000) -> None:
+        """
+        Parameters:
+            path (Path): The database file, created on first use
+            max_entries (int): The most tracks kept, least recently seen go first
+        """
+        self.path: Path = path
+        self.max_entries: int = max_entries
+        self.__connection: "sqlite3.Connection | None" = None
+        # Whether SQLite was built with FTS5, otherwise the tracks are scanned
+        self.__searchable: bool = False
+        # Tracks waiting to be written, with when they were first and last seen
+        self.__pending: dict[TrackKey, tuple[str, float, float]] = {}
+        self.__last_touched: tuple[TrackKey | None, float] = (None, 0.0)
+        self.__timer: threading.Timer | None = None
+        self.__lock = threading.Lock()
+        self.__database_lock = threading.Lock()
+
+    @staticmethod
+    def default_path() -> Path:
+        """Returns the database path inside the XDG data directory"""
+        data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local/share"
+        return Path(data_home, "ulauncher-media-controller", "history.sqlite3")
+
+    def open(self) -> None:
+        """Open the database and create its tables, only done once"""
+        if not import_sqlite3():
+            logger.error("sqlite3 is not available, the playback history is not kept")
+            return
+
+        try:
+            with self.__database_lock:
+                self.__connect()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Could not open the playback history: {e}")
+
+    def record(self, media: CurrentMedia | None) -> None:
+        """
+        Remember that the media is playing, cheap enough for every read
+
+        Parameters:
+            media (CurrentMedia | None): The current media, if any
+        """
+        if media is None or not media.title:
+            return
+
+        key: TrackKey = (media.title, media.artist, media.album or "", media.player)
+        now: float = time.time()
+
+        with self.__lock:
+            last_key, touched_at = self.__last_touched
+
+            if key == last_key and now - touched_at < self.TOUCH_INTERVAL:
+                return
+
+            self.__last_touched = (key, now)
+            _, first_seen, _ = self.__pending.get(key, ("", now, now))
+            self.__pending[key] = (media.thumbnail_path, first_seen, now)
+
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self) -> None:
+        """Write the recorded tracks in one transaction and drop the oldest"""
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = {}
+            self.__timer = None
+
+        if not pending or not import_sqlite3():
+            return
+
+        try:
+            with self.__database_lock:
+                connection: "sqlite3.Connection" = self.__connect()
+
+                with connection:
+                    for key, (art_url, first_seen, last_seen) in sorted(
+                        pending.items(), key=lambda item: item[1][2]
+                    ):
+                        self.__insert(connection, key, art_url, first_seen, last_seen)
+
+                    self.__evict(connection)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Could not write the playback history: {e}")
+
+    @recorder.timed("history")
+    def search(self, text: str = "", limit: int = 10) -> list[HistoryEntry]:
+        """
+        Find the most recently seen tracks whose title, artist or album has
+        words starting with every typed word, or containing them without FTS5
+
+        Parameters:
+            text (str): The typed words, the most recent tracks if empty
+            limit (int): The most tracks returned
+
+        Returns:
+            list[HistoryEntry]: The tracks, most recently seen first
+        """
+        words: list[str] = text.split()
+
+        if not import_sqlite3():
+            return []
+
+        try:
+            with self.__database_lock:
+                connection: "sqlite3.Connection" = self.__connect()
+
+                if not words:
+                    rows = connection.execute(
+                        f"SELECT {self.COLUMNS} FROM history ORDER BY id DESC LIMIT ?",
+                        (limit,),
+                    ).fetchall()
+                elif self.__searchable:
+                    # Every word is quoted so that it is matched as typed, as a prefix
+                    quoted = (word.replace('"', '""') for word in words)
+                    match: str = " ".join(f'"{word}"*' for word in quoted)
+                    rows = connection.execute(
+                        f"SELECT {self.COLUMNS} FROM history WHERE id IN"
+                        " (SELECT rowid FROM history_search WHERE history_search"
+                        " MATCH ? ORDER BY rowid DESC LIMIT ?) ORDER BY id DESC",
+                        (match, limit),
+                    ).fetchall()
+                else:
+                    # Wildcards are escaped so that every word is matched as typed
+                    escaped = (
+                        word.replace("\\", "\\\\")
+                        .replace("%", "\\%")
+                        .replace("_", "\\_")
+                        for word in words
+                    )
+                    condition: str = " AND ".join(
+                        "(title || ' ' || artist || ' ' || album) LIKE ? ESCAPE '\\'"
+                        for _ in words
+                    )
+                    rows = connection.execute(
+                        f"SELECT {self.COLUMNS} FROM history WHERE {condition}"
+                        " ORDER BY id DESC LIMIT ?",
+                        (*(f"%{word}%" for word in escaped), limit),
+                    ).fetchall()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Could not search the playback history: {e}")
+            return []
+
+        return [
+            HistoryEntry(
+                media=CurrentMedia(
+                    thumbnail_path=art_url,
+                    artist=artist,
+                    title=title,
+                    player=player,
+                    album=album or None,
+                    position=None,
+                ),
+                first_seen=first_seen,
+                last_seen=last_seen,
+            )
+            for title, artist, album, player, art_url, first_seen, last_seen in rows
+        ]
+
+    def close(self) -> None:
+        """Write the pending tracks and close the database"""
+        self.flush()
+
+        with self.__database_lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    def __connect(self) -> "sqlite3.Connection":
+        """Returns the open database, opening it on first use once sqlite3 is imported"""
+        if self.__connection is not None:
+            return self.__connection
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Reads and the flush timer share the connection under the lock
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(self.SCHEMA)
+
+        try:
+            connection.executescript(self.SEARCH_SCHEMA)
+            self.__searchable = True
+        except sqlite3.OperationalError as e:
+            logger.info(f"Searching the history without an index: {e}")
+
+        self.__connection = connection
+        return connection
+
+    @staticmethod
+    def __insert(
+        connection: "sqlite3.Connection",
+        key: TrackKey,
+        art_url: str,
+        first_seen: float,
+        last_seen: float,
+    ) -> None:
+        """Insert a track as the newest row, keeping when it was first seen"""
+        condition: str = "title = ? AND artist = ? AND album = ? AND player = ?"
+        previous = connection.execute(
+            f"SELECT first_seen FROM history WHERE {condition}", key
+        ).fetchone()
+
+        if previous is not None:
+            first_seen = min(first_seen, previous[0])
+            connection.execute(f"DELETE FROM history WHERE {condition}", key)
+
+        connection.execute(
+            "INSERT INTO history"
+            " (title, artist, album, player, art_url, first_seen, last_seen)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, art_url, first_seen, last_seen),
+        )
+
+    def __evict(self, connection: "sqlite3.Connection") -> None:
+        """Remove the least recently seen tracks until within the limit"""
+        (count,) = connection.execute("SELECT count(*) FROM history").fetchone()
+
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM history WHERE id IN"
+                " (SELECT id FROM history ORDER BY id LIMIT ?)",
+                (count - self.max_entries,),
+            )
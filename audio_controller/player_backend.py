@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Callable
+import threading
+
+from data_classes import PlayerSnapshot, RepeatState, ShuffleState
+
+
+class BackendError(Exception):
+    """Raised when a backend could not perform an action on the player"""
+
+
+class UnsupportedError(BackendError):
+    """Raised when the player answered that it does not support an action"""
+
+
+class PlayerBackend(ABC):
+    """Interface for the ways the extension can talk to media players"""
+
+    name: str = "backend"
+    "Seconds to wait for playerctld to promote a player that was started"
+    promotion_timeout: float = 0.3
+    "Seconds between checks of the active player while waiting for the promotion"
+    promotion_interval: float = 0.03
+
+    @abstractmethod
+    def playpause(self) -> None:
+        """Toggle play/pause"""
+
+    @abstractmethod
+    def next(self) -> None:
+        """Skip to the next track"""
+
+    @abstractmethod
+    def prev(self) -> None:
+        """Skip to the previous track"""
+
+    @abstractmethod
+    def set_position(self, track_id: str | None, position: int) -> None:
+        """
+        Jump to a position in the track, ignored by the player if the track
+        has changed since the track id was read
+
+        Parameters:
+            track_id (str | None): The track id of the current media
+            position (int): The position in microseconds
+        """
+
+    @abstractmethod
+    def shuffle(self, shuffle_state: ShuffleState) -> None:
+        """
+        Toggle shuffle
+
+        Parameters:
+            shuffle_state (ShuffleState): The current shuffle status
+        """
+
+    @abstractmethod
+    def repeat(self, repeat_state: RepeatState) -> None:
+        """
+        Set the loop status
+
+        Parameters:
+            repeat_state (RepeatState): The loop status to set
+        """
+
+    @abstractmethod
+    def get_snapshot(self) -> PlayerSnapshot:
+        """
+        Get the player status and the current media
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+
+    @abstractmethod
+    def get_media_players(self) -> list[str]:
+        """
+        Returns a list of media players that are currently running
+
+        Returns:
+            list[str]: A list of media players
+        """
+
+    @abstractmethod
+    def get_player_snapshots(self) -> dict[str, PlayerSnapshot]:
+        """
+        Get the status and current media of every running player at once,
+        without making the players active
+
+        Returns:
+            dict[str, PlayerSnapshot]: The snapshot of each player, keyed like get_media_players
+        """
+
+    async def get_media_players_async(self) -> list[str]:
+        """
+        Returns the running media players without blocking the event loop.
+        Runs get_media_players in a thread unless overridden.
+
+        Returns:
+            list[str]: A list of media players
+        """
+        return await asyncio.to_thread(self.get_media_players)
+
+    @abstractmethod
+    def change_player(self, player: str) -> PlayerSnapshot:
+        """
+        Make the player the active one and play it, pausing all others
+
+        Parameters:
+            player (str): The player
+
+        Returns:
+            PlayerSnapshot: The status and current media of the now active player
+        """
+
+    @abstractmethod
+    def follow(self, on_change: Callable[[], None], stop: threading.Event) -> None:
+        """
+        Block and call on_change whenever the players report a change.
+        Returns once stop is set or when the set of players changes,
+        so the caller can restart it with a fresh view of the players.
+
+        Parameters:
+            on_change (Callable[[], None]): Called after every change
+            stop (threading.Event): Set to stop following
+
+        Raises:
+            BackendError: If the player changes can no longer be followed
+        """
@@ -0,0 +1,204 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+from data_classes import PlayerSnapshot
+from .player_backend import PlayerBackend
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerFollower:
+    """
+    Keeps an always-current snapshot of the player in memory, refreshed
+    by a background thread whenever the backend reports a change
+    """
+
+    "Seconds to wait before restarting the backend follower"
+    RESTART_DELAY: float = 0.5
+    "Failed restarts in a row after which the follower gives up"
+    MAX_FAILURES: int = 5
+    "Seconds without a notification after which a waiter reads the player itself"
+    RECHECK_INTERVAL: float = 0.5
+
+    def __init__(
+        self,
+        backend: PlayerBackend,
+        on_refresh: Callable[[PlayerSnapshot], None] | None = None,
+    ) -> None:
+        """
+        Parameters:
+            backend (PlayerBackend): The backend to follow the players with
+            on_refresh (Callable[[PlayerSnapshot], None], optional): Called with
+                every snapshot that is read
+        """
+        self.__backend = backend
+        self.__on_refresh = on_refresh
+        self.__snapshot: PlayerSnapshot | None = None
+        # When the read of the snapshot was started
+        self.__read_at: float = 0.0
+        self.__stale: bool = True
+        # Changes are only noted while actions are sent in a burst
+        self.__holds: int = 0
+        self.__missed: bool = False
+        self.__condition = threading.Condition()
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def snapshot(self) -> PlayerSnapshot | None:
+        """The last snapshot read by the follower"""
+        return self.__snapshot
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the snapshot can no longer be trusted to be current"""
+        return (
+            self.__stale
+            or self.__snapshot is None
+            or self.__thread is None
+            or not self.__thread.is_alive()
+        )
+
+    def start(self) -> None:
+        """Start following the players, if not already running"""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+
+        self.__stop.clear()
+        self.__thread = threading.Thread(
+            target=self.__run, name="player-follower", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop following the players and wait for the thread to exit"""
+        self.__stop.set()
+
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def refresh(self) -> None:
+        """Read a new snapshot from the backend and store it"""
+        read_at: float = time.monotonic()
+
+        try:
+            snapshot = self.__backend.get_snapshot()
+        except Exception as e:
+            logger.error(f"Could not refresh the player snapshot: {e}")
+            self.__stale = True
+            return
+
+        with self.__condition:
+            # A read that was started earlier may finish last
+            if read_at >= self.__read_at:
+                self.__snapshot = snapshot
+                self.__read_at = read_at
+
+            self.__stale = False
+            self.__condition.notify_all()
+
+        if self.__on_refresh is not None:
+            self.__on_refresh(snapshot)
+
+    @contextmanager
+    def held(self) -> Iterator[None]:
+        """
+        Hold back the refreshes while a burst of actions is sent, such as
+        the skips of a multi-step skip, and read the player once after it
+        instead of after every change on the way
+        """
+        with self.__condition:
+            self.__holds += 1
+
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__holds -= 1
+                missed: bool = self.__missed and self.__holds == 0
+
+                if missed:
+                    self.__missed = False
+
+            if missed:
+                self.refresh()
+
+    def __on_change(self) -> None:
+        """Refresh on a change the backend reported, unless held back"""
+        with self.__condition:
+            if self.__holds:
+                self.__missed = True
+                return
+
+        self.refresh()
+
+    def wait_for(
+        self,
+        predicate: Callable[[PlayerSnapshot], bool],
+        timeout: float,
+        since: float = 0.0,
+    ) -> PlayerSnapshot | None:
+        """
+        Block until the snapshot satisfies the predicate, waking up on every
+        change the backend reports instead of polling
+
+        Parameters:
+            predicate (Callable[[PlayerSnapshot], bool]): The condition to wait for
+            timeout (float): The maximum time to wait in seconds
+            since (float): The monotonic time the read of the snapshot has to
+                be started after, for the state after an action was answered
+
+        Returns:
+            PlayerSnapshot | None: The latest snapshot, even if the wait timed out
+        """
+        deadline: float = time.monotonic() + timeout
+
+        while True:
+            with self.__condition:
+                snapshot = self.__snapshot
+                outdated: bool = False
+                if snapshot is not None and predicate(snapshot):
+                    if self.__read_at >= since:
+                        return snapshot
+
+                    outdated = True
+
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0 or self.is_stale:
+                    return snapshot
+
+                notified: bool = not outdated and self.__condition.wait(
+                    min(remaining, self.RECHECK_INTERVAL)
+                )
+
+            # The player is read without the lock, so the follower and other
+            # waiters are not held up by it
+            if not notified:
+                # Either the snapshot was read before the action was answered
+                # and the player may have moved on since, or not every change
+                # is signalled (e.g. restarting the same track), so read the
+                # player once in a while
+                self.refresh()
+
+    def __run(self) -> None:
+        failures: int = 0
+
+        while not self.__stop.is_set():
+            try:
+                self.refresh()
+                self.__backend.follow(self.__on_change, self.__stop)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.error(f"Player follower failed ({failures}): {e}")
+
+            self.__stale = True
+
+            if failures >= self.MAX_FAILURES:
+                logger.error("Player follower gave up, falling back to polling")
+                return
+
+            self.__stop.wait(self.RESTART_DELAY * (2**failures))
@@ -0,0 +1,327 @@
+from collections.abc import Callable
+import logging
+import os
+import selectors
+import subprocess
+import threading
+import time
+
+from data_classes import (
+    CurrentMedia,
+    MediaPlaybackState,
+    PlayerCapabilities,
+    PlayerSnapshot,
+    PlayerStatus,
+    RepeatState,
+    ShuffleState,
+)
+from instrumentation import recorder
+from .capability_cache import capability_cache
+from .command_runner import run_command, run_command_async, run_commands
+from .parser import Parser
+from .player_backend import BackendError, PlayerBackend, UnsupportedError
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerctlBackend(PlayerBackend):
+    """Backend that shells out to playerctl for every query and action"""
+
+    name: str = "playerctl"
+    "Keys of the snapshot record, the free-form title last so that it can hold anything"
+    snapshot_keys: tuple[str, ...] = (
+        "status",
+        "playerInstance",
+        "shuffle",
+        "loop",
+        "playerName",
+        "position",
+        "mpris:length",
+        "mpris:trackid",
+        "mpris:artUrl",
+        "xesam:album",
+        "xesam:artist",
+        "xesam:title",
+    )
+    snapshot_format: str = Parser.frame_format(snapshot_keys)
+
+    "Keys used to follow changes, without position as that ticks every second"
+    follow_keys: tuple[str, ...] = (
+        "playerName",
+        "status",
+        "shuffle",
+        "loop",
+        "mpris:trackid",
+        "xesam:title",
+    )
+    follow_format: str = Parser.frame_format(follow_keys)
+    "Seconds between checks of the stop event while following"
+    poll_interval: float = 0.25
+    "What playerctl prints when the player refuses a command it does not support"
+    unsupported_messages: tuple[str, ...] = (
+        "No player could handle this command",
+        "NotSupported",
+        "not supported",
+    )
+
+    def playpause(self) -> None:
+        run_command(["playerctl", "-p", "playerctld", "play-pause"])
+
+    def next(self) -> None:
+        self.run_action(["playerctl", "-p", "playerctld", "next"])
+
+    def prev(self) -> None:
+        self.run_action(["playerctl", "-p", "playerctld", "previous"])
+
+    def set_position(self, track_id: str | None, position: int) -> None:
+        # playerctl passes the track id of the current track itself
+        seconds: str = f"{position / 1_000_000:.3f}"
+        self.run_action(["playerctl", "-p", "playerctld", "position", seconds])
+
+    def shuffle(self, shuffle_state: ShuffleState) -> None:
+        self.run_action(["playerctl", "-p", "playerctld", "shuffle", "toggle"])
+
+    def repeat(self, repeat_state: RepeatState) -> None:
+        self.run_action(["playerctl", "-p", "playerctld", "loop", repeat_state.value])
+
+    @staticmethod
+    def run_action(command: list[str]) -> None:
+        """
+        Run a command that needs the player to support it
+
+        Parameters:
+            command (list[str]): The command and its arguments
+
+        Raises:
+            UnsupportedError: If the player does not support the command
+            CalledProcessError: If the command failed otherwise
+        """
+        try:
+            run_command(command)
+        except subprocess.CalledProcessError as e:
+            output: str = e.output or ""
+
+            if any(
+                message in output for message in PlayerctlBackend.unsupported_messages
+            ):
+                raise UnsupportedError(output.strip()) from e
+
+            raise
+
+    def get_snapshot(self) -> PlayerSnapshot:
+        return self.parse_snapshot(run_command(self.snapshot_command, False))
+
+    @property
+    def snapshot_command(self) -> list[str]:
+        return ["playerctl", "metadata", "--format", self.snapshot_format]
+
+    @staticmethod
+    @recorder.timed("parse")
+    def parse_snapshot(result: str) -> PlayerSnapshot:
+        """
+        Parse the output of the snapshot command
+
+        Parameters:
+            result (str): The formatted metadata, or the playerctl error
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        fields = Parser.parse_frame(PlayerctlBackend.snapshot_keys, result)
+
+        # Without a player there is no record, only the error message
+        if fields is None:
+            return PlayerSnapshot(
+                status=PlayerStatus(
+                    playback_state=Parser.parse_media_state(result),
+                    shuffle_state=ShuffleState.UNAVAILABLE,
+                    repeat_state=RepeatState.UNAVAILABLE,
+                ),
+                media=None,
+            )
+
+        return PlayerctlBackend.snapshot_from_fields(fields)
+
+    @staticmethod
+    @recorder.timed("parse")
+    def parse_player_snapshots(result: str) -> dict[str, PlayerSnapshot]:
+        """
+        Parse the output of the snapshot command run for all players
+
+        Parameters:
+            result (str): The formatted metadata of every player that could be read
+
+        Returns:
+            dict[str, PlayerSnapshot]: The snapshot of each player, by player instance
+        """
+        return {
+            fields["playerInstance"]: PlayerctlBackend.snapshot_from_fields(fields)
+            for fields in Parser.parse_frames(PlayerctlBackend.snapshot_keys, result)
+        }
+
+    @staticmethod
+    def snapshot_from_fields(fields: dict[str, str]) -> PlayerSnapshot:
+        """Build a snapshot from the fields of one snapshot record"""
+        player: str = fields["playerInstance"]
+        shuffle_state: ShuffleState = Parser.parse_shuffle_state(fields["shuffle"])
+        repeat_state: RepeatState = Parser.parse_loop_state(fields["loop"])
+        # playerctl cannot read CanGoNext and the like, those are found out
+        # by trying. A player without a position cannot seek either.
+        reported = PlayerCapabilities(
+            can_seek=bool(fields["position"]),
+            can_shuffle=shuffle_state != ShuffleState.UNAVAILABLE,
+            can_repeat=repeat_state != RepeatState.UNAVAILABLE,
+        )
+        player_status = PlayerStatus(
+            playback_state=Parser.parse_media_state(fields["status"]),
+            shuffle_state=shuffle_state,
+            repeat_state=repeat_state,
+            capabilities=capability_cache.resolve(
+                player, reported, (fields["playerName"], fields["mpris:trackid"])
+            ),
+        )
+
+        if player_status.playback_state not in [
+            MediaPlaybackState.PLAYING,
+            MediaPlaybackState.PAUSED,
+        ]:
+            return PlayerSnapshot(status=player_status, media=None, player=player)
+
+        # playerctl prints artist lists already joined, so there is only one entry
+        artist = fields["xesam:artist"]
+
+        media = CurrentMedia(
+            thumbnail_path=fields["mpris:artUrl"],
+            artist=artist,
+            title=fields["xesam:title"],
+            player=fields["playerName"].capitalize(),
+            album=fields["xesam:album"],
+            position=Parser.parse_optional_int(fields["position"]),
+            artists=(artist,) if artist else (),
+            length=Parser.parse_optional_int(fields["mpris:length"]),
+            trackid=fields["mpris:trackid"] or None,
+        )
+
+        return PlayerSnapshot(
+            status=player_status,
+            media=media,
+            player=player,
+            sampled_at=time.monotonic(),
+        )
+
+    def get_player_snapshots(self) -> dict[str, PlayerSnapshot]:
+        return self.parse_player_snapshots(
+            run_command(
+                [
+                    "playerctl",
+                    "--all-players",
+                    "metadata",
+                    "--format",
+                    self.snapshot_format,
+                ],
+                False,
+            )
+        )
+
+    def get_media_players(self) -> list[str]:
+        return run_command(["playerctl", "-l"]).splitlines()
+
+    async def get_media_players_async(self) -> list[str]:
+        return (await run_command_async(["playerctl", "-l"])).splitlines()
+
+    def change_player(self, player: str) -> PlayerSnapshot:
+        # Pause the others while the target starts, so it never stops
+        run_commands(
+            [
+                ["playerctl", "--all-players", f"--ignore-player={player}", "pause"],
+                ["playerctl", "-p", player, "play"],
+            ],
+            False,
+        )
+        result: str | None = self.wait_for_promotion(player)
+
+        # playerctld promotes a player once it starts playing, so one
+        # that already was has to be restarted
+        if result is None:
+            try:
+                run_command(["playerctl", "-p", player, "pause"])
+                run_command(["playerctl", "-p", player, "play"])
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Could not restart {player}: {e.output}")
+
+            result = run_command(self.snapshot_command, False)
+
+        return self.parse_snapshot(result)
+
+    def wait_for_promotion(self, player: str) -> str | None:
+        """
+        Read the active player until playerctld has promoted the player,
+        which it does shortly after the player reports that it started
+
+        Parameters:
+            player (str): The player instance
+
+        Returns:
+            str | None: The snapshot output once promoted or without any
+                player, None if another player is still the active one
+        """
+        deadline: float = time.monotonic() + self.promotion_timeout
+
+        while True:
+            result: str = run_command(self.snapshot_command, False)
+            fields = Parser.parse_frame(self.snapshot_keys, result)
+
+            if fields is None or fields["playerInstance"] == player:
+                return result
+
+            if time.monotonic() >= deadline:
+                return None
+
+            time.sleep(self.promotion_interval)
+
+    def follow(self, on_change: Callable[[], None], stop: threading.Event) -> None:
+        try:
+            process = subprocess.Popen(
+                ["playerctl", "--follow", "metadata", "--format", self.follow_format],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise BackendError(f"Could not start playerctl: {e}") from e
+
+        assert process.stdout is not None
+        fd = process.stdout.fileno()
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+        buffer = b""
+        current_player: str | None = None
+
+        try:
+            while not stop.is_set():
+                if not selector.select(self.poll_interval):
+                    continue
+
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise BackendError(
+                        f"playerctl stopped following with code {process.wait()}"
+                    )
+
+                records, buffer = Parser.split_frames(buffer + chunk)
+                if not records:
+                    continue
+
+                on_change()
+
+                # Restart once playerctl moves on to another player,
+                # an empty record only means the followed player went away
+                player = records[-1].decode(errors="replace")
+                player = player.split(Parser.FIELD_SEPARATOR)[0]
+                if current_player and player and player != current_player:
+                    return
+
+                current_player = player or current_player
+        finally:
+            selector.close()
+            process.terminate()
+            process.wait()
@@ -0,0 +1,134 @@
+from collections.abc import Callable
+from functools import cache
+from typing import Any, TypeVar
+import logging
+import threading
+
+from data_classes import VolumeState
+from .player_backend import BackendError
+from .volume_backend import VolumeBackend
+
+logger = logging.getLogger(__name__)
+
+# pulsectl loads libpulse, it is imported once the backend is created
+pulsectl: Any = None
+
+T = TypeVar("T")
+
+
+@cache
+def import_pulsectl() -> bool:
+    """
+    Import pulsectl on first use
+
+    Returns:
+        bool: Whether pulsectl is available
+    """
+    global pulsectl
+
+    try:
+        import pulsectl
+    except ImportError:
+        return False
+
+    return True
+
+
+class PulseVolumeBackend(VolumeBackend):
+    """
+    Backend that keeps one connection to the sound server over the native
+    PulseAudio protocol, which PipeWire serves through pipewire-pulse too
+    """
+
+    name: str = "pulse"
+    client_name: str = "ulauncher-media-controller"
+
+    def __init__(self, server: str | None = None) -> None:
+        """
+        Parameters:
+            server (str, optional): The server address, e.g. of a test instance
+        """
+        self.server: str | None = server
+        self.__pulse: "pulsectl.Pulse | None" = None
+        # The connection must not be used from two threads at once
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def create(server: str | None = None) -> "PulseVolumeBackend | None":
+        """
+        Connect to the sound server
+
+        Parameters:
+            server (str, optional): The server address, the default server if None
+
+        Returns:
+            PulseVolumeBackend | None: The backend, or None if it is unavailable
+        """
+        if not import_pulsectl():
+            logger.info("pulsectl is not available, cannot use the pulse backend")
+            return None
+
+        backend = PulseVolumeBackend(server)
+
+        try:
+            backend.get_volume()
+        except BackendError as e:
+            logger.warning(f"Could not connect to the sound server: {e}")
+            return None
+
+        return backend
+
+    def close(self) -> None:
+        """Close the connection to the sound server"""
+        with self.__lock:
+            self.__disconnect()
+
+    def get_volume(self) -> VolumeState:
+        def read(pulse: "pulsectl.Pulse") -> VolumeState:
+            sink = self.__get_default_sink(pulse)
+            level: float = pulse.volume_get_all_chans(sink)
+
+            return VolumeState(level=round(level * 100), muted=bool(sink.mute))
+
+        return self.__run(read)
+
+    def set_volume(self, level: int) -> None:
+        self.__run(
+            lambda pulse: pulse.volume_set_all_chans(
+                self.__get_default_sink(pulse), max(0, min(level, 100)) / 100
+            )
+        )
+
+    def set_mute(self, muted: bool) -> None:
+        self.__run(lambda pulse: pulse.mute(self.__get_default_sink(pulse), muted))
+
+    def __get_default_sink(self, pulse: "pulsectl.Pulse") -> "pulsectl.PulseSinkInfo":
+        return pulse.get_sink_by_name(pulse.server_info().default_sink_name)
+
+    def __run(self, operation: Callable[["pulsectl.Pulse"], T]) -> T:
+        """
+        Run an operation on the connection, reconnecting once if the sound
+        server dropped it, e.g. after a restart
+        """
+        with self.__lock:
+            try:
+                return operation(self.__connect())
+            except pulsectl.PulseError:
+                self.__disconnect()
+
+            try:
+                return operation(self.__connect())
+            except pulsectl.PulseError as e:
+                self.__disconnect()
+                raise BackendError(f"The sound server failed: {e}") from e
+
+    def __connect(self) -> "pulsectl.Pulse":
+        if self.__pulse is None:
+            self.__pulse = pulsectl.Pulse(self.client_name, server=self.server)
+
+        return self.__pulse
+
+    def __disconnect(self) -> None:
+        if self.__pulse is not None:
+            self.__pulse.close()
+            self.__pulse = None
@@ -0,0 +1,104 @@
+from collections.abc import Callable
+import threading
+import time
+
+from data_classes import PlayerSnapshot
+
+
+class StatusCache:
+    """
+    Reuses a pulled player snapshot for a short time, so fast typing costs
+    one backend query. Every action bumps the generation, which drops the
+    cached snapshot so the next read after an action is always fresh.
+    """
+
+    def __init__(
+        self, ttl: float = 0.5, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Parameters:
+            ttl (float): Seconds a snapshot is reused, 0 disables the cache
+            clock (Callable[[], float]): Returns the current time in seconds
+        """
+        self.ttl: float = ttl
+        self.clock: Callable[[], float] = clock
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__generation: int = 0
+        self.__entry: tuple[int, float, PlayerSnapshot] | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """The number of times the cache was invalidated"""
+        return self.__generation
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of reads served from the cache"""
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot, called after every action on the player"""
+        with self.__lock:
+            self.__generation += 1
+            self.__entry = None
+
+    def update(self, snapshot: PlayerSnapshot) -> None:
+        """Cache a snapshot read right after an action, in place of the cached one"""
+        with self.__lock:
+            self.__generation += 1
+            self.__entry = (self.__generation, self.clock(), snapshot)
+
+    def get(self, fetch: Callable[[], PlayerSnapshot]) -> PlayerSnapshot:
+        """
+        Returns the cached snapshot, or fetches and caches a new one
+
+        Parameters:
+            fetch (Callable[[], PlayerSnapshot]): Reads a snapshot from the backend
+
+        Returns:
+            PlayerSnapshot: The player status and current media
+        """
+        generation, snapshot = self.__lookup()
+
+        if snapshot is not None:
+            return snapshot
+
+        fetched_at: float = self.clock()
+        snapshot = fetch()
+        self.__store(generation, fetched_at, snapshot)
+
+        return snapshot
+
+    def peek(self) -> PlayerSnapshot | None:
+        """Returns the cached snapshot if it is still valid, without fetching"""
+        return self.__lookup(count_miss=False)[1]
+
+    def __lookup(self, count_miss: bool = True) -> tuple[int, PlayerSnapshot | None]:
+        """Returns the current generation and the snapshot, if still valid"""
+        with self.__lock:
+            generation: int = self.__generation
+            entry = self.__entry
+
+            if (
+                entry is not None
+                and entry[0] == generation
+                and self.clock() - entry[1] < self.ttl
+            ):
+                self.hits += 1
+                return generation, entry[2]
+
+            if count_miss:
+                self.misses += 1
+
+            return generation, None
+
+    def __store(
+        self, generation: int, fetched_at: float, snapshot: PlayerSnapshot
+    ) -> None:
+        with self.__lock:
+            # An action during the fetch makes the result unsafe to reuse
+            if self.__generation == generation:
+                self.__entry = (generation, fetched_at, snapshot)
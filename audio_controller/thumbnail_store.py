@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from hashlib import sha256
+from pathlib import Path
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailStore:
+    """
+    Stores downloaded thumbnails under a hash of their URL. An in-memory
+    LRU index of the files is loaded once, so lookups and evictions never
+    scan the directory. Files are written to a temporary name and renamed
+    into place, which keeps concurrent extension processes from reading
+    half-written images.
+    """
+
+    SUFFIX: str = ".art"
+    TEMP_PREFIX: str = ".tmp-"
+    "Seconds after which a leftover temporary file is removed"
+    TEMP_MAX_AGE: float = 3600
+
+    def __init__(self, directory: Path, max_bytes: int = 32 * 1024 * 1024) -> None:
+        """
+        Parameters:
+            directory (Path): The directory the thumbnails are stored in
+            max_bytes (int): The size budget, least recently used files go first
+        """
+        self.directory: Path = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__index: OrderedDict[str, int] = OrderedDict()
+        self.__size: int = 0
+        self.__loaded: bool = False
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def default_directory() -> Path:
+        """Returns the thumbnail directory inside the XDG cache directory"""
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home, "ulauncher-media-controller", "thumbnails")
+
+    @staticmethod
+    def get_key(url: str, variant: str = "") -> str:
+        """Returns the key a URL, or a variant of its image, is stored under"""
+        key: str = sha256(url.encode()).hexdigest()
+        return f"{key}-{variant}" if variant else key
+
+    @property
+    def size(self) -> int:
+        """The total size of the stored thumbnails in bytes"""
+        return self.__size
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that found a stored thumbnail"""
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def get_path(self, key: str) -> Path:
+        return Path(self.directory, f"{key}{self.SUFFIX}")
+
+    def load(self) -> None:
+        """Build the index from the files on disk, only done once"""
+        with self.__lock:
+            if self.__loaded:
+                return
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries: list[tuple[float, str, int]] = []
+            now: float = time.time()
+
+            with os.scandir(self.directory) as scanner:
+                for entry in scanner:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    if entry.name.startswith(self.TEMP_PREFIX):
+                        if now - stat.st_mtime > self.TEMP_MAX_AGE:
+                            Path(entry.path).unlink(missing_ok=True)
+                    elif entry.name.endswith(self.SUFFIX):
+                        key = entry.name.removesuffix(self.SUFFIX)
+                        entries.append((stat.st_mtime, key, stat.st_size))
+
+            for _, key, size in sorted(entries):
+                self.__index[key] = size
+                self.__size += size
+
+            self.__loaded = True
+            self.__evict()
+
+    def get(self, url: str, variant: str = "") -> Path | None:
+        """
+        Get the stored thumbnail for a URL
+
+        Parameters:
+            url (str): The thumbnail URL
+            variant (str): The variant of the image, e.g. a downscaled copy
+
+        Returns:
+            Path | None: The path to the thumbnail, if stored
+        """
+        self.load()
+        key: str = ThumbnailStore.get_key(url, variant)
+
+        with self.__lock:
+            if key not in self.__index:
+                self.misses += 1
+                return None
+
+            self.__index.move_to_end(key)
+
+        path: Path = self.get_path(key)
+
+        if path.exists():
+            self.hits += 1
+            return path
+
+        # Another extension process evicted it
+        with self.__lock:
+            self.__size -= self.__index.pop(key, 0)
+            self.misses += 1
+
+        return None
+
+    def put(
+        self, url: str, write: Callable[[Path], None], variant: str = ""
+    ) -> Path | None:
+        """
+        Store the thumbnail for a URL
+
+        Parameters:
+            url (str): The thumbnail URL
+            write (Callable[[Path], None]): Writes the thumbnail to the given path
+            variant (str): The variant of the image, e.g. a downscaled copy
+
+        Returns:
+            Path | None: The path to the thumbnail, or None if nothing was written
+        """
+        self.load()
+        key: str = ThumbnailStore.get_key(url, variant)
+        path: Path = self.get_path(key)
+
+        fd, temp_name = tempfile.mkstemp(prefix=self.TEMP_PREFIX, dir=self.directory)
+        os.close(fd)
+        temp_path = Path(temp_name)
+
+        try:
+            write(temp_path)
+
+            if not temp_path.exists() or temp_path.stat().st_size == 0:
+                return None
+
+            size: int = temp_path.stat().st_size
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        with self.__lock:
+            self.__size += size - self.__index.pop(key, 0)
+            self.__index[key] = size
+            self.__evict()
+
+        return path
+
+    def __evict(self) -> None:
+        """Remove the least recently used thumbnails until within the budget"""
+        while self.__size > self.max_bytes and len(self.__index) > 1:
+            key, size = self.__index.popitem(last=False)
+            self.__size -= size
+            self.get_path(key).unlink(missing_ok=True)
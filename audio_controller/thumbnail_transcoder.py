@@ -0,0 +1,87 @@
+from functools import cache
+from pathlib import Path
+from typing import Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# GdkPixbuf takes a while to load, it is imported once transcoding is checked for
+GdkPixbuf: Any = None
+GLib: Any = None
+
+
+@cache
+def import_gdk_pixbuf() -> bool:
+    """
+    Import GdkPixbuf and GLib on first use
+
+    Returns:
+        bool: Whether GdkPixbuf is available
+    """
+    global GdkPixbuf, GLib
+
+    try:
+        import gi
+
+        gi.require_version("GdkPixbuf", "2.0")
+        from gi.repository import GdkPixbuf, GLib
+    except (ImportError, ValueError):
+        return False
+
+    return True
+
+
+class ThumbnailTranscoder:
+    """
+    Downscales cover art to the size the launcher shows it at, so a
+    3000x3000 JPEG is decoded once instead of on every render
+    """
+
+    "The 40px result icon at 2x scaling"
+    ICON_SIZE: int = 80
+
+    def __init__(self, size: int = ICON_SIZE) -> None:
+        self.size: int = size
+
+    @property
+    def available(self) -> bool:
+        """Whether GdkPixbuf can be used to transcode images"""
+        return import_gdk_pixbuf()
+
+    @property
+    def variant(self) -> str:
+        """The name the transcoded images are stored under"""
+        return f"icon{self.size}"
+
+    def transcode(self, source: Path, destination: Path) -> None:
+        """
+        Write a PNG of the image scaled down to fit the icon size. Nothing is
+        written for an image GdkPixbuf does not recognize, so it is not cached.
+
+        Parameters:
+            source (Path): The original image
+            destination (Path): Where to write the PNG
+        """
+        try:
+            info: tuple[Any, int, int] | None = GdkPixbuf.Pixbuf.get_file_info(
+                str(source)
+            )
+
+            if info is None or info[0] is None:
+                logger.error(f"Could not transcode {source}: unrecognized image")
+                destination.unlink(missing_ok=True)
+                return
+
+            _, width, height = info
+
+            if width <= self.size and height <= self.size:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file(str(source))
+            else:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                    str(source), self.size, self.size, True
+                )
+
+            pixbuf.savev(str(destination), "png", [], [])
+        except GLib.Error as e:
+            logger.error(f"Could not transcode {source}: {e.message}")
+            destination.unlink(missing_ok=True)
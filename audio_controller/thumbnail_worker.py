@@ -0,0 +1,70 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailWorker:
+    """
+    Resolves thumbnails in background threads, so rendering never waits on
+    a download. Requests for a thumbnail that is already being resolved
+    only add their callback.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="thumbnail"
+        )
+        self.__pending: dict[str, list[Callable[[Path], None]]] = {}
+        self.__lock = threading.Lock()
+
+    def is_pending(self, key: str) -> bool:
+        """Whether the thumbnail for the key is being resolved"""
+        with self.__lock:
+            return key in self.__pending
+
+    def request(
+        self,
+        key: str,
+        resolve: Callable[[], Path | None],
+        on_ready: Callable[[Path], None],
+    ) -> None:
+        """
+        Resolve a thumbnail in the background
+
+        Parameters:
+            key (str): Identifies the thumbnail, usually its URL
+            resolve (Callable[[], Path | None]): Blocking call returning the path
+            on_ready (Callable[[Path], None]): Called with the path once resolved
+        """
+        with self.__lock:
+            if key in self.__pending:
+                self.__pending[key].append(on_ready)
+                return
+
+            self.__pending[key] = [on_ready]
+
+        self.__executor.submit(self.__resolve, key, resolve)
+
+    def __resolve(self, key: str, resolve: Callable[[], Path | None]) -> None:
+        path: Path | None = None
+
+        try:
+            path = resolve()
+        except Exception as e:
+            logger.error(f"Could not resolve thumbnail {key}: {e}")
+
+        with self.__lock:
+            callbacks = self.__pending.pop(key, [])
+
+        if path is None:
+            return
+
+        for on_ready in callbacks:
+            try:
+                on_ready(path)
+            except Exception as e:
+                logger.error(f"Thumbnail callback failed for {key}: {e}")
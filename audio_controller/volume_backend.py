@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+import asyncio
+
+from data_classes import VolumeState
+
+
+class VolumeBackend(ABC):
+    """Interface for the ways the extension can talk to the sound server"""
+
+    name: str = "volume"
+
+    @abstractmethod
+    def get_volume(self) -> VolumeState:
+        """
+        Get the volume of the default output
+
+        Returns:
+            VolumeState: The volume level and whether it is muted
+
+        Raises:
+            BackendError: If the sound server could not be reached
+        """
+
+    @abstractmethod
+    def set_volume(self, level: int) -> None:
+        """
+        Set the volume of the default output
+
+        Parameters:
+            level (int): The volume between 0 and 100
+
+        Raises:
+            BackendError: If the sound server could not be reached
+        """
+
+    @abstractmethod
+    def set_mute(self, muted: bool) -> None:
+        """
+        Mute or unmute the default output, leaving its volume level as it is
+
+        Parameters:
+            muted (bool): Whether to mute
+
+        Raises:
+            BackendError: If the sound server could not be reached
+        """
+
+    def change_volume(self, delta: int) -> VolumeState:
+        """
+        Change the volume relative to the current level, within 0 and 100
+
+        Parameters:
+            delta (int): The change, e.g. 5 or -5
+
+        Returns:
+            VolumeState: The volume after the change
+        """
+        volume: VolumeState = self.get_volume()
+        level: int = max(0, min(volume.level + delta, 100))
+        self.set_volume(level)
+
+        return VolumeState(level=level, muted=volume.muted)
+
+    async def get_volume_async(self) -> VolumeState:
+        """
+        Get the volume without blocking the event loop. Runs get_volume in a
+        thread unless overridden.
+
+        Returns:
+            VolumeState: The volume level and whether it is muted
+        """
+        return await asyncio.to_thread(self.get_volume)
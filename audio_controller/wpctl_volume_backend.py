@@ -0,0 +1,55 @@
+from subprocess import CalledProcessError
+
+from data_classes import VolumeState
+from .command_runner import run_command, run_command_async
+from .player_backend import BackendError
+from .volume_backend import VolumeBackend
+
+
+class WpctlVolumeBackend(VolumeBackend):
+    """Backend that shells out to wpctl, for PipeWire without pipewire-pulse"""
+
+    name: str = "wpctl"
+    sink: str = "@DEFAULT_AUDIO_SINK@"
+
+    def get_volume(self) -> VolumeState:
+        return self.parse_volume(self.__run(["wpctl", "get-volume", self.sink]))
+
+    async def get_volume_async(self) -> VolumeState:
+        try:
+            result = await run_command_async(["wpctl", "get-volume", self.sink])
+        except (CalledProcessError, OSError) as e:
+            raise BackendError(f"wpctl failed: {e}") from e
+
+        return self.parse_volume(result)
+
+    def set_volume(self, level: int) -> None:
+        cleaned_level: int = max(0, min(level, 100))
+        self.__run(["wpctl", "set-volume", self.sink, f"{cleaned_level / 100:.2f}"])
+
+    def set_mute(self, muted: bool) -> None:
+        self.__run(["wpctl", "set-mute", self.sink, "1" if muted else "0"])
+
+    @staticmethod
+    def parse_volume(result: str) -> VolumeState:
+        """
+        Parse the output of wpctl get-volume
+
+        Parameters:
+            result (str): e.g. "Volume: 0.40 [MUTED]"
+
+        Returns:
+            VolumeState: The volume
+        """
+        try:
+            level = float(result.split()[1])
+        except (IndexError, ValueError) as e:
+            raise BackendError(f"Could not parse the volume: {result}") from e
+
+        return VolumeState(level=round(level * 100), muted="[MUTED]" in result)
+
+    def __run(self, command: list[str]) -> str:
+        try:
+            return run_command(command)
+        except (CalledProcessError, OSError) as e:
+            raise BackendError(f"wpctl failed: {e}") from e
@@ -0,0 +1,6 @@
+from .art_server import ArtServer
+from .cases import Benchmarks
+from .fake_tools import FakeConfig, FakeTools
+from .timing import Result, measure
+
+__all__ = ["ArtServer", "Benchmarks", "FakeConfig", "FakeTools", "Result", "measure"]
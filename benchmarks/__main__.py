@@ -0,0 +1,163 @@
+"""
+Latency benchmarks, run from the repository root with
+
+    python -m benchmarks [--iterations N] [--save-baseline] [--baseline PATH]
+
+Scripted playerctl and pactl stand-ins are put on PATH and cover art is
+served from localhost, so nothing touches the real players or sound server.
+Results are compared against the stored baseline when there is one, and
+the exit code is 1 if anything regressed.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import tempfile
+
+from audio_controller import AudioController, PactlVolumeBackend, PlayerctlBackend
+from audio_controller.playback_history import PlaybackHistory
+from audio_controller.thumbnail_store import ThumbnailStore
+from main import PlayerMain
+from .art_server import ArtServer
+from .cases import Benchmarks
+from .fake_tools import FakeConfig, FakeTools
+from .timing import Result, compare, format_table, load_baseline, save_baseline
+
+DEFAULT_BASELINE: Path = Path(__file__).with_name("baseline.json")
+
+
+class RecordingClient:
+    """Takes the place of the launcher connection, keeping what was sent"""
+
+    def __init__(self) -> None:
+        self.sent: list[object] = []
+
+    def send(self, response: object) -> None:
+        self.sent.append(response)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative slowdown of p50 and p95, and memory growth (default: 0.5)",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=2.0,
+        help="slowdown in milliseconds that is always allowed (default: 2)",
+    )
+    parser.add_argument(
+        "--delay",
+        action="append",
+        default=[],
+        metavar="TOOL=SECONDS",
+        help="make a fake tool slower, e.g. playerctl=0.02",
+    )
+    parser.add_argument(
+        "--art-delay", type=float, default=0.0, help="seconds to serve cover art"
+    )
+    return parser.parse_args()
+
+
+def get_default_preferences() -> dict[str, str]:
+    """Returns the preference defaults from the manifest"""
+    manifest = json.loads(Path("manifest.json").read_text())
+    return {
+        preference["id"]: preference["default_value"]
+        for preference in manifest["preferences"]
+    }
+
+
+def use_fake_backends(directory: Path) -> None:
+    """
+    Never reach the real players or sound server, only the fake tools, and
+    keep the thumbnails and the playback history in the directory
+    """
+    AudioController.backend = PlayerctlBackend()
+    AudioController.volume_backend = PactlVolumeBackend()
+    AudioController.thumbnail_store = ThumbnailStore(Path(directory, "art"))
+    AudioController.playback_history = PlaybackHistory(
+        Path(directory, "history.sqlite3")
+    )
+
+
+def main() -> int:
+    arguments = parse_arguments()
+    config = FakeConfig()
+
+    for delay in arguments.delay:
+        tool, _, seconds = delay.partition("=")
+        config.delays[tool] = float(seconds)
+
+    with tempfile.TemporaryDirectory(prefix="media-controller-bench-") as directory:
+        tools = FakeTools(Path(directory, "tools"), config)
+        tools.install()
+        art = ArtServer(Path("images/icon.png"), arguments.art_delay)
+        art.start()
+
+        use_fake_backends(Path(directory))
+        extension = PlayerMain()
+        extension.preferences = get_default_preferences()
+        extension.apply_preferences()
+        extension._client = RecordingClient()
+        extension.warmed_up.wait()
+
+        benchmarks = Benchmarks(extension, tools, art, arguments.iterations)
+
+        try:
+            results: list[Result] = benchmarks.cold_start_cases()
+
+            assert AudioController.follower is not None
+            AudioController.follower.stop()
+            results.extend(benchmarks.run(follower=False))
+
+            AudioController.follower.start()
+            results.extend(benchmarks.run(follower=True))
+            AudioController.follower.stop()
+
+            results.extend(benchmarks.run_components())
+        finally:
+            art.stop()
+            tools.uninstall()
+
+    print(format_table(results))
+
+    if arguments.save_baseline:
+        save_baseline(results, arguments.baseline)
+        print(f"\nSaved the baseline to {arguments.baseline}")
+        return 0
+
+    if not arguments.baseline.exists():
+        print("\nNo baseline to compare against, store one with --save-baseline")
+        return 0
+
+    regressions: list[str] = compare(
+        results,
+        load_baseline(arguments.baseline),
+        arguments.tolerance,
+        arguments.slack_ms / 1000,
+    )
+
+    if regressions:
+        print("\nRegressions against the baseline:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        return 1
+
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
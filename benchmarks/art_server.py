@@ -0,0 +1,65 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import mimetypes
+import socket
+import threading
+import time
+
+
+class ArtServer:
+    """
+    Serves one image for every path over keep-alive HTTP on localhost,
+    standing in for the CDNs streaming services serve cover art from
+    """
+
+    def __init__(self, image: Path, delay: float = 0.0) -> None:
+        """
+        Parameters:
+            image (Path): The image returned for every request
+            delay (float): Seconds to wait before answering
+        """
+        self.image: bytes = image.read_bytes()
+        self.suffix: str = image.suffix
+        self.content_type: str = mimetypes.guess_type(image.name)[0] or "image/png"
+        self.delay: float = delay
+        self.requests: int = 0
+        self.__server: ThreadingHTTPServer | None = None
+
+    def url(self, name: str) -> str:
+        """Returns a URL of the image, distinct per name"""
+        assert self.__server is not None, "The server is not running"
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}/art/{name}{self.suffix}"
+
+    def start(self) -> None:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                # Like a CDN, do not hold back the body until the headers are acked
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self) -> None:
+                server.requests += 1
+                time.sleep(server.delay)
+                self.send_response(200)
+                self.send_header("Content-Type", server.content_type)
+                self.send_header("Content-Length", str(len(server.image)))
+                self.end_headers()
+                self.wfile.write(server.image)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.__server.daemon_threads = True
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
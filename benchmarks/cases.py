@@ -0,0 +1,679 @@
+from collections.abc import Callable
+from itertools import count
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from ulauncher.api.shared.event import ItemEnterEvent, KeywordQueryEvent
+
+from audio_controller import AudioController, PlayerctlBackend
+from audio_controller.command_runner import run_command
+from audio_controller.http_fetcher import HttpFetcher
+from audio_controller.playback_history import PlaybackHistory
+from audio_controller.parser import Parser
+from data_classes import Actions, CurrentMedia, PlayerSnapshot, Query
+from event_listeners import InteractionListener, KeywordListener
+from menu_builder import CommandIndex, IndexEntry, MenuBuilder, render_cache
+from .art_server import ArtServer
+from .fake_tools import FakeTools
+from .images import write_jpeg, write_png
+from .timing import Result, measure
+
+if TYPE_CHECKING:
+    from main import PlayerMain
+
+
+class KeywordQuery(str):
+    """The typed text, as the launcher hands it to a KeywordQueryEvent"""
+
+    def get_keyword(self) -> str:
+        return self.partition(" ")[0]
+
+    def get_argument(self) -> str | None:
+        return self.partition(" ")[2] or None
+
+
+class Benchmarks:
+    """The benchmark cases, run against the fake tools and the art server"""
+
+    "Arguments typed after the keyword, None is the bare keyword"
+    QUERIES: tuple[str | None, ...] = (
+        None,
+        "vol",
+        "n 5",
+        "v +5",
+        "j +30",
+        "sh",
+        "zzz",
+    )
+    "The keystrokes of typing a command, for the command index"
+    TYPING: tuple[str, ...] = ("v", "vo", "vol", "volu", "volum", "volume")
+    "Synthetic commands of the large command index, on top of the real ones"
+    INDEX_COMMANDS: int = 5000
+    "Running players of the large command index, each one is an entry"
+    INDEX_PLAYERS: int = 48
+    "Seconds to let the follower pick up a reset of the fake players"
+    FOLLOWER_SETTLE: float = 0.1
+    "Seconds to let the confirmation of a toggle finish its read before the next run"
+    CONFIRM_SETTLE: float = 0.1
+    "Tracks in the playback history the searches run against"
+    HISTORY_ENTRIES: int = 100_000
+    "Tracks recorded and written per insert sample"
+    HISTORY_BATCH: int = 1000
+    "Words the tracks of the playback history are named with"
+    HISTORY_WORDS: tuple[str, ...] = tuple(
+        "love night heart dream fire light rain blue sun moon star dance".split()
+    )
+    "Searches typed after the recent keyword"
+    HISTORY_SEARCHES: tuple[str, ...] = ("", "l", "moon", "blue moon", "zzz")
+    "Running players of the dashboard cases, like a browser with many tabs"
+    MANY_PLAYERS: tuple[str, ...] = (
+        "spotify",
+        "vlc",
+        *(f"firefox.instance{number}" for number in range(10)),
+    )
+    "Fresh interpreters started for the cold start cases, each takes a while"
+    COLD_STARTS: int = 10
+    "Width and height of the large cover art, like the originals streaming services serve"
+    LARGE_ART_SIZE: int = 3000
+    "Runs of the large cover art cases, every one stores megabytes or starts an interpreter"
+    LARGE_ART_RUNS: int = 5
+    "Snapshots parsed per iteration of the parser cases, one is too quick to time"
+    PARSES: int = 1000
+    "Labels and keys of the former `label:{{key}}` snapshot format"
+    LINE_FIELDS: tuple[tuple[str, str], ...] = (
+        ("status", "status"),
+        ("shuffle", "shuffle"),
+        ("loop", "loop"),
+        ("artUrl", "mpris:artUrl"),
+        ("artist", "xesam:artist"),
+        ("title", "xesam:title"),
+        ("album", "xesam:album"),
+        ("playerName", "playerName"),
+        ("position", "position"),
+    )
+
+    def __init__(
+        self,
+        extension: "PlayerMain",
+        tools: FakeTools,
+        art: ArtServer,
+        iterations: int,
+    ) -> None:
+        self.extension: "PlayerMain" = extension
+        self.tools: FakeTools = tools
+        self.art: ArtServer = art
+        self.iterations: int = iterations
+        self.follower: bool = False
+        self.__names = count()
+
+    def run(self, follower: bool) -> list[Result]:
+        """
+        Run every case
+
+        Parameters:
+            follower (bool): Whether the player follower keeps the snapshot current
+
+        Returns:
+            list[Result]: The results, named after the mode and the case
+        """
+        self.follower = follower
+        self.tools.set_art_url(self.art.url("now-playing"))
+        self.reset_players()
+
+        results: list[Result] = [
+            *self.keyword_cases(),
+            *self.main_page_cases(),
+            *self.interaction_cases(),
+            *self.skip_cases(),
+        ]
+
+        mode: str = "follower" if follower else "polling"
+        for result in results:
+            result.name = f"{mode}/{result.name}"
+
+        return results
+
+    def run_components(self) -> list[Result]:
+        """Run the cases that do not depend on how the player is read"""
+        return [
+            *self.thumbnail_cases(),
+            *self.fetcher_cases(),
+            *self.index_cases(),
+            *self.parser_cases(),
+            *self.dashboard_cases(),
+            *self.switch_cases(),
+            *self.history_cases(),
+            *self.breaker_cases(),
+        ]
+
+    def measure(
+        self,
+        name: str,
+        run: Callable[[], object],
+        setup: Callable[[], object] | None = None,
+        iterations: int | None = None,
+    ) -> Result:
+        return measure(
+            name,
+            run,
+            iterations or self.iterations,
+            lambda: self.tools.spawns,
+            setup,
+        )
+
+    def reset_players(self) -> None:
+        """Put the fake players back in their initial state"""
+        self.tools.reset()
+        AudioController.status_cache.invalidate()
+        # Toggles of the last run are not confirmed against the reset players
+        AudioController.optimistic_state.clear()
+
+        if self.follower:
+            time.sleep(self.FOLLOWER_SETTLE)
+        else:
+            time.sleep(self.CONFIRM_SETTLE)
+
+    @staticmethod
+    def clear_caches() -> None:
+        """Drop everything cached between keystrokes"""
+        render_cache.clear()
+        AudioController.status_cache.invalidate()
+        AudioController.media_players = (0.0, [])
+        AudioController.volume_state = (0.0, None)
+
+    def keyword_cases(self) -> list[Result]:
+        results: list[Result] = []
+        listener = KeywordListener()
+
+        for argument in self.QUERIES:
+            event = KeywordQueryEvent(KeywordQuery(f"m {argument or ''}".strip()))
+            name: str = f"keyword '{argument or ''}'"
+
+            def run() -> object:
+                return listener.on_event(event, self.extension)
+
+            def clear() -> None:
+                Benchmarks.clear_caches()
+                self.extension.command_index = CommandIndex()
+
+            results.append(self.measure(f"{name} cold", run, clear))
+            results.append(self.measure(f"{name} warm", run))
+
+        return results
+
+    def main_page_cases(self) -> list[Result]:
+        def run() -> object:
+            return self.extension.render_main_page()
+
+        return [
+            self.measure("main page cold", run, Benchmarks.clear_caches),
+            self.measure("main page warm", run),
+        ]
+
+    def interaction_cases(self) -> list[Result]:
+        data: dict[Actions, dict[str, Any]] = {
+            Actions.NEXT: {"count": 1},
+            Actions.PREV: {"count": 1},
+            Actions.SET_VOL: {"query": Query("volume", ("50",))},
+            Actions.JUMP: {
+                "trackid": "/org/mpris/MediaPlayer2/Track/1",
+                "position": 30_000_000,
+            },
+            Actions.SELECT_PLAYER: {"player": "vlc"},
+        }
+        listener = InteractionListener()
+        results: list[Result] = []
+
+        for action in Actions:
+            event = ItemEnterEvent({"action": action, **data.get(action, {})})
+            results.append(
+                self.measure(
+                    f"enter {action.name.lower()}",
+                    lambda: listener.on_event(event, self.extension),
+                    self.reset_players,
+                )
+            )
+
+        return results
+
+    def skip_cases(self) -> list[Result]:
+        """Skipping five tracks at once against five single skips"""
+        listener = InteractionListener()
+
+        def skip(steps: int, times: int) -> None:
+            for _ in range(times):
+                event = ItemEnterEvent({"action": Actions.NEXT, "count": steps})
+                listener.on_event(event, self.extension)
+
+        return [
+            self.measure("skip 5 batched", lambda: skip(5, 1), self.reset_players),
+            self.measure("skip 5 one by one", lambda: skip(1, 5), self.reset_players),
+        ]
+
+    @staticmethod
+    def art_media(art: ArtServer, name: str) -> CurrentMedia:
+        """Returns media with cover art from the art server, distinct per name"""
+        return CurrentMedia(
+            thumbnail_path=art.url(name),
+            artist="Artist",
+            title="Track",
+            player="Spotify",
+            album="Album",
+            position=None,
+        )
+
+    @staticmethod
+    def interpreter_environment() -> dict[str, str]:
+        """The environment of fresh interpreters, able to import the extension"""
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(Path.cwd()), os.environ.get("PYTHONPATH")])
+        )
+        return environment
+
+    def thumbnail_cases(self) -> list[Result]:
+        """
+        Cover art fetched and stored, downscaled when GdkPixbuf is available,
+        for the small default icon and for large PNG and JPEG originals
+        """
+        warm: CurrentMedia = self.art_media(self.art, "warm")
+        AudioController.get_media_thumbnail(warm)
+        results: list[Result] = [
+            self.measure(
+                "thumbnail cold",
+                lambda: AudioController.get_media_thumbnail(
+                    self.art_media(self.art, f"cold-{next(self.__names)}")
+                ),
+            ),
+            self.measure(
+                "thumbnail warm", lambda: AudioController.get_media_thumbnail(warm)
+            ),
+        ]
+
+        transcoder = AudioController.thumbnail_transcoder
+        if transcoder.available:
+            with tempfile.TemporaryDirectory() as directory:
+                destination = Path(directory, "icon.png")
+                results.append(
+                    self.measure(
+                        "thumbnail transcode",
+                        lambda: transcoder.transcode(
+                            AudioController.default_thumbnail, destination
+                        ),
+                    )
+                )
+        else:
+            print(
+                "GdkPixbuf is not available: thumbnails are stored as they are"
+                " downloaded, the transcode and memory cases are left out",
+                file=sys.stderr,
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            for kind, write in [("png", write_png), ("jpeg", write_jpeg)]:
+                image = Path(directory, f"art.{kind}")
+                write(image, self.LARGE_ART_SIZE)
+                name: str = f"thumbnail {self.LARGE_ART_SIZE}px {kind}"
+                results.append(self.large_thumbnail_case(name, image))
+
+                if transcoder.available:
+                    results.extend(self.thumbnail_memory_cases(name, image))
+
+        return results
+
+    def large_thumbnail_case(self, name: str, image: Path) -> Result:
+        """Fetching large cover art the player has not shown before"""
+        art = ArtServer(image)
+        art.start()
+
+        try:
+            return self.measure(
+                f"{name} cold",
+                lambda: AudioController.get_media_thumbnail(
+                    self.art_media(art, f"large-{next(self.__names)}")
+                ),
+                iterations=min(self.iterations, self.LARGE_ART_RUNS),
+            )
+        finally:
+            art.stop()
+
+    def thumbnail_memory_cases(self, name: str, image: Path) -> list[Result]:
+        """
+        The time and peak memory of showing large cover art, the original
+        loaded by the launcher against transcoding it first, each in a fresh
+        interpreter
+        """
+        script = Path(__file__).with_name("thumbnail_memory.py")
+        results: list[Result] = []
+
+        for path, arguments in [("original", []), ("transcoded", ["--transcode"])]:
+            result = Result(f"{name} {path}")
+
+            for _ in range(min(self.iterations, self.LARGE_ART_RUNS)):
+                with tempfile.TemporaryDirectory() as directory:
+                    output: str = subprocess.run(
+                        [sys.executable, str(script), str(image), directory]
+                        + arguments,
+                        check=True,
+                        stdout=subprocess.PIPE,
+                        env=self.interpreter_environment(),
+                        text=True,
+                    ).stdout
+
+                measured: dict[str, float] = json.loads(output.splitlines()[-1])
+                result.samples.append(measured["seconds"])
+                result.max_rss.append(int(measured["max_rss"]))
+
+            results.append(result)
+
+        return results
+
+    def fetcher_cases(self) -> list[Result]:
+        """Downloads over a pooled keep-alive connection against new connections"""
+        results: list[Result] = []
+
+        with tempfile.TemporaryDirectory() as directory:
+            destination = Path(directory, "art.png")
+
+            for name, fetcher in [
+                ("fetch pooled", HttpFetcher()),
+                ("fetch unpooled", HttpFetcher(max_idle_per_host=0)),
+            ]:
+                results.append(
+                    self.measure(
+                        name,
+                        lambda: fetcher.fetch(
+                            self.art.url(f"fetch-{next(self.__names)}"), destination
+                        ),
+                    )
+                )
+                fetcher.close()
+
+        return results
+
+    def index_cases(self) -> list[Result]:
+        """
+        Typing a command with the incremental index against searching every
+        time, for the real commands and for thousands of synthetic ones with
+        dozens of players, where the index is also compared with a linear
+        scan that scores and sorts every entry on each keystroke
+        """
+        snapshot: PlayerSnapshot = AudioController.get_snapshot()
+        entries = MenuBuilder.build_command_entries(
+            snapshot.status, ("spotify", "vlc", "firefox", "chromium")
+        )
+        words: tuple[str, ...] = self.HISTORY_WORDS
+        players: tuple[str, ...] = tuple(
+            f"{('firefox', 'chromium', 'vlc', 'mpv')[number % 4]}.instance{number}"
+            for number in range(self.INDEX_PLAYERS)
+        )
+        large_entries: tuple[IndexEntry, ...] = MenuBuilder.build_command_entries(
+            snapshot.status, players
+        ) + tuple(
+            IndexEntry(
+                f"command:{number}",
+                f"{words[number % 12].capitalize()} {words[number // 12 % 12]} {number}",
+            )
+            for number in range(self.INDEX_COMMANDS)
+        )
+        large: str = f"{len(large_entries)} entries"
+
+        def type_command(
+            index_entries: tuple[IndexEntry, ...], max_cached_queries: int
+        ) -> None:
+            index = CommandIndex(max_cached_queries)
+            index.set_entries(index_entries)
+
+            for keystrokes in self.TYPING:
+                index.search(keystrokes)
+
+        def scan(query: str) -> list[IndexEntry]:
+            scored = [
+                (score, position, entry)
+                for position, entry in enumerate(large_entries)
+                if (score := CommandIndex.score(query, entry.name.lower()))
+            ]
+            scored.sort(key=lambda match: (-match[0], match[1]))
+            return [entry for _, _, entry in scored]
+
+        def type_scanning() -> None:
+            for keystrokes in self.TYPING:
+                scan(keystrokes)
+
+        return [
+            self.measure("index incremental", lambda: type_command(entries, 64)),
+            self.measure("index full search", lambda: type_command(entries, 0)),
+            self.measure(
+                f"index incremental {large}", lambda: type_command(large_entries, 64)
+            ),
+            self.measure(f"index linear scan {large}", type_scanning),
+        ]
+
+    def parser_cases(self) -> list[Result]:
+        """
+        Splitting the framed snapshot in one pass against one regex scan of
+        the line format per field, for a title that spans lines
+        """
+        metadata: dict[str, str] = {
+            "status": "Playing",
+            "playerInstance": "spotify",
+            "shuffle": "false",
+            "loop": "None",
+            "playerName": "spotify",
+            "position": "61000000",
+            "mpris:length": "180000000",
+            "mpris:trackid": "spotify:track:4uLU6hMCjMI75M1A2tKUQC",
+            "mpris:artUrl": "https://i.scdn.co/image/ab67616d0000b273",
+            "xesam:album": "Album",
+            "xesam:artist": "Artist",
+            "xesam:title": "Interlude\nposition: live",
+        }
+        keys: tuple[str, ...] = PlayerctlBackend.snapshot_keys
+        framed: str = (
+            Parser.FIELD_SEPARATOR.join(metadata[key] for key in keys)
+            + Parser.RECORD_SEPARATOR
+            + "\n"
+        )
+        lines: str = "\n".join(
+            f"{label}:{metadata[key]}" for label, key in self.LINE_FIELDS
+        )
+
+        def parse_framed() -> None:
+            for _ in range(self.PARSES):
+                Parser.parse_frame(keys, framed)
+
+        def parse_regex() -> None:
+            for _ in range(self.PARSES):
+                for label, _ in self.LINE_FIELDS:
+                    Parser.extract_regex_item(label, lines, ok_if_empty=True)
+
+        return [
+            self.measure(f"parse framed x{self.PARSES}", parse_framed),
+            self.measure(f"parse regex x{self.PARSES}", parse_regex),
+        ]
+
+    def dashboard_cases(self) -> list[Result]:
+        """
+        The player select menu with many players, read in one batched query,
+        against reading every player with its own query
+        """
+        backend = PlayerctlBackend()
+
+        def read_one_by_one() -> object:
+            return {
+                player: backend.parse_snapshot(
+                    run_command(
+                        ["playerctl", "-p", player, "metadata", "--format"]
+                        + [backend.snapshot_format],
+                        False,
+                    )
+                )
+                for player in backend.get_media_players()
+            }
+
+        self.tools.reset(self.MANY_PLAYERS)
+
+        try:
+            name: str = f"player dashboard {len(self.MANY_PLAYERS)} players"
+            return [
+                self.measure(f"{name} batched", self.extension.render_players),
+                self.measure(f"{name} one by one", read_one_by_one),
+            ]
+        finally:
+            self.tools.reset()
+
+    def switch_cases(self) -> list[Result]:
+        """
+        Switching to another of many players with the concurrent switch,
+        against the former sequence of pause all, play, pause and play-pause
+        followed by a read of the new state
+        """
+        target: str = self.MANY_PLAYERS[-1]
+        backend = PlayerctlBackend()
+
+        def switch_sequentially() -> object:
+            run_command(["playerctl", "--all-players", "pause"])
+            run_command(["playerctl", "-p", target, "play"])
+            run_command(["playerctl", "-p", target, "pause"])
+            run_command(["playerctl", "-p", target, "play-pause"])
+            return backend.get_snapshot()
+
+        def setup() -> None:
+            self.tools.reset(self.MANY_PLAYERS)
+
+        try:
+            name: str = f"switch player {len(self.MANY_PLAYERS)} players"
+            return [
+                self.measure(
+                    f"{name} concurrent",
+                    lambda: AudioController.change_player(target),
+                    setup,
+                ),
+                self.measure(f"{name} sequential", switch_sequentially, setup),
+            ]
+        finally:
+            self.tools.reset()
+
+    def history_cases(self) -> list[Result]:
+        """
+        Recording tracks and writing them in batches, and searching the
+        playback history once it holds many tracks
+        """
+        tracks = count()
+        words: tuple[str, ...] = self.HISTORY_WORDS
+
+        def track() -> CurrentMedia:
+            number: int = next(tracks)
+            return CurrentMedia(
+                thumbnail_path=f"https://art.example/{number % 500}",
+                artist=f"{words[number % 7]} {words[number % 11]}",
+                title=f"{words[number % 12]} {words[number // 12 % 12]} {number}",
+                player="Spotify",
+                album=f"{words[number % 5]} {number // 12}",
+                position=None,
+            )
+
+        def record_batch() -> None:
+            for _ in range(self.HISTORY_BATCH):
+                history.record(track())
+
+            history.flush()
+
+        with tempfile.TemporaryDirectory() as directory:
+            history = PlaybackHistory(
+                Path(directory, "history.sqlite3"), self.HISTORY_ENTRIES
+            )
+            results: list[Result] = [
+                self.measure(f"history insert x{self.HISTORY_BATCH}", record_batch)
+            ]
+
+            for _ in range(self.HISTORY_ENTRIES // self.HISTORY_BATCH):
+                record_batch()
+
+            for text in self.HISTORY_SEARCHES:
+                results.append(
+                    self.measure(
+                        f"history search '{text}' {self.HISTORY_ENTRIES} tracks",
+                        lambda: history.search(text),
+                    )
+                )
+
+            history.close()
+
+        return results
+
+    def breaker_cases(self) -> list[Result]:
+        """
+        Typing while no player is running, answered by the open circuit
+        breaker against asking playerctl on every keystroke
+        """
+        listener = KeywordListener()
+        event = KeywordQueryEvent(KeywordQuery("m"))
+
+        def reopen() -> None:
+            Benchmarks.clear_caches()
+            AudioController.breaker.close()
+
+        try:
+            self.tools.reset(())
+            AudioController.breaker.close()
+            listener.on_event(event, self.extension)
+
+            return [
+                self.measure(
+                    "keyword no players breaker open",
+                    lambda: listener.on_event(event, self.extension),
+                    Benchmarks.clear_caches,
+                ),
+                self.measure(
+                    "keyword no players breaker closed",
+                    lambda: listener.on_event(event, self.extension),
+                    reopen,
+                ),
+            ]
+        finally:
+            self.tools.reset()
+            AudioController.breaker.close()
+
+    def cold_start_cases(self) -> list[Result]:
+        """
+        Importing and creating the extension in a fresh interpreter, and its
+        first query once warmed up against without the warm-up
+        """
+        script = Path(__file__).with_name("cold_start.py")
+        environment: dict[str, str] = self.interpreter_environment()
+        results: dict[str, Result] = {}
+
+        for name, arguments in [
+            ("", []),
+            (" without warm-up", ["--no-warm-up"]),
+        ]:
+            for _ in range(min(self.iterations, self.COLD_STARTS)):
+                with tempfile.TemporaryDirectory() as directory:
+                    output: str = subprocess.run(
+                        [sys.executable, str(script), directory, *arguments],
+                        check=True,
+                        stdout=subprocess.PIPE,
+                        env=environment,
+                        text=True,
+                    ).stdout
+                    self.reset_players()
+
+                timings: dict[str, float] = json.loads(output.splitlines()[-1])
+
+                for phase, seconds in timings.items():
+                    # Import and creation do not depend on the warm-up
+                    if name and phase != "first query":
+                        continue
+
+                    result_name: str = f"cold start {phase}{name}"
+                    results.setdefault(result_name, Result(result_name))
+                    results[result_name].samples.append(seconds)
+
+        return list(results.values())
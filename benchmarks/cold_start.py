@@ -0,0 +1,62 @@
+"""
+Measures a cold start in a fresh interpreter. Run by the benchmarks, with
+the fake tools already on PATH, as
+
+    python benchmarks/cold_start.py DIRECTORY [--no-warm-up]
+
+Prints the seconds it took to import the extension, to create it and to
+answer the first query as JSON. With the warm-up, the first query is sent
+once the warm-up is done, like a user opening the launcher some time after
+logging in.
+"""
+
+from pathlib import Path
+import json
+import sys
+import time
+
+
+def measure_cold_start(directory: Path, warm_up: bool) -> dict[str, float]:
+    started: float = time.perf_counter()
+    import main
+
+    imported: float = time.perf_counter()
+
+    from ulauncher.api.shared.event import KeywordQueryEvent
+
+    from benchmarks.__main__ import (
+        RecordingClient,
+        get_default_preferences,
+        use_fake_backends,
+    )
+    from benchmarks.cases import KeywordQuery
+    from event_listeners import KeywordListener
+
+    use_fake_backends(directory)
+    main.PlayerMain.warm_up_on_start = warm_up
+
+    created: float = time.perf_counter()
+    extension = main.PlayerMain()
+    initialized: float = time.perf_counter()
+
+    # The launcher sends the preferences once the extension has connected
+    extension.preferences = get_default_preferences()
+    extension.apply_preferences()
+    extension._client = RecordingClient()
+
+    if warm_up:
+        extension.warmed_up.wait()
+
+    queried: float = time.perf_counter()
+    KeywordListener().on_event(KeywordQueryEvent(KeywordQuery("mc")), extension)
+
+    return {
+        "import": imported - started,
+        "init": initialized - created,
+        "first query": time.perf_counter() - queried,
+    }
+
+
+if __name__ == "__main__":
+    timings = measure_cold_start(Path(sys.argv[1]), "--no-warm-up" not in sys.argv)
+    print(json.dumps(timings))
@@ -0,0 +1,205 @@
+"""
+A scripted stand-in for playerctl and pactl. It is copied onto PATH under
+both names by FakeTools, and reads what to answer from a JSON config and a
+JSON state file, so actions like "next" change what later queries return.
+Every invocation is appended to a log, which is how spawns are counted.
+"""
+
+from pathlib import Path
+import fcntl
+import json
+import os
+import re
+import sys
+import time
+
+TEMPLATE_PATTERN = re.compile(r"\{\{\s*([\w:]+)\s*\}\}")
+
+
+def load(variable: str) -> dict:
+    return json.loads(Path(os.environ[variable]).read_text())
+
+
+def save_state(state: dict) -> None:
+    path = Path(os.environ["BENCH_FAKE_STATE"])
+    temp = path.with_suffix(f".{os.getpid()}")
+    temp.write_text(json.dumps(state))
+    os.replace(temp, path)
+
+
+def get_metadata(config: dict, state: dict, player: str = "") -> dict[str, str]:
+    """The metadata of the given player, the active one by default"""
+    tracks: list[dict] = config["tracks"]
+    track: dict = tracks[state["track"] % len(tracks)]
+    player = player or state["player"]
+
+    # Only the active player moves, the others are paused on the same track
+    return {
+        "status": state["status"] if player == state["player"] else "Paused",
+        "shuffle": "true" if state["shuffle"] else "false",
+        "loop": state["loop"],
+        "playerName": player.split(".")[0],
+        "playerInstance": player,
+        "position": str(state["position"]),
+        "mpris:trackid": f"/org/mpris/MediaPlayer2/Track/{state['track']}",
+        "mpris:artUrl": track.get("art_url", ""),
+        "mpris:length": str(track.get("length", 0)),
+        "xesam:artist": track.get("artist", ""),
+        "xesam:title": track.get("title", ""),
+        "xesam:album": track.get("album", ""),
+    }
+
+
+def render(template: str, metadata: dict[str, str]) -> str:
+    return TEMPLATE_PATTERN.sub(lambda match: metadata.get(match[1], ""), template)
+
+
+def follow(template: str, config: dict) -> None:
+    """Print the formatted metadata on start and whenever the state changes"""
+    state_path = Path(os.environ["BENCH_FAKE_STATE"])
+    last: str | None = None
+
+    while True:
+        line = render(template, get_metadata(config, load("BENCH_FAKE_STATE")))
+
+        if line != last:
+            print(line, flush=True)
+            last = line
+
+        modified = state_path.stat().st_mtime_ns
+        while state_path.stat().st_mtime_ns == modified:
+            time.sleep(0.02)
+
+
+def playerctl(arguments: list[str], config: dict, state: dict) -> int:
+    player: str | None = None
+    following: bool = False
+    all_players: bool = False
+    ignored: set[str] = set()
+
+    while arguments and arguments[0].startswith("-") and arguments[0] != "-l":
+        option = arguments.pop(0)
+
+        if option in ("-p", "--player"):
+            player = arguments.pop(0)
+        elif option.startswith("--player="):
+            player = option.split("=", 1)[1]
+        elif option in ("-F", "--follow"):
+            following = True
+        elif option in ("-a", "--all-players"):
+            all_players = True
+        elif option.startswith("--ignore-player="):
+            ignored.update(option.split("=", 1)[1].split(","))
+
+    if not state["players"]:
+        print("No players found", file=sys.stderr)
+        return 1
+
+    command, *rest = arguments
+
+    if command == "-l":
+        print("\n".join(state["players"]))
+        return 0
+
+    if command == "metadata":
+        template: str = rest[rest.index("--format") + 1]
+
+        if following:
+            follow(template, config)
+        elif all_players:
+            for name in state["players"]:
+                if name not in ignored and name.split(".")[0] not in ignored:
+                    print(render(template, get_metadata(config, state, name)))
+        else:
+            print(render(template, get_metadata(config, state)))
+
+        return 0
+
+    # Only the active player can be playing, the others are paused already
+    active: str = state["player"]
+    if all_players and (active in ignored or active.split(".")[0] in ignored):
+        return 0
+
+    target: str = player if player and player in state["players"] else active
+    if command == "play-pause":
+        playing: bool = target == active and state["status"] == "Playing"
+        command = "pause" if playing else "play"
+
+    if command == "play":
+        # Like playerctld, a player that starts playing becomes the active one
+        state["player"] = target
+        state["status"] = "Playing"
+    elif command == "pause":
+        if target == active:
+            state["status"] = "Paused"
+    elif command in ("next", "previous"):
+        state["track"] += 1 if command == "next" else -1
+        state["position"] = 0
+    elif command == "position":
+        state["position"] = int(float(rest[0].rstrip("+-")) * 1_000_000)
+    elif command == "shuffle":
+        state["shuffle"] = not state["shuffle"]
+    elif command == "loop":
+        state["loop"] = rest[0]
+    else:
+        print(f"Unknown command {command}", file=sys.stderr)
+        return 1
+
+    save_state(state)
+    return 0
+
+
+def pactl(arguments: list[str], state: dict) -> int:
+    command, _, *rest = arguments
+    volume: int = state["volume"]
+
+    if command == "get-sink-volume":
+        channel = f"{round(volume / 100 * 65536)} / {volume:>3}% / 0.00 dB"
+        print(f"Volume: front-left: {channel},   front-right: {channel}")
+        print("        balance 0.00")
+    elif command == "get-sink-mute":
+        print(f"Mute: {'yes' if state['muted'] else 'no'}")
+    elif command == "set-sink-volume":
+        change: str = rest[0].rstrip("%")
+        if change[0] in "+-":
+            state["volume"] = max(0, volume + int(change))
+        else:
+            state["volume"] = int(change)
+        save_state(state)
+    elif command == "set-sink-mute":
+        state["muted"] = not state["muted"] if rest[0] == "toggle" else rest[0] == "1"
+        save_state(state)
+    else:
+        print(f"Unknown command {command}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def main() -> int:
+    tool: str = Path(sys.argv[0]).name
+    arguments: list[str] = sys.argv[1:]
+
+    with open(os.environ["BENCH_FAKE_LOG"], "a") as log:
+        # One line per spawn, formats may span several lines
+        log.write(f"{tool} {' '.join(arguments)!r}\n")
+
+    config: dict = load("BENCH_FAKE_CONFIG")
+    time.sleep(config["delays"].get(tool, 0))
+
+    if "-F" in arguments or "--follow" in arguments:
+        return playerctl(arguments, config, load("BENCH_FAKE_STATE"))
+
+    # Concurrent spawns read, change and write the state one at a time
+    with open(f"{os.environ['BENCH_FAKE_STATE']}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        state: dict = load("BENCH_FAKE_STATE")
+
+        if tool == "pactl":
+            return pactl(arguments, state)
+
+        return playerctl(arguments, config, state)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+import json
+import os
+import shutil
+import sys
+
+
+@dataclass
+class FakeConfig:
+    """What the fake tools answer, and how long they take to do it"""
+
+    "Seconds each tool sleeps before answering, by tool name"
+    delays: dict[str, float] = field(
+        default_factory=lambda: {"playerctl": 0.0, "pactl": 0.0}
+    )
+    "The playlist, next and previous move through it"
+    tracks: list[dict[str, str | int]] = field(
+        default_factory=lambda: [
+            {
+                "title": f"Track {number}",
+                "artist": "Artist",
+                "album": "Album",
+                "length": 180_000_000,
+                "art_url": "",
+            }
+            for number in range(10)
+        ]
+    )
+
+
+class FakeTools:
+    """
+    Puts scripted playerctl and pactl executables first on PATH, all of
+    them backed by fake_tool.py and sharing one state file
+    """
+
+    TOOLS: tuple[str, ...] = ("playerctl", "pactl")
+
+    def __init__(self, directory: Path, config: FakeConfig | None = None) -> None:
+        """
+        Parameters:
+            directory (Path): An empty directory the tools and their files go in
+            config (FakeConfig, optional): What the tools answer
+        """
+        self.directory: Path = directory
+        self.config: FakeConfig = config or FakeConfig()
+        self.bin_directory: Path = Path(directory, "bin")
+        self.config_path: Path = Path(directory, "config.json")
+        self.state_path: Path = Path(directory, "state.json")
+        self.log_path: Path = Path(directory, "spawns.log")
+
+    def install(self) -> None:
+        """Write the tools and put them on PATH for this process and its children"""
+        self.bin_directory.mkdir(parents=True, exist_ok=True)
+        source: str = Path(__file__).with_name("fake_tool.py").read_text()
+
+        for tool in self.TOOLS:
+            path = Path(self.bin_directory, tool)
+            path.write_text(f"#!{sys.executable} -S\n{source}")
+            path.chmod(0o755)
+
+        self.write_config()
+        self.reset()
+        self.log_path.touch()
+
+        os.environ["PATH"] = f"{self.bin_directory}{os.pathsep}{os.environ['PATH']}"
+        os.environ["BENCH_FAKE_CONFIG"] = str(self.config_path)
+        os.environ["BENCH_FAKE_STATE"] = str(self.state_path)
+        os.environ["BENCH_FAKE_LOG"] = str(self.log_path)
+
+    def uninstall(self) -> None:
+        """Take the tools off PATH and remove them"""
+        os.environ["PATH"] = os.pathsep.join(
+            entry
+            for entry in os.environ["PATH"].split(os.pathsep)
+            if entry != str(self.bin_directory)
+        )
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_config(self) -> None:
+        """Write the config, the tools read it on every call"""
+        self.config_path.write_text(json.dumps(asdict(self.config)))
+
+    def reset(self, players: tuple[str, ...] = ("spotify", "vlc")) -> None:
+        """
+        Put the fake players back in their initial state
+
+        Parameters:
+            players (tuple[str, ...]): The running players, none if empty
+        """
+        state = {
+            "players": list(players),
+            "player": players[0] if players else "",
+            "status": "Playing",
+            "shuffle": False,
+            "loop": "None",
+            "track": 0,
+            "position": 0,
+            "volume": 40,
+            "muted": False,
+        }
+        # Replaced in one step, the follower's playerctl may be reading it
+        temp_path = self.state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(state))
+        os.replace(temp_path, self.state_path)
+
+    @property
+    def spawns(self) -> int:
+        """The number of times the tools have been run"""
+        with open(self.log_path) as log:
+            return sum(1 for _ in log)
+
+    def set_art_url(self, url: str) -> None:
+        """Make every track report the given cover art URL"""
+        for track in self.config.tracks:
+            track["art_url"] = url
+
+        self.write_config()
@@ -0,0 +1,91 @@
+from pathlib import Path
+from random import Random
+import struct
+import zlib
+
+
+def write_png(path: Path, size: int, seed: int = 0) -> None:
+    """
+    Write a square RGB PNG of faint noise over a gradient. At 3000x3000 it
+    takes about 8 MiB, like large cover art, and stays below the download
+    limit of the fetcher.
+
+    Parameters:
+        path (Path): Where to write the image
+        size (int): The width and height in pixels
+        seed (int): Seeds the noise, the same seed writes the same image
+    """
+    random = Random(seed)
+    rows: list[bytes] = []
+
+    for row in range(size):
+        base: int = row * 240 // size
+        shade: bytes = bytes(base + (value & 0x03) for value in range(256))
+        # Every row starts with filter type 0, no filtering
+        rows.append(b"\x00" + random.randbytes(size * 3).translate(shade))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    header: bytes = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    path.write_bytes(
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_jpeg(path: Path, size: int, seed: int = 0) -> None:
+    """
+    Write a square grayscale baseline JPEG without an encoder. Every 8x8
+    block is of one shade, only the DC coefficient is coded and it walks
+    up or down a step at random, so decoding costs what any JPEG of the
+    size costs while the file stays small.
+
+    Parameters:
+        path (Path): Where to write the image, the size must be a multiple of 8
+        size (int): The width and height in pixels
+        seed (int): Seeds the shades, the same seed writes the same image
+    """
+    random = Random(seed)
+    # The DC codes: "0" keeps the shade, "10" and one bit steps down or up.
+    # The only AC code "0" ends the block.
+    codes: dict[int, str] = {0: "00", -1: "1000", 1: "1010"}
+    bits: list[str] = []
+    shade: int = 0
+
+    for _ in range((size // 8) ** 2):
+        step: int = random.choice((-1, 0, 1))
+
+        # A step is two gray levels, stay well within the range
+        if abs(shade + step) > 50:
+            step = -step
+
+        shade += step
+        bits.append(codes[step])
+
+    scan: str = "".join(bits)
+    scan += "1" * (-len(scan) % 8)
+    data: bytes = int(scan, 2).to_bytes(len(scan) // 8, "big")
+
+    def segment(marker: int, payload: bytes) -> bytes:
+        return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+    path.write_bytes(
+        b"\xff\xd8"
+        # One quantization table, the DC step of 16 is two gray levels
+        + segment(0xDB, b"\x00" + bytes([16] + [1] * 63))
+        + segment(0xC0, struct.pack(">BHHBBBB", 8, size, size, 1, 1, 0x11, 0))
+        + segment(0xC4, b"\x00" + bytes([1, 1] + [0] * 14) + bytes([0, 1]))
+        + segment(0xC4, b"\x10" + bytes([1] + [0] * 15) + bytes([0]))
+        + segment(0xDA, bytes([1, 1, 0x00, 0, 63, 0]))
+        # A 0xFF byte in the scan is followed by a stuffed zero
+        + data.replace(b"\xff", b"\xff\x00")
+        + b"\xff\xd9"
+    )
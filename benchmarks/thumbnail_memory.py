@@ -0,0 +1,51 @@
+"""
+Measures showing large cover art in a fresh interpreter, as the peak
+resident set size of a process only ever grows. Run by the benchmarks as
+
+    python benchmarks/thumbnail_memory.py IMAGE DIRECTORY [--transcode]
+
+Without --transcode the original image is loaded at icon size, like the
+launcher does with every render when thumbnails are not downscaled. With
+it, the image is transcoded into the directory first and the launcher
+loads the icon-sized copy. Prints the seconds it took and the peak
+resident set size in KiB as JSON.
+"""
+
+from pathlib import Path
+import json
+import resource
+import sys
+import time
+
+
+def measure_thumbnail(
+    image: Path, directory: Path, transcode: bool
+) -> dict[str, float]:
+    from audio_controller import thumbnail_transcoder
+    from audio_controller.thumbnail_transcoder import ThumbnailTranscoder
+
+    transcoder = ThumbnailTranscoder()
+    assert transcoder.available, "GdkPixbuf is not available"
+
+    started: float = time.perf_counter()
+    icon: Path = image
+
+    if transcode:
+        icon = Path(directory, "icon.png")
+        transcoder.transcode(image, icon)
+
+    thumbnail_transcoder.GdkPixbuf.Pixbuf.new_from_file_at_size(
+        str(icon), transcoder.size, transcoder.size
+    )
+
+    return {
+        "seconds": time.perf_counter() - started,
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+if __name__ == "__main__":
+    measured = measure_thumbnail(
+        Path(sys.argv[1]), Path(sys.argv[2]), "--transcode" in sys.argv
+    )
+    print(json.dumps(measured))
@@ -0,0 +1,180 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import statistics
+import time
+
+
+@dataclass
+class Result:
+    """The timings, spawn counts and peak memory of one benchmark"""
+
+    name: str
+    "Seconds per iteration"
+    samples: list[float] = field(default_factory=list)
+    "Tool spawns per iteration"
+    spawns: list[int] = field(default_factory=list)
+    "Peak resident set size in KiB per iteration, for the memory cases"
+    max_rss: list[int] = field(default_factory=list)
+
+    def percentile(self, percent: int) -> float:
+        """Returns the given percentile of the samples in seconds"""
+        if len(self.samples) == 1:
+            return self.samples[0]
+
+        cuts = statistics.quantiles(self.samples, n=100, method="inclusive")
+        return cuts[percent - 1]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    @property
+    def mean_spawns(self) -> float:
+        return statistics.fmean(self.spawns) if self.spawns else 0.0
+
+    @property
+    def peak_rss(self) -> int | None:
+        """The highest peak resident set size in KiB, None if not measured"""
+        return max(self.max_rss) if self.max_rss else None
+
+    def summary(self) -> dict[str, float]:
+        summary: dict[str, float] = {
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99,
+            "spawns": self.mean_spawns,
+        }
+
+        if self.peak_rss is not None:
+            summary["max_rss"] = self.peak_rss
+
+        return summary
+
+
+def measure(
+    name: str,
+    run: Callable[[], object],
+    iterations: int,
+    count_spawns: Callable[[], int],
+    setup: Callable[[], object] | None = None,
+) -> Result:
+    """
+    Time a benchmark, setup runs before every iteration and is not timed
+
+    Parameters:
+        name (str): The benchmark name
+        run (Callable[[], object]): The code to time
+        iterations (int): The number of timed runs
+        count_spawns (Callable[[], int]): Returns the total tool spawns so far
+        setup (Callable[[], object], optional): Prepares each run
+
+    Returns:
+        Result: The timings and spawn counts
+    """
+    result = Result(name)
+
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+
+        spawns_before: int = count_spawns()
+        started: float = time.perf_counter()
+        run()
+        result.samples.append(time.perf_counter() - started)
+        result.spawns.append(count_spawns() - spawns_before)
+
+    return result
+
+
+def format_table(results: list[Result]) -> str:
+    """Format the results as a table, times in milliseconds and memory in MiB"""
+    width: int = max([len(result.name) for result in results] + [9])
+    lines: list[str] = [
+        f"{'benchmark':<{width}}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'spawns':>6}"
+        f"  {'max rss':>9}"
+    ]
+
+    for result in results:
+        peak_rss: int | None = result.peak_rss
+        lines.append(
+            f"{result.name:<{width}}"
+            f"  {result.p50 * 1000:>7.2f}ms"
+            f"  {result.p95 * 1000:>7.2f}ms"
+            f"  {result.p99 * 1000:>7.2f}ms"
+            f"  {result.mean_spawns:>6.1f}"
+            + (f"  {peak_rss / 1024:>6.1f}MiB" if peak_rss is not None else "")
+        )
+
+    return "\n".join(lines)
+
+
+def save_baseline(results: list[Result], path: Path) -> None:
+    baseline = {result.name: result.summary() for result in results}
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    return json.loads(path.read_text())
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    slack: float,
+) -> list[str]:
+    """
+    Find the benchmarks that got slower or spawn more than in the baseline
+
+    Parameters:
+        results (list[Result]): The current results
+        baseline (dict[str, dict[str, float]]): The stored summaries
+        tolerance (float): The allowed relative slowdown of p50 and p95, and
+            growth of the peak memory
+        slack (float): Seconds of slowdown always allowed, for timer noise
+
+    Returns:
+        list[str]: A description of every regression
+    """
+    regressions: list[str] = []
+
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+
+        current = result.summary()
+
+        for key in ("p50", "p95"):
+            allowed: float = previous[key] * (1 + tolerance) + slack
+            if current[key] > allowed:
+                regressions.append(
+                    f"{result.name}: {key} {current[key] * 1000:.2f}ms,"
+                    f" was {previous[key] * 1000:.2f}ms"
+                )
+
+        # The follower's own reads make spawn counts vary a little
+        if current["spawns"] > previous["spawns"] + 0.5:
+            regressions.append(
+                f"{result.name}: {current['spawns']:.1f} spawns,"
+                f" was {previous['spawns']:.1f}"
+            )
+
+        if "max_rss" in current and "max_rss" in previous:
+            if current["max_rss"] > previous["max_rss"] * (1 + tolerance):
+                regressions.append(
+                    f"{result.name}: {current['max_rss'] / 1024:.1f}MiB peak memory,"
+                    f" was {previous['max_rss'] / 1024:.1f}MiB"
+                )
+
+    return regressions
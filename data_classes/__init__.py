@@ -1,19 +1,27 @@
 from .data_classes import (
     CurrentMedia,
+    PlayerCapabilities,
     PlayerStatus,
+    PlayerSnapshot,
+    HistoryEntry,
     MediaPlaybackState,
     RepeatState,
     ShuffleState,
     Actions,
     Query,
+    VolumeState,
 )
 
 __all__ = [
     "CurrentMedia",
+    "PlayerCapabilities",
     "PlayerStatus",
+    "PlayerSnapshot",
+    "HistoryEntry",
     "MediaPlaybackState",
     "RepeatState",
     "ShuffleState",
     "Actions",
     "Query",
+    "VolumeState",
 ]
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum, auto
+import time
+from typing import ClassVar
 
 
 class MediaPlaybackState(Enum):
@@ -10,6 +12,15 @@ class MediaPlaybackState(Enum):
     ERROR = auto()
     NO_PLAYER = auto()
 
+    def toggled(self) -> "MediaPlaybackState":
+        if self == MediaPlaybackState.PLAYING:
+            return MediaPlaybackState.PAUSED
+
+        if self == MediaPlaybackState.PAUSED:
+            return MediaPlaybackState.PLAYING
+
+        return self
+
 
 class ShuffleState(Enum):
     """Represents the shuffle status of the player"""
@@ -18,6 +29,15 @@ class ShuffleState(Enum):
     OFF = "Off"
     UNAVAILABLE = auto()
 
+    def toggled(self) -> "ShuffleState":
+        if self == ShuffleState.ON:
+            return ShuffleState.OFF
+
+        if self == ShuffleState.OFF:
+            return ShuffleState.ON
+
+        return self
+
 
 class RepeatState(Enum):
     """Represents the loop of the player"""
@@ -51,16 +71,57 @@ class Actions(Enum):
     SELECT_PLAYER = auto()
 
 
-@dataclass
+@dataclass(frozen=True)
+class PlayerCapabilities:
+    """Represents what a player supports, everything until known otherwise"""
+
+    "The capability each action needs, actions every player can do are left out"
+    ACTION_CAPABILITIES: ClassVar[dict[Actions, str]] = {
+        Actions.NEXT: "can_go_next",
+        Actions.PREV: "can_go_previous",
+        Actions.JUMP: "can_seek",
+        Actions.SHUFFLE: "can_shuffle",
+        Actions.REPEAT: "can_repeat",
+    }
+
+    can_go_next: bool = True
+    can_go_previous: bool = True
+    can_seek: bool = True
+    can_shuffle: bool = True
+    can_repeat: bool = True
+
+    def supports(self, action: Actions) -> bool:
+        """Whether the player can perform the action"""
+        capability: str | None = self.ACTION_CAPABILITIES.get(action)
+        return capability is None or getattr(self, capability)
+
+    def without(self, action: Actions) -> "PlayerCapabilities":
+        """Returns the capabilities without the one the action needs"""
+        capability: str | None = self.ACTION_CAPABILITIES.get(action)
+        return replace(self, **{capability: False}) if capability else self
+
+    def combine(self, other: "PlayerCapabilities") -> "PlayerCapabilities":
+        """Returns the capabilities both support"""
+        return PlayerCapabilities(
+            can_go_next=self.can_go_next and other.can_go_next,
+            can_go_previous=self.can_go_previous and other.can_go_previous,
+            can_seek=self.can_seek and other.can_seek,
+            can_shuffle=self.can_shuffle and other.can_shuffle,
+            can_repeat=self.can_repeat and other.can_repeat,
+        )
+
+
+@dataclass(frozen=True)
 class PlayerStatus:
     """Represents the status of the player"""
 
     playback_state: MediaPlaybackState
     shuffle_state: ShuffleState
     repeat_state: RepeatState
+    capabilities: PlayerCapabilities = PlayerCapabilities()
 
 
-@dataclass
+@dataclass(frozen=True)
 class CurrentMedia:
     """Represents the current media that is playing"""
 
@@ -70,9 +131,124 @@ class CurrentMedia:
     player: str
     album: str | None
     position: int | None
-
-
-@dataclass
+    "Every artist of the track, `artist` joins them for display"
+    artists: tuple[str, ...] = ()
+    "Track length in microseconds"
+    length: int | None = None
+    trackid: str | None = None
+    "Playback speed, 1.0 at normal speed"
+    rate: float = 1.0
+
+
+@dataclass(frozen=True)
+class PlayerSnapshot:
+    """Represents the player status and current media, read in a single query"""
+
+    status: PlayerStatus
+    media: CurrentMedia | None
+    "The player instance the snapshot was read from, as listed by the backend"
+    player: str = ""
+    "Monotonic time the position was read at, not compared so re-reads stay equal"
+    sampled_at: float | None = field(default=None, compare=False)
+
+    def get_position(self, now: float | None = None) -> int | None:
+        """
+        Extrapolate the position from when it was read, so it can be shown
+        and seeked from without asking the player again
+
+        Parameters:
+            now (float, optional): The monotonic time to get the position at
+
+        Returns:
+            int | None: The position in microseconds, None if it is not known
+        """
+        if self.media is None or self.media.position is None:
+            return None
+
+        position: int = self.media.position
+
+        if (
+            self.status.playback_state == MediaPlaybackState.PLAYING
+            and self.sampled_at is not None
+        ):
+            elapsed: float = (
+                time.monotonic() if now is None else now
+            ) - self.sampled_at
+            position += int(elapsed * self.media.rate * 1_000_000)
+
+        if self.media.length:
+            position = min(position, self.media.length)
+
+        return max(0, position)
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """Represents a track in the playback history"""
+
+    "The track, without its position"
+    media: CurrentMedia
+    "Unix time the track was first seen playing"
+    first_seen: float
+    "Unix time the track was last seen playing"
+    last_seen: float
+
+
+@dataclass(frozen=True)
 class Query:
     command: str
-    components: list[str]
+    components: tuple[str, ...]
+
+    def get_count(self, maximum: int) -> int:
+        """
+        Returns the repeat count of the query, e.g. 5 for "n 5", 1 if none was given
+
+        Parameters:
+            maximum (int): The largest count that is returned
+        """
+        if self.components and self.components[0].isdecimal():
+            return max(1, min(int(self.components[0]), maximum))
+
+        return 1
+
+    def get_seek_target(self, elapsed: int | None = None) -> int | None:
+        """
+        Returns the second a seek query jumps to, e.g. 90 for "j 1:30" and
+        30 seconds after the elapsed time for "j +30", None if no time was given
+
+        Parameters:
+            elapsed (int, optional): Seconds into the track, relative seeks
+                are only possible if given
+        """
+        if not self.components:
+            return None
+
+        time_str: str = self.components[0]
+        sign: str = time_str[0] if time_str[0] in "+-" else ""
+        parts: list[str] = time_str.removeprefix(sign).split(":")
+
+        if len(parts) > 3 or not all(part.isdecimal() for part in parts):
+            return None
+
+        if any(int(part) >= 60 for part in parts[1:]):
+            return None
+
+        seconds: int = 0
+        for part in parts:
+            seconds = seconds * 60 + int(part)
+
+        if not sign:
+            return seconds
+
+        if elapsed is None:
+            return None
+
+        return max(0, elapsed + seconds if sign == "+" else elapsed - seconds)
+
+
+@dataclass(frozen=True)
+class VolumeState:
+    """Represents the volume of the default output"""
+
+    level: int
+    muted: bool
@@ -1,4 +1,5 @@
 from .iteraction_listener import InteractionListener
 from .keyword_listener import KeywordListener
+from .preferences_listener import PreferencesListener
 
-__all__ = ["InteractionListener", "KeywordListener"]
+__all__ = ["InteractionListener", "KeywordListener", "PreferencesListener"]
@@ -1,13 +1,19 @@
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 import logging
-import time
 from subprocess import CalledProcessError
 from ulauncher.api.client.EventListener import EventListener
 from ulauncher.api.shared.event import ItemEnterEvent
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 
-from audio_controller import AudioController
-from data_classes import Actions, Query, CurrentMedia, PlayerStatus
+from audio_controller import (
+    AsyncAudioController,
+    AudioController,
+    BackendError,
+    UnsupportedError,
+)
+from instrumentation import recorder
+from data_classes import Actions, Query, CurrentMedia, PlayerStatus, PlayerSnapshot
 
 if TYPE_CHECKING:
     from main import PlayerMain
@@ -20,11 +26,43 @@ class InteractionListener(EventListener):
 
     "Max wait time for media change in seconds"
     MAX_WAIT: int = 3
+    "Volume change for a bare + or -"
+    VOLUME_STEP: int = 5
 
     @staticmethod
-    def under_max_wait(start_time: float) -> bool:
-        return (time.time() - start_time) < InteractionListener.MAX_WAIT
+    def track_changed(
+        action: Actions, previous_media: CurrentMedia
+    ) -> Callable[[PlayerSnapshot], bool]:
+        """
+        Build a predicate telling whether a NEXT/PREV action has taken effect
+
+        Parameters:
+            action (Actions): The action that was performed
+            previous_media (CurrentMedia): The media before the action
+
+        Returns:
+            Callable[[PlayerSnapshot], bool]: The predicate
+        """
+
+        def changed(snapshot: PlayerSnapshot) -> bool:
+            current_media = snapshot.media
+
+            if current_media is None or current_media.title != previous_media.title:
+                return True
+
+            # Going back may restart the current track instead
+            if action == Actions.PREV:
+                new_pos = current_media.position
+                old_pos = previous_media.position
+
+                if new_pos is not None and old_pos is not None:
+                    return new_pos < old_pos
 
+            return False
+
+        return changed
+
+    @recorder.timed("interaction listener")
     def on_event(  # type: ignore
         self, event: ItemEnterEvent, extension: "PlayerMain"
     ) -> None | RenderResultListAction:
@@ -42,63 +80,67 @@ class InteractionListener(EventListener):
         extension.logger.debug(str(data))
 
         action: Actions = data["action"]
-        query: Query = data.get("query", Query("", []))
-        player_status: PlayerStatus = AudioController.get_player_status()
+        query: Query = data.get("query", Query("", ()))
+        try:
+            snapshot: PlayerSnapshot = AsyncAudioController.run(
+                AsyncAudioController.get_snapshot()
+            )
+        except BackendError as e:
+            return extension.render_error("Could not reach the player", str(e))
 
-        start_time = time.time()
+        player_status: PlayerStatus = snapshot.status
 
-        previous_media: CurrentMedia | None
-        try:
-            previous_media = AudioController.get_current_media()
-        except CalledProcessError:
-            previous_media = None
+        # The item may have been shown before the player turned out not to support it
+        if not player_status.capabilities.supports(action):
+            return extension.render_error(
+                "Not supported by the player", "The action was not sent to it"
+            )
+
+        previous_media: CurrentMedia | None = snapshot.media
 
         if action == Actions.PLAYPAUSE:
             AudioController.playpause()
+            # The launcher closes, the prediction shows when it is opened again
+            AudioController.predict(action, snapshot)
         elif action in [Actions.NEXT, Actions.PREV]:
             try:
                 if previous_media is None:
                     logger.error("Something has gone very wrong")
                     raise ValueError("No previous media")
 
-                if action == Actions.NEXT:
-                    AudioController.next()
-                else:
-                    AudioController.prev()
+                count: int = int(data.get("count", 1))
 
-                current_media = AudioController.get_current_media()
                 if action == Actions.NEXT:
-                    while InteractionListener.under_max_wait(start_time):
-                        current_media = AudioController.get_current_media()
-
-                        if current_media.title != previous_media.title:
-                            break
-
-                        time.sleep(0.1)
-                elif action == Actions.PREV:
-                    while InteractionListener.under_max_wait(start_time):
-                        current_media = AudioController.get_current_media()
-
-                        if current_media.title != previous_media.title:
-                            break
-
-                        new_pos = current_media.position
-                        old_pos = previous_media.position
-
-                        if new_pos is not None and old_pos is not None:
-                            if new_pos < old_pos:
-                                break
-
-                        time.sleep(0.1)
-
-                return extension.render_main_page(action)
-            except CalledProcessError:
+                    answered_at: float = AudioController.next(count)
+                else:
+                    answered_at = AudioController.prev(count)
+            except UnsupportedError as e:
+                AudioController.mark_unsupported(snapshot.player, action)
+                return extension.render_error("Not supported by the player", str(e))
+            except (CalledProcessError, BackendError) as e:
                 return extension.render_error(
                     f"Could not play {'next' if action == Actions.NEXT else 'previous'} media",
-                    "Does the player support this action?",
+                    str(e),
                 )
+
+            try:
+                # The player has answered every skip, so the first read after
+                # that to find another track finds the final one instead of
+                # one a multi-step skip passed on the way
+                snapshot = AudioController.wait_for_change(
+                    InteractionListener.track_changed(action, previous_media),
+                    InteractionListener.MAX_WAIT,
+                    since=answered_at if count > 1 else 0.0,
+                )
+
+                return extension.render_main_page(action, snapshot, event)
+            except (CalledProcessError, BackendError) as e:
+                return extension.render_error("Could not read the new track", str(e))
         elif action == Actions.MUTE:
-            AudioController.global_volume(0)
+            try:
+                AudioController.toggle_mute()
+            except BackendError as e:
+                return extension.render_error("Could not mute", str(e))
         elif action == Actions.SET_VOL:
             try:
                 if len(query.components) == 0:
@@ -107,31 +149,70 @@ class InteractionListener(EventListener):
                     vol_component = query.components[0]
 
                 vol_amount_str: str = "".join(filter(str.isdigit, vol_component))
+                sign: str | None = next(
+                    (char for char in vol_component if char in "+-"), None
+                )
 
-                if not vol_amount_str:
-                    raise ValueError(f"{vol_component} is not a number")
+                if sign is not None:
+                    step: int = (
+                        int(vol_amount_str)
+                        if vol_amount_str
+                        else InteractionListener.VOLUME_STEP
+                    )
+                    AudioController.change_volume(step if sign == "+" else -step)
+                else:
+                    if not vol_amount_str:
+                        raise ValueError(f"{vol_component} is not a number")
 
-                vol_int: int = int(vol_amount_str)
-                AudioController.global_volume(vol_int)
+                    vol_int: int = int(vol_amount_str)
+                    AudioController.global_volume(vol_int)
             except (TypeError, ValueError) as e:
                 logger.error(
                     f"Could not parse query: {query}: {e.with_traceback(None)}"
                 )
+            except BackendError as e:
+                return extension.render_error("Could not change the volume", str(e))
+        elif action == Actions.JUMP:
+            try:
+                AudioController.set_position(data.get("trackid"), data["position"])
+            except UnsupportedError as e:
+                AudioController.mark_unsupported(snapshot.player, action)
+                return extension.render_error("Not supported by the player", str(e))
+            except (CalledProcessError, BackendError) as e:
+                return extension.render_error("Could not jump to the position", str(e))
         elif action == Actions.SHUFFLE:
-            AudioController.shuffle()
+            try:
+                AudioController.shuffle(player_status)
+            except UnsupportedError as e:
+                AudioController.mark_unsupported(snapshot.player, action)
+                return extension.render_error("Not supported by the player", str(e))
+            except (CalledProcessError, BackendError) as e:
+                return extension.render_error("Could not toggle shuffle", str(e))
+
+            AudioController.predict(action, snapshot)
         elif action == Actions.REPEAT:
-            start_time = time.time()
-            AudioController.repeat(player_status)
-
-            while InteractionListener.under_max_wait(start_time):
-                new_status = AudioController.get_player_status()
-                if new_status.repeat_state != player_status.repeat_state:
-                    break
-
-                time.sleep(0.1)
-
-            return extension.render_main_page(action)
+            try:
+                AudioController.repeat(player_status)
+            except UnsupportedError as e:
+                AudioController.mark_unsupported(snapshot.player, action)
+                return extension.render_error("Not supported by the player", str(e))
+            except (CalledProcessError, BackendError) as e:
+                return extension.render_error("Could not change repeat", str(e))
+
+            # Shown right away, and shown again as it is if the player disagrees
+            snapshot = AudioController.predict(
+                action,
+                snapshot,
+                lambda real: extension.push_results(
+                    event, extension.render_main_page(action, real)
+                ),
+            )
+
+            return extension.render_main_page(action, snapshot, event)
         elif action == Actions.PLAYER_SELECT_MENU:
-            return extension.render_players()
+            return extension.render_players(event)
         elif action == Actions.SELECT_PLAYER:
-            AudioController.change_player(data["player"])
+            try:
+                AudioController.change_player(data["player"])
+            except (CalledProcessError, BackendError) as e:
+                return extension.render_error("Could not change the player", str(e))
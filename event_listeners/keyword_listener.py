@@ -1,11 +1,14 @@
+from dataclasses import replace
 import logging
+import re
 from ulauncher.api.client.EventListener import EventListener
 from ulauncher.api.shared.event import KeywordQueryEvent
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
-from audio_controller import AudioController
+from audio_controller import AsyncAudioController, BackendError
+from instrumentation import recorder
 from menu_builder import MenuBuilder
-from data_classes import Query, MediaPlaybackState, PlayerStatus
+from data_classes import CurrentMedia, Query, MediaPlaybackState
 
 from typing import TYPE_CHECKING
 
@@ -18,6 +21,43 @@ logger = logging.getLogger(__name__)
 class KeywordListener(EventListener):
     """Listener for keyword queries"""
 
+    "Seconds the player list is reused for while typing"
+    PLAYERS_MAX_AGE: float = 5.0
+    "An alias with its argument typed right after it, like v+5 or j1:30"
+    COMPACT_COMMAND: re.Pattern[str] = re.compile(r"([a-z]+)(.*)", re.IGNORECASE)
+    "Typed before a search of the playback history"
+    RECENT_KEYWORD: str = "recent"
+    "Typed to show the latency of every phase"
+    STATS_KEYWORD: str = "stats"
+    "Seconds the volume is reused for while typing"
+    VOLUME_MAX_AGE: float = 1.0
+
+    @staticmethod
+    def parse_query(arguments: str, aliases: dict[str, str]) -> Query:
+        """
+        Split the typed arguments into the command and its components. An
+        alias is replaced by its command, also when its argument is typed
+        right after it: "j1:30" is read like "j 1:30".
+
+        Parameters:
+            arguments (str): The text typed after the keyword
+            aliases (dict[str, str]): The commands, by alias
+
+        Returns:
+            Query: The command and its components
+        """
+        command, *components = arguments.split() or [""]
+        compact = KeywordListener.COMPACT_COMMAND.fullmatch(command)
+        alias: str = compact.group(1).lower() if compact is not None else ""
+
+        if compact is not None and alias in aliases:
+            if compact.group(2):
+                components.insert(0, compact.group(2))
+            command = aliases[alias]
+
+        return Query(command, tuple(components))
+
+    @recorder.timed("keyword listener")
     def on_event(  # type: ignore
         self, event: KeywordQueryEvent, extension: "PlayerMain"
     ) -> RenderResultListAction:
@@ -33,35 +73,56 @@ class KeywordListener(EventListener):
         """
         theme: str = extension.get_theme()
         arguments: None | str = event.get_argument()
-        
-        player_status: PlayerStatus = AudioController.get_player_status()
-        playback_state: MediaPlaybackState = player_status.playback_state
+
+        # Hidden debug view, not offered by the search
+        if arguments is not None and arguments.strip().lower() == self.STATS_KEYWORD:
+            return extension.render_stats()
+
+        # The history is searched without asking the player anything
+        if arguments is not None:
+            keyword, _, text = arguments.strip().partition(" ")
+
+            if keyword.lower() == self.RECENT_KEYWORD:
+                return extension.render_recent(text)
+
+        try:
+            snapshot, players, volume = AsyncAudioController.run(
+                AsyncAudioController.get_state(
+                    players_max_age=self.PLAYERS_MAX_AGE,
+                    volume_max_age=self.VOLUME_MAX_AGE,
+                )
+            )
+        except BackendError as e:
+            return extension.render_error("Could not reach the player", str(e))
+
+        playback_state: MediaPlaybackState = snapshot.status.playback_state
 
         if arguments is None or playback_state == MediaPlaybackState.ERROR:
-            return extension.render_main_page(player_status=player_status)
-
-        command, *components = arguments.split()
-        aliases = extension.get_aliases()
-
-        alpha_command: str = "".join(filter(str.isalpha, command.lower()))
-        if alpha_command in aliases:
-            decimal_command: str = "".join(filter(str.isdecimal, command))
-            if decimal_command:
-                components.append(decimal_command)
-            command = aliases[alpha_command]
-
-        render_items: list[ExtensionResultItem]
-        query = Query(command, components)
-        if playback_state == MediaPlaybackState.NO_PLAYER:
-            render_items = MenuBuilder.build_volume_and_mute(theme, query)
-        else:
-            render_items = MenuBuilder.build_main_menu(theme=theme, query=query)
-
-        search_terms: list[str] = command.lower().split()
-        matched_search: list[ExtensionResultItem] = [
-            item
-            for item in render_items
-            if any(term in item.get_name().lower() for term in search_terms)
-        ]
-
-        return RenderResultListAction(matched_search)
+            return extension.render_main_page(
+                snapshot=snapshot, event=event, volume=volume
+            )
+
+        query = self.parse_query(arguments, extension.get_aliases(snapshot.status))
+        extension.command_index.set_entries(
+            MenuBuilder.build_command_entries(
+                snapshot.status, tuple(players), volume is not None and volume.muted
+            )
+        )
+
+        # Seek targets are worked out from the extrapolated position, the
+        # exact position is left out so the items are reused while typing
+        elapsed: int | None = MenuBuilder.get_elapsed(snapshot)
+        media: CurrentMedia | None = (
+            replace(snapshot.media, position=None) if snapshot.media else None
+        )
+
+        render_items: list[ExtensionResultItem] = []
+        for entry in extension.command_index.search(query.command):
+            item = MenuBuilder.build_command_item(
+                theme, entry, snapshot.status, query, volume, media, elapsed
+            )
+
+            if item is not None:
+                render_items.append(item)
+
+        return RenderResultListAction(render_items)
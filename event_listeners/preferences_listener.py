@@ -0,0 +1,28 @@
+from ulauncher.api.client.EventListener import EventListener
+from ulauncher.api.shared.event import PreferencesEvent, PreferencesUpdateEvent
+
+from instrumentation import recorder
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from main import PlayerMain
+
+
+class PreferencesListener(EventListener):
+    """Listener for the preferences being loaded or changed"""
+
+    @recorder.timed("preferences listener")
+    def on_event(  # type: ignore
+        self,
+        event: PreferencesEvent | PreferencesUpdateEvent,
+        extension: "PlayerMain",
+    ) -> None:
+        """
+        Apply the preferences, which the extension has already stored
+
+        Parameters:
+            event (PreferencesEvent | PreferencesUpdateEvent): The triggered event
+            extension (PlayerMain): The main extension class
+        """
+        extension.apply_preferences()
@@ -0,0 +1,3 @@
+from .latency_recorder import LatencyRecorder, PhaseSummary, recorder
+
+__all__ = ["LatencyRecorder", "PhaseSummary", "recorder"]
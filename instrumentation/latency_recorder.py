@@ -0,0 +1,174 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, TextIO, TypeVar
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PhaseSummary:
+    """The recent latency of one phase, in seconds"""
+
+    phase: str
+    count: int
+    p50: float
+    p95: float
+
+
+class LatencyRecorder:
+    """
+    Keeps the latest timings of each hot-path phase in memory, so the slow
+    phase can be found from within the launcher. Every timing can also be
+    appended to a JSON-lines trace file.
+    """
+
+    def __init__(self, window: int = 512) -> None:
+        """
+        Parameters:
+            window (int): The number of recent timings kept per phase
+        """
+        self.window: int = window
+        self.__samples: dict[str, deque[float]] = {}
+        self.__totals: dict[str, int] = {}
+        self.__counters: dict[str, int] = {}
+        self.__trace_path: Path | None = None
+        self.__trace: TextIO | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def trace_path(self) -> Path | None:
+        """The JSON-lines file every timing is appended to, if any"""
+        return self.__trace_path
+
+    @trace_path.setter
+    def trace_path(self, path: Path | None) -> None:
+        with self.__lock:
+            if path == self.__trace_path:
+                return
+
+            if self.__trace is not None:
+                self.__trace.close()
+                self.__trace = None
+
+            self.__trace_path = path
+
+    @property
+    def counters(self) -> dict[str, int]:
+        """A copy of the event counters, e.g. process spawns"""
+        with self.__lock:
+            return dict(self.__counters)
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Record one timing of a phase
+
+        Parameters:
+            phase (str): The phase, e.g. "parse"
+            seconds (float): How long it took
+        """
+        with self.__lock:
+            samples = self.__samples.get(phase)
+
+            if samples is None:
+                samples = self.__samples[phase] = deque(maxlen=self.window)
+
+            samples.append(seconds)
+            self.__totals[phase] = self.__totals.get(phase, 0) + 1
+
+            if self.__trace_path is not None:
+                self.__write_trace(phase, seconds)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Increment an event counter"""
+        with self.__lock:
+            self.__counters[counter] = self.__counters.get(counter, 0) + amount
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Context manager recording how long its body takes"""
+        started: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def timed(self, phase: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorator recording how long every call of a function takes"""
+
+        def decorator(function: Callable[..., T]) -> Callable[..., T]:
+            @wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                started: float = time.perf_counter()
+
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(phase, time.perf_counter() - started)
+
+            return wrapper
+
+        return decorator
+
+    def summarize(self) -> list[PhaseSummary]:
+        """
+        Summarize the recent timings of every phase, slowest p95 first
+
+        Returns:
+            list[PhaseSummary]: The phase summaries
+        """
+        with self.__lock:
+            phases = {
+                phase: sorted(samples) for phase, samples in self.__samples.items()
+            }
+            totals = dict(self.__totals)
+
+        summaries: list[PhaseSummary] = [
+            PhaseSummary(
+                phase=phase,
+                count=totals[phase],
+                p50=samples[(len(samples) - 1) // 2],
+                p95=samples[round((len(samples) - 1) * 0.95)],
+            )
+            for phase, samples in phases.items()
+            if samples
+        ]
+
+        return sorted(summaries, key=lambda summary: summary.p95, reverse=True)
+
+    def clear(self) -> None:
+        """Forget all timings and counters"""
+        with self.__lock:
+            self.__samples.clear()
+            self.__totals.clear()
+            self.__counters.clear()
+
+    def __write_trace(self, phase: str, seconds: float) -> None:
+        """Append a timing to the trace file, called with the lock held"""
+        assert self.__trace_path is not None
+
+        try:
+            if self.__trace is None:
+                self.__trace = open(self.__trace_path, "a", buffering=1)
+
+            line = {"time": time.time(), "phase": phase, "ms": seconds * 1000}
+            self.__trace.write(json.dumps(line) + "\n")
+        except OSError as e:
+            logger.error(
+                f"Could not write to {self.__trace_path}, tracing stopped: {e}"
+            )
+            self.__trace_path = None
+            self.__trace = None
+
+
+recorder = LatencyRecorder()
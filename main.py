@@ -1,45 +1,140 @@
 from ulauncher.api.client.Extension import Extension
-from ulauncher.api.shared.event import KeywordQueryEvent, ItemEnterEvent
+from ulauncher.api.shared.event import (
+    KeywordQueryEvent,
+    ItemEnterEvent,
+    PreferencesEvent,
+    PreferencesUpdateEvent,
+    BaseEvent,
+)
 from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
-from ulauncher.api.shared.action.DoNothingAction import DoNothingAction
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
-from audio_controller import AudioController
-from event_listeners import InteractionListener, KeywordListener
-from menu_builder import MenuBuilder
-from data_classes import PlayerStatus, MediaPlaybackState, Actions, CurrentMedia
+from ulauncher.api.shared.Response import Response
+from audio_controller import AsyncAudioController, AudioController, BackendError
+from event_listeners import InteractionListener, KeywordListener, PreferencesListener
+from instrumentation import recorder
+from menu_builder import CommandIndex, MenuBuilder, render_cache
+from data_classes import (
+    PlayerStatus,
+    PlayerSnapshot,
+    MediaPlaybackState,
+    Actions,
+    CurrentMedia,
+    VolumeState,
+)
+from dataclasses import replace
 from pathlib import Path
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 class PlayerMain(Extension):
     __keep_open: list[Actions] = [Actions.NEXT, Actions.PREV, Actions.REPEAT]
+    "Seconds a read volume is reused for when rendering"
+    __volume_max_age: float = 1.0
     __aliases = {
         "n": "next",
         "b": "previous",
+        "j": "jump",
         "m": "mute",
         "v": "volume",
         "r": "repeat",
         "s": "shuffle",
     }
+    "The aliases only depend on whether the player is paused, so both are built once"
+    __paused_aliases: dict[str, str] = {"p": "play", **__aliases}
+    __playing_aliases: dict[str, str] = {"p": "pause", **__aliases}
+    "Whether the slow first-time work is started in the background on creation"
+    warm_up_on_start: bool = True
+    "Seconds the warm-up waits for the preferences before rendering the main page"
+    __preferences_timeout: float = 10.0
 
     def __init__(self):
         super(PlayerMain, self).__init__()
         self.subscribe(KeywordQueryEvent, KeywordListener())
         self.subscribe(ItemEnterEvent, InteractionListener())
+        self.subscribe(PreferencesEvent, PreferencesListener())
+        self.subscribe(PreferencesUpdateEvent, PreferencesListener())
+        self.command_index: CommandIndex = CommandIndex()
+        self.preferences_applied: threading.Event = threading.Event()
+        self.warmed_up: threading.Event = threading.Event()
 
-    def get_aliases(self) -> dict[str, str]:
-        player_status = AudioController.get_player_status()
-        aliases = {
-            "p": "play"
-            if player_status.playback_state == MediaPlaybackState.PAUSED
-            else "pause",
+        # Connecting to the launcher does not wait for the backends
+        if self.warm_up_on_start:
+            threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+    def warm_up(self) -> None:
+        """
+        Get everything the first query needs ready in the background, and
+        render the main page once the preferences tell the theme, so the
+        first query is served like any later one
+        """
+        try:
+            AudioController.warm_up()
+            AsyncAudioController.get_loop()
+
+            if self.preferences_applied.wait(self.__preferences_timeout):
+                self.render_main_page()
+        except Exception as e:
+            logger.warning(f"Could not warm up: {e}")
+        finally:
+            self.warmed_up.set()
+
+    def get_aliases(self, player_status: PlayerStatus | None = None) -> dict[str, str]:
+        player_status = (
+            AudioController.get_player_status() if not player_status else player_status
+        )
+
+        if player_status.playback_state == MediaPlaybackState.PAUSED:
+            return self.__paused_aliases
+
+        return self.__playing_aliases
+
+    def apply_preferences(self) -> None:
+        trace_file = str(self.preferences.get("trace_file") or "").strip()
+        recorder.trace_path = Path(trace_file).expanduser() if trace_file else None
+        self.preferences_applied.set()
+
+        try:
+            cache_ttl = int(self.preferences.get("cache_ttl", 500))
+        except (TypeError, ValueError):
+            logger.error(f"Invalid cache lifetime: {self.preferences['cache_ttl']}")
+            return
+
+        AudioController.status_cache.ttl = max(0, cache_ttl) / 1000
+
+    def render_stats(self) -> RenderResultListAction:
+        hit_rates: dict[str, float] = {
+            "status": AudioController.status_cache.hit_rate,
+            "menu": render_cache.hit_rate,
+            "thumbnails": AudioController.thumbnail_store.hit_rate,
         }
 
-        aliases.update(self.__aliases)
+        return RenderResultListAction(
+            MenuBuilder.build_stats(
+                self.get_theme(), recorder.summarize(), recorder.counters, hit_rates
+            )
+        )
+
+    def render_recent(self, text: str = "") -> RenderResultListAction:
+        """Render the tracks of the playback history matching the text"""
+        entries = AudioController.playback_history.search(text)
+        icon_paths: dict[str, str] = {}
+
+        # Only art that is already stored, the history is not worth downloads
+        for entry in entries:
+            art_url: str = entry.media.thumbnail_path
+
+            if art_url and art_url not in icon_paths:
+                icon_path = AudioController.get_cached_thumbnail(entry.media)
+
+                if icon_path is not None:
+                    icon_paths[art_url] = str(icon_path)
 
-        return aliases
+        return RenderResultListAction(
+            MenuBuilder.build_recent(self.get_theme(), entries, icon_paths, text)
+        )
 
     def get_theme(self) -> str:
         return str(self.preferences["icon_theme"]).lower()
@@ -49,16 +144,22 @@ class PlayerMain(Extension):
             [MenuBuilder.build_error(self.get_theme(), title, message)]
         )
 
+    def push_results(self, event: BaseEvent, action: RenderResultListAction) -> None:
+        """Send results for an event that has already been answered"""
+        self._client.send(Response(event, action))
+
     def render_main_page(
-        self, action: Actions | None = None, player_status: PlayerStatus | None = None
+        self,
+        action: Actions | None = None,
+        snapshot: PlayerSnapshot | None = None,
+        event: BaseEvent | None = None,
+        volume: VolumeState | None = None,
     ) -> RenderResultListAction:
         logger.info(f"Current directory: {Path.cwd()}")
         theme: str = self.get_theme()
-        items: list[ExtensionResultItem] = []
 
-        player_status = (
-            AudioController.get_player_status() if not player_status else player_status
-        )
+        snapshot = AudioController.get_snapshot() if not snapshot else snapshot
+        player_status: PlayerStatus = snapshot.status
 
         playback_state: MediaPlaybackState = player_status.playback_state
         logger.debug(f"Current status: {player_status}")
@@ -66,49 +167,89 @@ class PlayerMain(Extension):
         if playback_state == MediaPlaybackState.ERROR:
             return RenderResultListAction([MenuBuilder.no_media_item(theme)])
 
+        if volume is None:
+            try:
+                volume = AudioController.get_volume(max_age=self.__volume_max_age)
+            except BackendError as e:
+                logger.warning(f"Could not read the volume: {e}")
+
         if playback_state == MediaPlaybackState.NO_PLAYER:
-            return RenderResultListAction(MenuBuilder.no_player_item(theme))
+            return RenderResultListAction(MenuBuilder.no_player_item(theme, volume))
 
-        if action is Actions.NEXT:
-            items.append(MenuBuilder.build_next_track(theme))
-        elif action is Actions.PREV:
-            items.append(MenuBuilder.build_previous_track(theme))
-        elif action is Actions.REPEAT:
-            repeat_item = MenuBuilder.build_repeat(theme, player_status)
+        if snapshot.media is None:
+            return RenderResultListAction([MenuBuilder.no_media_item(theme)])
 
-            if repeat_item:
-                items.append(repeat_item)
+        current_media: CurrentMedia = snapshot.media
+        icon_path: Path | None = AudioController.get_cached_thumbnail(current_media)
 
-        current_media: CurrentMedia = AudioController.get_current_media()
-        icon_path: Path = AudioController.get_media_thumbnail(current_media)
+        if icon_path is None:
+            icon_path = AudioController.default_thumbnail
 
-        current_media_title = f"{current_media.title}"
-        album = f" | {current_media.album}" if current_media.album else ""
-        current_media_desc = (
-            f"By {current_media.artist}{album} | {current_media.player}"
-        )
-        items.append(
-            ExtensionResultItem(
-                icon=str(icon_path),
-                name=current_media_title,
-                description=current_media_desc,
-                on_enter=DoNothingAction(),
-            )
-        )
-
-        if action in self.__keep_open:
-            return RenderResultListAction(items)
+            # Show the page right away and render it again once the art is in
+            if event is not None:
+                rendered_snapshot: PlayerSnapshot = snapshot
+                AudioController.request_thumbnail(
+                    current_media,
+                    lambda _: self.push_results(
+                        event, self.render_main_page(action, rendered_snapshot)
+                    ),
+                )
 
-        items.extend(
-            MenuBuilder.build_main_menu(theme=theme, player_status=player_status)
+        # Only whole seconds are shown, so the page is reused within a second
+        items: list[ExtensionResultItem] = MenuBuilder.build_main_page(
+            theme,
+            player_status,
+            replace(current_media, position=None),
+            str(icon_path),
+            action,
+            action in self.__keep_open,
+            volume,
+            MenuBuilder.get_elapsed(snapshot),
         )
 
         return RenderResultListAction(items)
 
-    def render_players(self) -> RenderResultListAction:
+    def render_players(
+        self,
+        event: BaseEvent | None = None,
+        snapshots: dict[str, PlayerSnapshot] | None = None,
+    ) -> RenderResultListAction:
         theme: str = self.get_theme()
 
-        items = MenuBuilder.build_player_select(theme)
+        if snapshots is None:
+            # The position is not shown, leaving it out lets the items be reused
+            snapshots = {
+                player: (
+                    replace(snapshot, media=replace(snapshot.media, position=None))
+                    if snapshot.media is not None
+                    else snapshot
+                )
+                for player, snapshot in AudioController.get_player_snapshots().items()
+            }
+
+        icon_paths: dict[str, str] = {}
+        rendered_snapshots: dict[str, PlayerSnapshot] = snapshots
+
+        for player, snapshot in snapshots.items():
+            if snapshot.media is None or not snapshot.media.thumbnail_path:
+                continue
+
+            icon_path: Path | None = AudioController.get_cached_thumbnail(
+                snapshot.media
+            )
+
+            if icon_path is not None:
+                icon_paths[player] = str(icon_path)
+            elif event is not None:
+                # Show the players right away and again as their art comes in
+                AudioController.request_thumbnail(
+                    snapshot.media,
+                    lambda _: self.push_results(
+                        event, self.render_players(snapshots=rendered_snapshots)
+                    ),
+                )
+
+        items = MenuBuilder.build_player_select(theme, snapshots, icon_paths)
 
         return RenderResultListAction(items)
 
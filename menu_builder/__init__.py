@@ -1,3 +1,5 @@
+from .command_index import CommandIndex, IndexEntry
 from .menu_builder import MenuBuilder
+from .render_cache import RenderCache, render_cache
 
-__all__ = ["MenuBuilder"]
+__all__ = ["CommandIndex", "IndexEntry", "MenuBuilder", "RenderCache", "render_cache"]
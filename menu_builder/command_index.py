@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """A searchable command, built into a menu item only when it matches"""
+
+    key: str
+    name: str
+
+
+class CommandIndex:
+    """
+    Ranks commands and players against the typed query. Matches for a query
+    are kept, so the results for "vol" are filtered from the results for
+    "vo" instead of searching every entry on each keystroke.
+    """
+
+    EXACT: int = 100
+    PREFIX: int = 80
+    WORD_PREFIX: int = 60
+    SUBSTRING: int = 40
+    SUBSEQUENCE: int = 20
+
+    def __init__(self, max_cached_queries: int = 64) -> None:
+        self.max_cached_queries: int = max_cached_queries
+        self.__entries: tuple[IndexEntry, ...] = ()
+        self.__matches: OrderedDict[str, list[tuple[int, IndexEntry]]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def entries(self) -> tuple[IndexEntry, ...]:
+        return self.__entries
+
+    def set_entries(self, entries: tuple[IndexEntry, ...]) -> None:
+        """
+        Replace the indexed entries, keeping the cached matches if unchanged
+
+        Parameters:
+            entries (tuple[IndexEntry, ...]): The entries, in their default order
+        """
+        with self.__lock:
+            if entries == self.__entries:
+                return
+
+            self.__entries = entries
+            self.__matches.clear()
+
+    @staticmethod
+    def score(query: str, name: str) -> int:
+        """
+        Score how well the query matches a lowercase name, 0 if it does not
+
+        Parameters:
+            query (str): The lowercase query
+            name (str): The lowercase name
+        """
+        if name == query:
+            return CommandIndex.EXACT
+
+        if name.startswith(query):
+            return CommandIndex.PREFIX
+
+        position: int = name.find(query)
+        if position > 0:
+            if not name[position - 1].isalnum():
+                return CommandIndex.WORD_PREFIX
+
+            return CommandIndex.SUBSTRING
+
+        remaining = iter(name)
+        if all(char in remaining for char in query):
+            return CommandIndex.SUBSEQUENCE
+
+        return 0
+
+    def search(self, query: str) -> list[IndexEntry]:
+        """
+        Find the entries matching the query, best matches first
+
+        Parameters:
+            query (str): The typed query
+
+        Returns:
+            list[IndexEntry]: The matching entries
+        """
+        query = query.lower().strip()
+
+        if not query:
+            return list(self.__entries)
+
+        with self.__lock:
+            entries: tuple[IndexEntry, ...] = self.__entries
+            candidates: list[tuple[int, IndexEntry]] | None = None
+
+            # Anything matching the query also matches all of its prefixes
+            for end in range(len(query), 0, -1):
+                candidates = self.__matches.get(query[:end])
+
+                if candidates is not None:
+                    self.__matches.move_to_end(query[:end])
+                    break
+
+            if candidates is not None and end == len(query):
+                return [entry for _, entry in candidates]
+
+            if candidates is None:
+                candidates = list(enumerate(entries))
+
+        scored = [
+            (score, position, entry)
+            for position, entry in candidates
+            if (score := CommandIndex.score(query, entry.name.lower()))
+        ]
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        matches = [(position, entry) for _, position, entry in scored]
+
+        with self.__lock:
+            # The entries may have been replaced while scoring
+            if self.__entries is entries:
+                self.__matches[query] = matches
+
+            if len(self.__matches) > self.max_cached_queries:
+                self.__matches.popitem(last=False)
+
+        return [entry for _, entry in matches]
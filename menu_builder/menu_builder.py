@@ -1,17 +1,28 @@
+from collections.abc import Callable
 import logging
+import time
 from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
 from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
 from ulauncher.api.shared.action.DoNothingAction import DoNothingAction
+from ulauncher.api.shared.action.CopyToClipboardAction import CopyToClipboardAction
 from audio_controller import AudioController
 from data_classes import (
+    CurrentMedia,
+    HistoryEntry,
+    PlayerCapabilities,
+    PlayerSnapshot,
     PlayerStatus,
     MediaPlaybackState,
     Actions,
     ShuffleState,
     RepeatState,
     Query,
+    VolumeState,
 )
+from instrumentation import PhaseSummary, recorder
+from .command_index import IndexEntry
+from .render_cache import render_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +30,22 @@ logger = logging.getLogger(__name__)
 class MenuBuilder:
     """Builds menu items"""
 
+    "The most tracks a single next/previous command skips"
+    MAX_SKIP: int = 20
+    "How the player select menu describes the playback state of a player"
+    PLAYBACK_LABELS: dict[MediaPlaybackState, str] = {
+        MediaPlaybackState.PLAYING: "Playing",
+        MediaPlaybackState.PAUSED: "Paused",
+    }
+    "Cells of the progress bar on the now playing item"
+    PROGRESS_WIDTH: int = 12
+
     @staticmethod
     def get_icon_folder(theme: str) -> str:
         return f"images/{theme}"
 
     @staticmethod
+    @render_cache.memoize
     def build_play_pause(
         theme: str, player_status: PlayerStatus
     ) -> ExtensionResultItem:
@@ -42,12 +64,14 @@ class MenuBuilder:
         )
 
     @staticmethod
-    def build_next_track(theme: str) -> ExtensionResultItem:
+    @render_cache.memoize
+    def build_next_track(theme: str, count: int = 1) -> ExtensionResultItem:
         """
         Build the next track item
 
         Args:
             theme (str): The current theme
+            count (int, optional): The number of tracks to skip
 
         Returns:
             ExtensionResultItem: The next track item
@@ -55,20 +79,22 @@ class MenuBuilder:
         icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
         return ExtensionResultItem(
             icon=f"{icon_folder}/next.svg",
-            name="Next Track",
+            name="Next Track" if count == 1 else f"Skip {count} Tracks",
             description="Go to the next song/track",
             on_enter=ExtensionCustomAction(
-                {"action": Actions.NEXT}, keep_app_open=True
+                {"action": Actions.NEXT, "count": count}, keep_app_open=True
             ),
         )
 
     @staticmethod
-    def build_previous_track(theme: str) -> ExtensionResultItem:
+    @render_cache.memoize
+    def build_previous_track(theme: str, count: int = 1) -> ExtensionResultItem:
         """
         Build the previous track item
 
         Args:
             theme (str): The current theme
+            count (int, optional): The number of tracks to go back
 
         Returns:
             ExtensionResultItem: The previous track item
@@ -76,21 +102,25 @@ class MenuBuilder:
         icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
         return ExtensionResultItem(
             icon=f"{icon_folder}/prev.svg",
-            name="Previous Track",
+            name="Previous Track" if count == 1 else f"Back {count} Tracks",
             description="Go to the previous song/track",
             on_enter=ExtensionCustomAction(
-                {"action": Actions.PREV}, keep_app_open=True
+                {"action": Actions.PREV, "count": count}, keep_app_open=True
             ),
         )
 
     @staticmethod
+    @render_cache.memoize
     def build_shuffle(
         theme: str, player_status: PlayerStatus
     ) -> ExtensionResultItem | None:
         """Build the shuffle item"""
         icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
 
-        if player_status.shuffle_state == ShuffleState.UNAVAILABLE:
+        if (
+            player_status.shuffle_state == ShuffleState.UNAVAILABLE
+            or not player_status.capabilities.can_shuffle
+        ):
             return None
             # return ExtensionResultItem(
             #     icon=f"{icon_folder}/shuffle.svg",
@@ -109,6 +139,7 @@ class MenuBuilder:
         )
 
     @staticmethod
+    @render_cache.memoize
     def build_repeat(
         theme: str, player_status: PlayerStatus
     ) -> ExtensionResultItem | None:
@@ -116,7 +147,10 @@ class MenuBuilder:
 
         icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
 
-        if player_status.repeat_state == RepeatState.UNAVAILABLE:
+        if (
+            player_status.repeat_state == RepeatState.UNAVAILABLE
+            or not player_status.capabilities.can_repeat
+        ):
             return None
             # return ExtensionResultItem(
             #     icon=f"{icon_folder}/repeat.svg",
@@ -137,39 +171,82 @@ class MenuBuilder:
         )
 
     @staticmethod
+    @render_cache.memoize
     def build_volume_and_mute(
-        theme: str, query: Query | None = None
+        theme: str, query: Query | None = None, volume: VolumeState | None = None
     ) -> list[ExtensionResultItem]:
+        return [
+            MenuBuilder.build_volume(theme, query, volume),
+            MenuBuilder.build_mute(theme, volume),
+        ]
+
+    @staticmethod
+    @render_cache.memoize
+    def build_volume(
+        theme: str, query: Query | None = None, volume: VolumeState | None = None
+    ) -> ExtensionResultItem:
+        """
+        Build the volume item, showing the current volume if it is known
+
+        Args:
+            theme (str): The current theme
+            query (Query, optional): The typed query, holding the volume to set
+            volume (VolumeState, optional): The current volume
+
+        Returns:
+            ExtensionResultItem: The volume item
+        """
         icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
-        items: list[ExtensionResultItem] = []
+        name: str = "Volume"
 
-        items.append(
-            ExtensionResultItem(
-                icon=f"{icon_folder}/volume.svg",
-                name="Volume",
-                description="Set volume between 0-100",
-                on_enter=ExtensionCustomAction(
-                    {"action": Actions.SET_VOL, "query": query}
-                ),
-            )
+        if volume is not None:
+            name = f"Volume: {volume.level}%{' (muted)' if volume.muted else ''}"
+
+        return ExtensionResultItem(
+            icon=f"{icon_folder}/volume.svg",
+            name=name,
+            description="Set volume between 0-100, or change it by +5/-5",
+            on_enter=ExtensionCustomAction({"action": Actions.SET_VOL, "query": query}),
         )
 
-        items.append(
-            ExtensionResultItem(
-                icon=f"{icon_folder}/mute.svg",
-                name="Mute",
-                description="Mute global volume",
+    @staticmethod
+    @render_cache.memoize
+    def build_mute(
+        theme: str, volume: VolumeState | None = None
+    ) -> ExtensionResultItem:
+        """
+        Build the mute item, which unmutes if the volume is muted
+
+        Args:
+            theme (str): The current theme
+            volume (VolumeState, optional): The current volume
+
+        Returns:
+            ExtensionResultItem: The mute item
+        """
+        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
+
+        if volume is not None and (volume.muted or volume.level == 0):
+            return ExtensionResultItem(
+                icon=f"{icon_folder}/volume.svg",
+                name="Unmute",
+                description="Restore global volume",
                 on_enter=ExtensionCustomAction({"action": Actions.MUTE}),
             )
-        )
 
-        return items
+        return ExtensionResultItem(
+            icon=f"{icon_folder}/mute.svg",
+            name="Mute",
+            description="Mute global volume",
+            on_enter=ExtensionCustomAction({"action": Actions.MUTE}),
+        )
 
     @staticmethod
     def build_main_menu(
         theme: str,
         player_status: PlayerStatus | None = None,
         query: Query | None = None,
+        volume: VolumeState | None = None,
     ) -> list[ExtensionResultItem]:
         """
         Build the main user interface, which contains the play/pause,
@@ -179,14 +256,14 @@ class MenuBuilder:
             theme (str): The current theme
             player_status (PlayerStatus, optional): The current player status
             components (list[str], optional): Command components
+            volume (VolumeState, optional): The current volume
 
         Returns:
             list[ExtensionResultItem]: The main user interface
         """
         items: list[ExtensionResultItem] = []
-        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
         if not query:
-            query = Query("", [])
+            query = Query("", ())
 
         player_status = (
             AudioController.get_player_status() if not player_status else player_status
@@ -194,11 +271,13 @@ class MenuBuilder:
 
         items.append(MenuBuilder.build_play_pause(theme, player_status))
 
-        items.append(MenuBuilder.build_next_track(theme))
+        if player_status.capabilities.can_go_next:
+            items.append(MenuBuilder.build_next_track(theme))
 
-        items.append(MenuBuilder.build_previous_track(theme))
+        if player_status.capabilities.can_go_previous:
+            items.append(MenuBuilder.build_previous_track(theme))
 
-        items.extend(MenuBuilder.build_volume_and_mute(theme, query))
+        items.extend(MenuBuilder.build_volume_and_mute(theme, query, volume))
 
         shuffle_item: ExtensionResultItem | None = MenuBuilder.build_shuffle(
             theme, player_status
@@ -212,47 +291,408 @@ class MenuBuilder:
         if loop_item:
             items.append(loop_item)
 
-        items.append(
-            ExtensionResultItem(
-                icon=f"{icon_folder}/switch.svg",
-                name="Change player",
-                description="Change music player",
-                on_enter=ExtensionCustomAction(
-                    {"action": Actions.PLAYER_SELECT_MENU}, keep_app_open=True
-                ),
+        items.append(MenuBuilder.build_change_player(theme))
+
+        return items
+
+    @staticmethod
+    @render_cache.memoize
+    def build_change_player(theme: str) -> ExtensionResultItem:
+        """
+        Build the change player item
+
+        Args:
+            theme (str): The current theme
+
+        Returns:
+            ExtensionResultItem: The change player item
+        """
+        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
+        return ExtensionResultItem(
+            icon=f"{icon_folder}/switch.svg",
+            name="Change player",
+            description="Change music player",
+            on_enter=ExtensionCustomAction(
+                {"action": Actions.PLAYER_SELECT_MENU}, keep_app_open=True
+            ),
+        )
+
+    @staticmethod
+    @render_cache.memoize
+    def build_now_playing(
+        media: CurrentMedia, icon_path: str, elapsed: int | None = None
+    ) -> ExtensionResultItem:
+        """
+        Build the item showing the current media
+
+        Args:
+            media (CurrentMedia): The current media
+            icon_path (str): The path to the media thumbnail
+            elapsed (int, optional): Seconds into the track, shown with a
+                progress bar if given
+
+        Returns:
+            ExtensionResultItem: The now playing item
+        """
+        album = f" | {media.album}" if media.album else ""
+        description: str = f"By {media.artist}{album} | {media.player}"
+
+        if elapsed is not None:
+            progress: str = MenuBuilder.format_progress(
+                elapsed, MenuBuilder.get_length(media)
+            )
+            description = f"{progress} | {description}"
+
+        return ExtensionResultItem(
+            icon=icon_path,
+            name=f"{media.title}",
+            description=description,
+            on_enter=DoNothingAction(),
+        )
+
+    @staticmethod
+    def get_elapsed(snapshot: PlayerSnapshot) -> int | None:
+        """Returns the extrapolated position in whole seconds, None if not known"""
+        position: int | None = snapshot.get_position()
+        return position // 1_000_000 if position is not None else None
+
+    @staticmethod
+    def get_length(media: CurrentMedia) -> int | None:
+        """Returns the track length in whole seconds, None if it is not known"""
+        return media.length // 1_000_000 if media.length else None
+
+    @staticmethod
+    def format_time(seconds: int) -> str:
+        """Returns the seconds as m:ss, or h:mm:ss for an hour or longer"""
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+
+        if hours:
+            return f"{hours}:{minutes:02}:{seconds:02}"
+
+        return f"{minutes}:{seconds:02}"
+
+    @staticmethod
+    def format_progress(elapsed: int, length: int | None = None) -> str:
+        """
+        Show the elapsed time against the track length with a bar,
+        e.g. "1:30 / 3:00 ━━━━━━──────"
+
+        Args:
+            elapsed (int): Seconds into the track
+            length (int, optional): The track length in seconds, only the
+                elapsed time is shown if not known
+
+        Returns:
+            str: The progress line
+        """
+        if not length:
+            return MenuBuilder.format_time(elapsed)
+
+        width: int = MenuBuilder.PROGRESS_WIDTH
+        filled: int = round(width * min(elapsed, length) / length)
+        bar: str = "━" * filled + "─" * (width - filled)
+
+        return (
+            f"{MenuBuilder.format_time(elapsed)} / "
+            f"{MenuBuilder.format_time(length)} {bar}"
+        )
+
+    @staticmethod
+    @render_cache.memoize
+    def build_jump(
+        theme: str,
+        query: Query,
+        media: CurrentMedia | None = None,
+        elapsed: int | None = None,
+    ) -> ExtensionResultItem | None:
+        """
+        Build the item jumping to the typed time, worked out from the
+        extrapolated position so typing does not ask the player
+
+        Args:
+            theme (str): The current theme
+            query (Query): The typed query, holding the time to jump to
+            media (CurrentMedia, optional): The current media, without its position
+            elapsed (int, optional): Seconds into the track
+
+        Returns:
+            ExtensionResultItem | None: The jump item, None without media
+        """
+        if media is None:
+            return None
+
+        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
+        length: int | None = MenuBuilder.get_length(media)
+        target: int | None = query.get_seek_target(elapsed)
+
+        if target is None:
+            return ExtensionResultItem(
+                icon=f"{icon_folder}/next.svg",
+                name="Jump to position",
+                description="Jump to a time like 1:30, or by +30/-30 seconds",
+                on_enter=DoNothingAction(),
+            )
+
+        if length:
+            target = min(target, length)
+
+        backwards: bool = elapsed is not None and target < elapsed
+
+        return ExtensionResultItem(
+            icon=f"{icon_folder}/{'prev' if backwards else 'next'}.svg",
+            name=f"Jump to {MenuBuilder.format_time(target)}",
+            description=MenuBuilder.format_progress(target, length),
+            on_enter=ExtensionCustomAction(
+                {
+                    "action": Actions.JUMP,
+                    "trackid": media.trackid,
+                    "position": target * 1_000_000,
+                }
+            ),
+        )
+
+    @staticmethod
+    @recorder.timed("menu")
+    @render_cache.memoize
+    def build_main_page(
+        theme: str,
+        player_status: PlayerStatus,
+        media: CurrentMedia,
+        icon_path: str,
+        action: Actions | None = None,
+        keep_open: bool = False,
+        volume: VolumeState | None = None,
+        elapsed: int | None = None,
+    ) -> list[ExtensionResultItem]:
+        """
+        Build the main page, showing the current media and the main menu.
+        After an action that keeps the launcher open, only the action and
+        the current media are shown.
+
+        Args:
+            theme (str): The current theme
+            player_status (PlayerStatus): The current player status
+            media (CurrentMedia): The current media
+            icon_path (str): The path to the media thumbnail
+            action (Actions, optional): The action that was just performed
+            keep_open (bool, optional): Whether the action keeps the launcher open
+            volume (VolumeState, optional): The current volume
+            elapsed (int, optional): Seconds into the track
+
+        Returns:
+            list[ExtensionResultItem]: The main page
+        """
+        items: list[ExtensionResultItem] = []
+
+        if action is Actions.NEXT:
+            items.append(MenuBuilder.build_next_track(theme))
+        elif action is Actions.PREV:
+            items.append(MenuBuilder.build_previous_track(theme))
+        elif action is Actions.REPEAT:
+            repeat_item = MenuBuilder.build_repeat(theme, player_status)
+
+            if repeat_item:
+                items.append(repeat_item)
+
+        items.append(MenuBuilder.build_now_playing(media, icon_path, elapsed))
+
+        if keep_open:
+            return items
+
+        items.extend(
+            MenuBuilder.build_main_menu(
+                theme=theme, player_status=player_status, volume=volume
             )
         )
 
         return items
 
     @staticmethod
-    def build_player_select(theme: str) -> list[ExtensionResultItem]:
+    @recorder.timed("menu")
+    def build_player_select(
+        theme: str,
+        snapshots: dict[str, PlayerSnapshot],
+        icon_paths: dict[str, str],
+    ) -> list[ExtensionResultItem]:
         """
-        Build the player select menu
+        Build the player select menu, showing what every player is doing
 
         Args:
             theme (str): The current theme
+            snapshots (dict[str, PlayerSnapshot]): The snapshot of each player
+            icon_paths (dict[str, str]): The thumbnails of the players that have one
 
         Returns:
             list[ExtensionResultItem]: The player select menu
         """
-        players: list[ExtensionResultItem] = []
-        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
+        return [
+            MenuBuilder.build_player(theme, player, snapshot, icon_paths.get(player))
+            for player, snapshot in snapshots.items()
+        ]
 
-        for player in AudioController.get_media_players():
-            players.append(
-                ExtensionResultItem(
-                    icon=f"{icon_folder}/switch.svg",
-                    name=player.split(".")[0].capitalize(),
-                    description="Press enter to select this player",
-                    on_enter=ExtensionCustomAction(
-                        {"action": Actions.SELECT_PLAYER, "player": player}
-                    ),
+    @staticmethod
+    @render_cache.memoize
+    def build_player(
+        theme: str,
+        player: str,
+        snapshot: PlayerSnapshot | None = None,
+        icon_path: str | None = None,
+    ) -> ExtensionResultItem:
+        """
+        Build the item selecting a player
+
+        Args:
+            theme (str): The current theme
+            player (str): The player, as listed by the backend
+            snapshot (PlayerSnapshot, optional): What the player is doing, without
+                its position. Only the player name is shown if not given.
+            icon_path (str, optional): The thumbnail of the current media
+
+        Returns:
+            ExtensionResultItem: The player item
+        """
+        icon_folder: str = f"{MenuBuilder.get_icon_folder(theme)}"
+        player_name: str = MenuBuilder.get_player_name(player)
+        name: str = player_name
+        description: str = "Press enter to select this player"
+
+        if snapshot is not None:
+            state: MediaPlaybackState = snapshot.status.playback_state
+            description = MenuBuilder.PLAYBACK_LABELS.get(state, "Stopped")
+
+            if snapshot.media is not None:
+                name = snapshot.media.title or player_name
+                artist = (
+                    f" | By {snapshot.media.artist}" if snapshot.media.artist else ""
                 )
-            )
-        return players
+                description = f"{description}{artist} | {player_name}"
+
+        return ExtensionResultItem(
+            icon=icon_path or f"{icon_folder}/switch.svg",
+            name=name,
+            description=description,
+            on_enter=ExtensionCustomAction(
+                {"action": Actions.SELECT_PLAYER, "player": player}
+            ),
+        )
+
+    @staticmethod
+    def get_player_name(player: str) -> str:
+        return player.split(".")[0].capitalize()
+
+    @staticmethod
+    @render_cache.memoize
+    def build_command_entries(
+        player_status: PlayerStatus, players: tuple[str, ...], muted: bool = False
+    ) -> tuple[IndexEntry, ...]:
+        """
+        Build the searchable commands, named like the items they build into
+
+        Args:
+            player_status (PlayerStatus): The current player status
+            players (tuple[str, ...]): The running players
+            muted (bool, optional): Whether the volume is muted
+
+        Returns:
+            tuple[IndexEntry, ...]: The command index entries
+        """
+        mute: IndexEntry = IndexEntry("mute", "Unmute" if muted else "Mute")
+
+        if player_status.playback_state == MediaPlaybackState.NO_PLAYER:
+            return (IndexEntry("volume", "Volume"), mute)
+
+        play_pause: str = (
+            "Pause"
+            if player_status.playback_state == MediaPlaybackState.PLAYING
+            else "Play"
+        )
+        capabilities: PlayerCapabilities = player_status.capabilities
+        entries: list[IndexEntry] = [IndexEntry("play_pause", play_pause)]
+
+        # Only what the player supports, so it is never tried
+        if capabilities.can_go_next:
+            entries.append(IndexEntry("next", "Next Track"))
+
+        if capabilities.can_go_previous:
+            entries.append(IndexEntry("previous", "Previous Track"))
+
+        if capabilities.can_seek:
+            entries.append(IndexEntry("jump", "Jump to position"))
+
+        entries.extend([IndexEntry("volume", "Volume"), mute])
+
+        if (
+            player_status.shuffle_state != ShuffleState.UNAVAILABLE
+            and capabilities.can_shuffle
+        ):
+            shuffle_str: str = player_status.shuffle_state.name.lower()
+            entries.append(IndexEntry("shuffle", f"Shuffle {shuffle_str}"))
+
+        if (
+            player_status.repeat_state != RepeatState.UNAVAILABLE
+            and capabilities.can_repeat
+        ):
+            repeat_str: str = player_status.repeat_state.name.lower()
+            entries.append(IndexEntry("repeat", f"Repeat: {repeat_str.capitalize()}"))
+
+        entries.append(IndexEntry("change_player", "Change player"))
+        entries.extend(
+            IndexEntry(f"player:{player}", MenuBuilder.get_player_name(player))
+            for player in players
+        )
+
+        return tuple(entries)
+
+    @staticmethod
+    @recorder.timed("menu")
+    def build_command_item(
+        theme: str,
+        entry: IndexEntry,
+        player_status: PlayerStatus,
+        query: Query,
+        volume: VolumeState | None = None,
+        media: CurrentMedia | None = None,
+        elapsed: int | None = None,
+    ) -> ExtensionResultItem | None:
+        """
+        Build the menu item for a matched command
+
+        Args:
+            theme (str): The current theme
+            entry (IndexEntry): The matched command
+            player_status (PlayerStatus): The current player status
+            query (Query): The typed query
+            volume (VolumeState, optional): The current volume
+            media (CurrentMedia, optional): The current media, without its position
+            elapsed (int, optional): Seconds into the track
+
+        Returns:
+            ExtensionResultItem | None: The menu item
+        """
+        if entry.key.startswith("player:"):
+            return MenuBuilder.build_player(theme, entry.key.removeprefix("player:"))
+
+        builders: dict[str, Callable[[], ExtensionResultItem | None]] = {
+            "play_pause": lambda: MenuBuilder.build_play_pause(theme, player_status),
+            "next": lambda: MenuBuilder.build_next_track(
+                theme, query.get_count(MenuBuilder.MAX_SKIP)
+            ),
+            "previous": lambda: MenuBuilder.build_previous_track(
+                theme, query.get_count(MenuBuilder.MAX_SKIP)
+            ),
+            "jump": lambda: MenuBuilder.build_jump(theme, query, media, elapsed),
+            "volume": lambda: MenuBuilder.build_volume(theme, query, volume),
+            "mute": lambda: MenuBuilder.build_mute(theme, volume),
+            "shuffle": lambda: MenuBuilder.build_shuffle(theme, player_status),
+            "repeat": lambda: MenuBuilder.build_repeat(theme, player_status),
+            "change_player": lambda: MenuBuilder.build_change_player(theme),
+        }
+
+        return builders[entry.key]()
 
     @staticmethod
+    @render_cache.memoize
     def no_media_item(theme: str) -> ExtensionResultItem:
         """
         Build the no media item
@@ -272,12 +712,16 @@ class MenuBuilder:
         )
 
     @staticmethod
-    def no_player_item(theme: str) -> list[ExtensionResultItem]:
+    @render_cache.memoize
+    def no_player_item(
+        theme: str, volume: VolumeState | None = None
+    ) -> list[ExtensionResultItem]:
         """
         Build the no player item
 
         Parameters:
             theme (str): The current theme
+            volume (VolumeState, optional): The current volume
 
         Returns:
             ExtensionResultItem: The no player item
@@ -292,7 +736,140 @@ class MenuBuilder:
                 on_enter=HideWindowAction(),
             )
         )
-        items.extend(MenuBuilder.build_volume_and_mute(theme))
+        items.extend(MenuBuilder.build_volume_and_mute(theme, volume=volume))
+        return items
+
+    @staticmethod
+    def format_ago(seconds: float) -> str:
+        """Returns how long ago something happened, like 5 min ago"""
+        if seconds < 60:
+            return "just now"
+
+        if seconds < 3600:
+            return f"{int(seconds // 60)} min ago"
+
+        if seconds < 86400:
+            return f"{int(seconds // 3600)} h ago"
+
+        days: int = int(seconds // 86400)
+        return f"{days} day{'s' if days > 1 else ''} ago"
+
+    @staticmethod
+    @recorder.timed("menu")
+    def build_recent(
+        theme: str,
+        entries: list[HistoryEntry],
+        icon_paths: dict[str, str],
+        text: str = "",
+    ) -> list[ExtensionResultItem]:
+        """
+        Build the recent view, listing the tracks of the playback history
+
+        Args:
+            theme (str): The current theme
+            entries (list[HistoryEntry]): The tracks, most recently seen first
+            icon_paths (dict[str, str]): The stored thumbnails, by art URL
+            text (str, optional): The text the history was searched for
+
+        Returns:
+            list[ExtensionResultItem]: The recent items
+        """
+        icon: str = f"{MenuBuilder.get_icon_folder(theme)}/icon.png"
+
+        if not entries:
+            return [
+                ExtensionResultItem(
+                    icon=icon,
+                    name=(
+                        f"No recent tracks match {text}" if text else "No recent tracks"
+                    ),
+                    description="Tracks show up here once they have played",
+                    on_enter=DoNothingAction(),
+                )
+            ]
+
+        now: float = time.time()
+        items: list[ExtensionResultItem] = []
+
+        for entry in entries:
+            media: CurrentMedia = entry.media
+            artist: str = f"By {media.artist} | " if media.artist else ""
+            album: str = f"{media.album} | " if media.album else ""
+            items.append(
+                ExtensionResultItem(
+                    icon=icon_paths.get(media.thumbnail_path, icon),
+                    name=media.title,
+                    description=(
+                        f"{artist}{album}{media.player}"
+                        f" | {MenuBuilder.format_ago(now - entry.last_seen)}"
+                    ),
+                    on_enter=CopyToClipboardAction(
+                        f"{media.artist} - {media.title}"
+                        if media.artist
+                        else media.title
+                    ),
+                )
+            )
+
+        return items
+
+    @staticmethod
+    def build_stats(
+        theme: str,
+        summaries: list[PhaseSummary],
+        counters: dict[str, int],
+        hit_rates: dict[str, float],
+    ) -> list[ExtensionResultItem]:
+        """
+        Build the debug view of the recent latency of every phase
+
+        Args:
+            theme (str): The current theme
+            summaries (list[PhaseSummary]): The phase timings, slowest first
+            counters (dict[str, int]): The event counters, e.g. process spawns
+            hit_rates (dict[str, float]): The hit rate of every cache
+
+        Returns:
+            list[ExtensionResultItem]: The stats items
+        """
+        icon: str = f"{MenuBuilder.get_icon_folder(theme)}/icon.png"
+        spawns: str = ", ".join(
+            f"{counter.removeprefix('spawn ')}: {amount}"
+            for counter, amount in sorted(counters.items())
+            if counter.startswith("spawn ")
+        )
+        caches: str = ", ".join(
+            f"{cache}: {rate:.0%}" for cache, rate in hit_rates.items()
+        )
+
+        items: list[ExtensionResultItem] = [
+            ExtensionResultItem(
+                icon=icon,
+                name="Spawned processes",
+                description=spawns or "None yet",
+                on_enter=DoNothingAction(),
+            ),
+            ExtensionResultItem(
+                icon=icon,
+                name="Cache hit rates",
+                description=caches,
+                on_enter=DoNothingAction(),
+            ),
+        ]
+
+        for summary in summaries:
+            items.append(
+                ExtensionResultItem(
+                    icon=icon,
+                    name=(
+                        f"{summary.phase}: p50 {summary.p50 * 1000:.1f} ms,"
+                        f" p95 {summary.p95 * 1000:.1f} ms"
+                    ),
+                    description=f"{summary.count} timings",
+                    on_enter=DoNothingAction(),
+                )
+            )
+
         return items
 
     @staticmethod
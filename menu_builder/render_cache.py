@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import wraps
+from inspect import BoundArguments, Signature, signature
+from typing import Any, TypeVar
+import threading
+
+T = TypeVar("T")
+
+
+class RenderCache:
+    """
+    Memoizes built menu items. Almost nothing changes between keystrokes,
+    so items are keyed on everything they are built from and reused.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """
+        Parameters:
+            max_entries (int): The number of built results kept
+        """
+        self.enabled: bool = True
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups served from the cache"""
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def get(self, key: Hashable, build: Callable[[], T]) -> T:
+        """
+        Returns the result built for the key, building it on a miss
+
+        Parameters:
+            key (Hashable): Everything the result is built from
+            build (Callable[[], T]): Builds the result
+
+        Returns:
+            T: The result, lists are copied so callers may extend them
+        """
+        if not self.enabled:
+            return build()
+
+        try:
+            with self.__lock:
+                result = self.__entries[key]
+                self.__entries.move_to_end(key)
+                self.hits += 1
+        except KeyError:
+            result = build()
+
+            with self.__lock:
+                self.misses += 1
+                self.__entries[key] = result
+
+                if len(self.__entries) > self.max_entries:
+                    self.__entries.popitem(last=False)
+        except TypeError:
+            # Unhashable arguments, e.g. a query, are built every time
+            return build()
+
+        return list(result) if isinstance(result, list) else result
+
+    def memoize(self, build: Callable[..., T]) -> Callable[..., T]:
+        """
+        Decorator memoizing a builder on its arguments, which must be all it
+        depends on. Arguments are bound to the builder's parameters, so the
+        same call made with keywords or defaults shares one entry.
+        """
+        parameters: Signature = signature(build)
+
+        @wraps(build)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            bound: BoundArguments = parameters.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key: tuple = (build.__qualname__, bound.args, tuple(bound.kwargs.items()))
+
+            return self.get(key, lambda: build(*bound.args, **bound.kwargs))
+
+        return wrapper
+
+
+render_cache = RenderCache()
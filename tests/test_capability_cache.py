@@ -0,0 +1,65 @@
+import unittest
+
+from audio_controller.capability_cache import CapabilityCache
+from data_classes import Actions, PlayerCapabilities
+
+
+class CapabilityCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = CapabilityCache()
+        self.reported = PlayerCapabilities()
+
+    def test_reported(self) -> None:
+        reported = PlayerCapabilities(can_seek=False)
+
+        self.assertEqual(self.cache.resolve("vlc", reported, ("vlc", "1")), reported)
+
+    def test_marked_for_the_same_track(self) -> None:
+        self.cache.resolve("vlc", self.reported, ("vlc", "1"))
+        self.cache.mark_unsupported("vlc", Actions.NEXT)
+
+        capabilities = self.cache.resolve("vlc", self.reported, ("vlc", "1"))
+
+        self.assertFalse(capabilities.can_go_next)
+        self.assertTrue(capabilities.can_go_previous)
+
+    def test_cleared_by_another_track(self) -> None:
+        self.cache.resolve("vlc", self.reported, ("vlc", "1"))
+        self.cache.mark_unsupported("vlc", Actions.NEXT)
+
+        self.assertEqual(
+            self.cache.resolve("vlc", self.reported, ("vlc", "2")), self.reported
+        )
+        self.assertEqual(
+            self.cache.resolve("vlc", self.reported, ("vlc", "1")), self.reported
+        )
+
+    def test_cleared_by_another_identity(self) -> None:
+        self.cache.resolve("chromium.1", self.reported, ("chromium", "1"))
+        self.cache.mark_unsupported("chromium.1", Actions.SHUFFLE)
+
+        capabilities = self.cache.resolve("chromium.1", self.reported, ("firefox", "1"))
+
+        self.assertTrue(capabilities.can_shuffle)
+
+    def test_players_are_kept_apart(self) -> None:
+        self.cache.resolve("vlc", self.reported, ("vlc", "1"))
+        self.cache.resolve("mpv", self.reported, ("mpv", "1"))
+        self.cache.mark_unsupported("vlc", Actions.REPEAT)
+
+        self.assertTrue(
+            self.cache.resolve("mpv", self.reported, ("mpv", "1")).can_repeat
+        )
+
+    def test_retain(self) -> None:
+        self.cache.resolve("vlc", self.reported, ("vlc", "1"))
+        self.cache.mark_unsupported("vlc", Actions.NEXT)
+        self.cache.retain(["mpv"])
+
+        self.assertTrue(
+            self.cache.resolve("vlc", self.reported, ("vlc", "1")).can_go_next
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
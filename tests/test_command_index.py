@@ -0,0 +1,112 @@
+from importlib.util import find_spec
+from random import Random
+import unittest
+
+if find_spec("ulauncher") is None:
+    raise unittest.SkipTest("Ulauncher is not installed")
+
+from menu_builder import CommandIndex, IndexEntry
+
+"The commands of the menu, with running players and thousands of synthetic ones"
+ENTRIES: tuple[IndexEntry, ...] = (
+    IndexEntry("play_pause", "Pause"),
+    IndexEntry("next", "Next Track"),
+    IndexEntry("previous", "Previous Track"),
+    IndexEntry("jump", "Jump to position"),
+    IndexEntry("volume", "Volume"),
+    IndexEntry("mute", "Mute"),
+    IndexEntry("shuffle", "Shuffle"),
+    IndexEntry("repeat", "Repeat"),
+    IndexEntry("player:spotify", "Spotify"),
+    IndexEntry("player:vlc", "VLC media player"),
+    IndexEntry("player:firefox", "Firefox - Music video"),
+    *(
+        IndexEntry(f"command:{number}", f"Command {number % 97} item-{number}")
+        for number in range(500)
+    ),
+)
+"Queries typed with every keystroke, including ones that stop matching on the way"
+QUERIES: tuple[str, ...] = (
+    "next track",
+    "prev",
+    "volume",
+    "vlc",
+    "mute",
+    "pt",
+    "command 42 item-42",
+    "item-499",
+    "spotifyx",
+    "  Re pEAT ",
+    "-",
+)
+
+
+class CommandIndexTest(unittest.TestCase):
+    """Results filtered from earlier queries are the ones a full scan finds"""
+
+    def setUp(self) -> None:
+        self.index = CommandIndex()
+        self.index.set_entries(ENTRIES)
+
+    def assertScanned(
+        self, query: str, entries: tuple[IndexEntry, ...] = ENTRIES
+    ) -> None:
+        """The index finds what a fresh index, scanning every entry, finds"""
+        scan = CommandIndex()
+        scan.set_entries(entries)
+
+        self.assertEqual(self.index.search(query), scan.search(query), repr(query))
+
+    def test_typing(self) -> None:
+        for query in QUERIES:
+            for end in range(len(query) + 1):
+                self.assertScanned(query[:end])
+
+    def test_backspace(self) -> None:
+        for query in QUERIES:
+            for end in (*range(len(query) + 1), *range(len(query), -1, -1)):
+                self.assertScanned(query[:end])
+
+    def test_edits(self) -> None:
+        random = Random(0xC0DE)
+
+        for query in QUERIES:
+            typed: str = ""
+
+            for _ in range(40):
+                position: int = random.randint(0, len(typed))
+                edit: int = random.randrange(3)
+
+                # Insert, delete or replace anywhere, not only at the end
+                if edit == 0 or not typed:
+                    typed = typed[:position] + random.choice(query) + typed[position:]
+                elif edit == 1:
+                    typed = typed[:position] + typed[position + 1 :]
+                else:
+                    typed = (
+                        typed[:position] + random.choice(query) + typed[position + 1 :]
+                    )
+
+                self.assertScanned(typed)
+
+    def test_few_cached_queries(self) -> None:
+        self.index = CommandIndex(max_cached_queries=2)
+        self.index.set_entries(ENTRIES)
+
+        for query in QUERIES:
+            for end in (*range(len(query) + 1), *range(len(query), -1, -1)):
+                self.assertScanned(query[:end])
+
+    def test_replaced_entries(self) -> None:
+        for query in ("v", "vo", "vol"):
+            self.index.search(query)
+
+        # The players went away, the matches of the old entries are dropped
+        self.index.set_entries(ENTRIES[:8])
+
+        for query in ("vol", "volu", "v", "vl"):
+            self.assertScanned(query, ENTRIES[:8])
+
+
+if __name__ == "__main__":
+    unittest.main()
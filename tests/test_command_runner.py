@@ -0,0 +1,166 @@
+from pathlib import Path
+from unittest import mock
+import os
+import sys
+import tempfile
+import time
+import traceback
+import unittest
+
+from audio_controller import (
+    AsyncAudioController,
+    AudioController,
+    BackendError,
+    PlayerctlBackend,
+)
+from audio_controller import command_runner
+from audio_controller.circuit_breaker import CircuitBreaker
+from audio_controller.status_cache import StatusCache
+from audio_controller.command_runner import run_command, run_commands
+from data_classes import MediaPlaybackState
+
+"Seconds the fake playerctl is given before it is killed"
+TIMEOUT: float = 0.2
+
+
+class FakePlayerctlTest(unittest.TestCase):
+    """Runs the commands against a playerctl that never answers"""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.calls = Path(directory.name, "calls")
+        self.calls.touch()
+
+        # exec, so that killing the script kills the sleep holding the pipe
+        playerctl = Path(directory.name, "playerctl")
+        playerctl.write_text(f'#!/bin/sh\necho "$@" >> {self.calls}\nexec sleep 30\n')
+        playerctl.chmod(0o755)
+
+        path: str = f"{directory.name}{os.pathsep}{os.environ.get('PATH', '')}"
+        for patch in (
+            mock.patch.dict(os.environ, {"PATH": path}),
+            mock.patch.object(command_runner, "COMMAND_TIMEOUT", TIMEOUT),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    @property
+    def call_count(self) -> int:
+        return self.calls.read_text().count("\n")
+
+
+class CommandTimeoutTest(FakePlayerctlTest):
+    def test_run_command(self) -> None:
+        started: float = time.monotonic()
+
+        with self.assertRaises(BackendError):
+            run_command(["playerctl", "status"])
+
+        self.assertLess(time.monotonic() - started, TIMEOUT + 1)
+
+    def test_run_commands(self) -> None:
+        started: float = time.monotonic()
+
+        with self.assertRaises(BackendError):
+            run_commands([["playerctl", "pause"], ["playerctl", "play"]])
+
+        self.assertLess(time.monotonic() - started, TIMEOUT + 1)
+        self.assertEqual(self.call_count, 2)
+
+
+class BreakerTimeoutTest(FakePlayerctlTest):
+    """Reads of a hung playerctl open the circuit breaker, which then backs off"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.breaker = CircuitBreaker(base_delay=0.5, failure_threshold=3)
+
+        for patch in (
+            mock.patch.object(AudioController, "backend", PlayerctlBackend()),
+            mock.patch.object(AudioController, "breaker", self.breaker),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def open_breaker(self) -> None:
+        for _ in range(self.breaker.failure_threshold - 1):
+            with self.assertRaises(BackendError):
+                AudioController.read_snapshot()
+
+        snapshot = AudioController.read_snapshot()
+
+        self.assertEqual(snapshot.status.playback_state, MediaPlaybackState.ERROR)
+        self.assertTrue(self.breaker.is_open)
+        self.assertEqual(self.call_count, self.breaker.failure_threshold)
+
+    def test_opens_after_threshold(self) -> None:
+        self.open_breaker()
+
+        started: float = time.monotonic()
+        snapshot = AudioController.read_snapshot()
+
+        self.assertEqual(snapshot.status.playback_state, MediaPlaybackState.ERROR)
+        self.assertLess(time.monotonic() - started, TIMEOUT)
+        self.assertEqual(self.call_count, self.breaker.failure_threshold)
+
+    def test_backs_off(self) -> None:
+        self.open_breaker()
+        time.sleep(self.breaker.base_delay)
+
+        # One probe is let through, it fails again and doubles the delay
+        AudioController.read_snapshot()
+        self.assertEqual(self.call_count, self.breaker.failure_threshold + 1)
+
+        time.sleep(self.breaker.base_delay)
+        AudioController.read_snapshot()
+
+        self.assertTrue(self.breaker.is_open)
+        self.assertEqual(self.call_count, self.breaker.failure_threshold + 1)
+
+
+class AsyncSnapshotTimeoutTest(FakePlayerctlTest):
+    """
+    A snapshot read of a hung playerctl fails by the command timing out, so
+    that neither the process nor the thread reading it are left running
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        for patch in (
+            mock.patch.object(AudioController, "backend", PlayerctlBackend()),
+            mock.patch.object(AudioController, "breaker", CircuitBreaker()),
+            mock.patch.object(AudioController, "follower", None),
+            mock.patch.object(AudioController, "status_cache", StatusCache()),
+            mock.patch.object(AsyncAudioController, "call_timeout", TIMEOUT * 5),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    @staticmethod
+    def reading_threads() -> list[int]:
+        """The threads that are still waiting for a command"""
+        return [
+            thread
+            for thread, frame in sys._current_frames().items()
+            if any(
+                frame.f_code is run_command.__code__
+                for frame, _ in traceback.walk_stack(frame)
+            )
+        ]
+
+    def test_nothing_left_running(self) -> None:
+        with self.assertRaises(BackendError):
+            AsyncAudioController.run(AsyncAudioController.get_snapshot())
+
+        self.assertEqual(self.call_count, 1)
+        self.assertEqual(self.reading_threads(), [])
+
+        # Every process was waited for, none is left to reap
+        with self.assertRaises(ChildProcessError):
+            os.waitpid(-1, os.WNOHANG)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from importlib.util import find_spec
+import unittest
+
+from data_classes import Query
+
+if find_spec("ulauncher") is None:
+    raise unittest.SkipTest("Ulauncher is not installed")
+
+from event_listeners import KeywordListener
+
+"Like the aliases of the extension while a player is playing"
+ALIASES: dict[str, str] = {
+    "p": "pause",
+    "n": "next",
+    "b": "previous",
+    "j": "jump",
+    "m": "mute",
+    "v": "volume",
+    "r": "repeat",
+    "s": "shuffle",
+}
+
+
+class ParseQueryTest(unittest.TestCase):
+    def test_parse_query(self) -> None:
+        cases: tuple[tuple[str, Query], ...] = (
+            ("j1:30", Query("jump", ("1:30",))),
+            ("j 1:30", Query("jump", ("1:30",))),
+            ("J1:30", Query("jump", ("1:30",))),
+            ("j+30", Query("jump", ("+30",))),
+            ("j-1:00", Query("jump", ("-1:00",))),
+            ("j1:02:03", Query("jump", ("1:02:03",))),
+            ("v+5", Query("volume", ("+5",))),
+            ("v-5", Query("volume", ("-5",))),
+            ("v30", Query("volume", ("30",))),
+            ("v 30", Query("volume", ("30",))),
+            ("n5", Query("next", ("5",))),
+            ("n 5", Query("next", ("5",))),
+            ("b3 x", Query("previous", ("3", "x"))),
+            ("p", Query("pause", ())),
+            ("  n   5 ", Query("next", ("5",))),
+            ("vol", Query("vol", ())),
+            ("volume 30", Query("volume", ("30",))),
+            ("next5", Query("next5", ())),
+            ("x1:30", Query("x1:30", ())),
+            ("1:30", Query("1:30", ())),
+            ("+5", Query("+5", ())),
+            ("", Query("", ())),
+            ("   ", Query("", ())),
+        )
+
+        for arguments, expected in cases:
+            with self.subTest(arguments=arguments):
+                self.assertEqual(
+                    KeywordListener.parse_query(arguments, ALIASES), expected
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,488 @@
+from collections.abc import Callable
+from concurrent.futures import Future
+from importlib.util import find_spec
+from typing import Any, TypeVar
+import shutil
+import subprocess
+import threading
+import time
+import unittest
+
+from data_classes import MediaPlaybackState, RepeatState, ShuffleState
+
+if find_spec("gi") is None:
+    raise unittest.SkipTest("PyGObject is not installed")
+
+if shutil.which("dbus-daemon") is None:
+    raise unittest.SkipTest("dbus-daemon is not installed")
+
+from gi.repository import Gio, GLib
+
+from audio_controller import BackendError, MprisBackend, UnsupportedError
+from audio_controller.mpris_backend import (
+    MPRIS_PATH,
+    MPRIS_PREFIX,
+    PLAYER_INTERFACE,
+    PLAYERCTLD_INTERFACE,
+    PLAYERCTLD_NAME,
+    PROPERTIES_INTERFACE,
+)
+
+T = TypeVar("T")
+
+PLAYER_XML: str = f"""
+<node>
+  <interface name="{PLAYER_INTERFACE}">
+    <method name="PlayPause"/>
+    <method name="Play"/>
+    <method name="Pause"/>
+    <method name="Next"/>
+    <method name="Previous"/>
+    <method name="SetPosition">
+      <arg name="TrackId" type="o" direction="in"/>
+      <arg name="Position" type="x" direction="in"/>
+    </method>
+    <signal name="Seeked"><arg name="Position" type="x"/></signal>
+    <property name="PlaybackStatus" type="s" access="read"/>
+    <property name="LoopStatus" type="s" access="readwrite"/>
+    <property name="Shuffle" type="b" access="readwrite"/>
+    <property name="Metadata" type="a{{sv}}" access="read"/>
+    <property name="Position" type="x" access="read"/>
+    <property name="Rate" type="d" access="read"/>
+    <property name="CanGoNext" type="b" access="read"/>
+    <property name="CanGoPrevious" type="b" access="read"/>
+    <property name="CanSeek" type="b" access="read"/>
+  </interface>
+</node>
+"""
+PLAYERCTLD_XML: str = f"""
+<node>
+  <interface name="{PLAYERCTLD_INTERFACE}">
+    <property name="PlayerNames" type="as" access="read"/>
+  </interface>
+</node>
+"""
+"Seconds to wait for the mock service or a signal before failing"
+WAIT: float = 5.0
+
+
+class MockBus:
+    """
+    A private dbus-daemon, with a thread that serves the mock objects on
+    their own main context
+    """
+
+    def __init__(self) -> None:
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--print-address", "--nofork", "--nopidfile"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        assert self.daemon.stdout is not None
+        self.address: str = self.daemon.stdout.readline().strip()
+        self.context = GLib.MainContext.new()
+        self.loop = GLib.MainLoop.new(self.context, False)
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        self.context.push_thread_default()
+        self.loop.run()
+        self.context.pop_thread_default()
+
+    def run(self, function: Callable[[], T]) -> T:
+        """Run the function on the thread of the mock objects and return its result"""
+        future: Future[T] = Future()
+
+        def call(*_: Any) -> bool:
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+
+            return GLib.SOURCE_REMOVE
+
+        source = GLib.idle_source_new()
+        source.set_callback(call)
+        source.attach(self.context)
+
+        return future.result(WAIT)
+
+    def connect(self, name: str) -> "Gio.DBusConnection":
+        """Open a connection that owns the name, on the thread of the mock objects"""
+        connection = Gio.DBusConnection.new_for_address_sync(
+            self.address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+            | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None,
+            None,
+        )
+        connection.call_sync(
+            "org.freedesktop.DBus",
+            "/org/freedesktop/DBus",
+            "org.freedesktop.DBus",
+            "RequestName",
+            GLib.Variant("(su)", (name, 0x4)),
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+        )
+
+        return connection
+
+    def close(self) -> None:
+        self.loop.quit()
+        self.thread.join(WAIT)
+        self.daemon.terminate()
+        self.daemon.communicate()
+
+
+class MockPlayerctld:
+    """Publishes the players in the order playerctld would, most recently started first"""
+
+    def __init__(self, bus: MockBus) -> None:
+        self.bus = bus
+        self.player_names: list[str] = []
+        self.connection = bus.run(self.register)
+
+    def register(self) -> "Gio.DBusConnection":
+        connection = self.bus.connect(PLAYERCTLD_NAME)
+        connection.register_object(
+            MPRIS_PATH,
+            Gio.DBusNodeInfo.new_for_xml(PLAYERCTLD_XML).interfaces[0],
+            None,
+            lambda *_: GLib.Variant("as", self.player_names),
+            None,
+        )
+
+        return connection
+
+    def promote(self, bus_name: str) -> None:
+        if bus_name in self.player_names:
+            self.player_names.remove(bus_name)
+
+        self.player_names.insert(0, bus_name)
+
+    @property
+    def active(self) -> str | None:
+        return self.bus.run(lambda: next(iter(self.player_names), None))
+
+
+class MockPlayer:
+    """An MPRIS player that only keeps its state, answering like a real one"""
+
+    def __init__(
+        self,
+        bus: MockBus,
+        name: str,
+        playerctld: MockPlayerctld | None = None,
+        **state: Any,
+    ) -> None:
+        self.bus = bus
+        self.bus_name: str = f"{MPRIS_PREFIX}{name}"
+        self.playerctld = playerctld
+        self.state: dict[str, Any] = {
+            "PlaybackStatus": "Paused",
+            "LoopStatus": "None",
+            "Shuffle": False,
+            "Position": 0,
+            "Rate": 1.0,
+            "CanGoNext": True,
+            "CanGoPrevious": True,
+            "CanSeek": True,
+            "track": 1,
+            **state,
+        }
+        self.connection = bus.run(self.register)
+
+        if playerctld is not None:
+            bus.run(lambda: playerctld.promote(self.bus_name))
+
+    def register(self) -> "Gio.DBusConnection":
+        connection = self.bus.connect(self.bus_name)
+        connection.register_object(
+            MPRIS_PATH,
+            Gio.DBusNodeInfo.new_for_xml(PLAYER_XML).interfaces[0],
+            self.method_call,
+            self.get_property,
+            self.set_property,
+        )
+
+        return connection
+
+    @property
+    def track_id(self) -> str:
+        return f"/org/mpris/MediaPlayer2/track/{self.state['track']}"
+
+    def variant(self, name: str) -> "GLib.Variant":
+        if name == "Metadata":
+            return GLib.Variant(
+                "a{sv}",
+                {
+                    "mpris:trackid": GLib.Variant("o", self.track_id),
+                    "mpris:length": GLib.Variant("x", 180_000_000),
+                    "xesam:title": GLib.Variant("s", f"Track {self.state['track']}"),
+                    "xesam:artist": GLib.Variant("as", ["Artist", "Guest"]),
+                    "xesam:album": GLib.Variant("s", "Album"),
+                },
+            )
+
+        signatures: dict[type, str] = {str: "s", bool: "b", int: "x", float: "d"}
+        value = self.state[name]
+
+        return GLib.Variant(signatures[type(value)], value)
+
+    def get_property(self, *args: Any) -> "GLib.Variant":
+        return self.variant(args[4])
+
+    def set_property(self, *args: Any) -> bool:
+        name, value = args[4], args[5]
+        self.change(**{name: value.unpack()})
+        return True
+
+    def method_call(self, *args: Any) -> None:
+        method, parameters, invocation = args[4], args[5], args[6]
+        status: str = self.state["PlaybackStatus"]
+
+        if method == "Next" and not self.state["CanGoNext"]:
+            invocation.return_dbus_error(
+                "org.freedesktop.DBus.Error.NotSupported", "Next is not supported"
+            )
+            return
+
+        if method == "PlayPause":
+            self.change(PlaybackStatus="Paused" if status == "Playing" else "Playing")
+        elif method in ("Play", "Pause"):
+            self.change(PlaybackStatus="Playing" if method == "Play" else "Paused")
+        elif method in ("Next", "Previous"):
+            step: int = 1 if method == "Next" else -1
+            self.change(track=self.state["track"] + step, Position=0)
+        elif method == "SetPosition":
+            track_id, position = parameters.unpack()
+
+            # Players ignore the call for a track that is no longer playing
+            if track_id == self.track_id:
+                self.state["Position"] = position
+                self.connection.emit_signal(
+                    None,
+                    MPRIS_PATH,
+                    PLAYER_INTERFACE,
+                    "Seeked",
+                    GLib.Variant("(x)", (position,)),
+                )
+
+        invocation.return_value(None)
+
+    def change(self, **changes: Any) -> None:
+        """Change the state, on the thread of the mock objects, and signal it"""
+        started: bool = (
+            changes.get("PlaybackStatus") == "Playing"
+            and self.state["PlaybackStatus"] != "Playing"
+        )
+        self.state.update(changes)
+
+        # Like playerctld, a player is promoted once it reports that it started
+        if started and self.playerctld is not None:
+            self.playerctld.promote(self.bus_name)
+
+        names: list[str] = [
+            "Metadata" if name == "track" else name
+            for name in changes
+            if name != "Position"
+        ]
+        self.connection.emit_signal(
+            None,
+            MPRIS_PATH,
+            PROPERTIES_INTERFACE,
+            "PropertiesChanged",
+            GLib.Variant(
+                "(sa{sv}as)",
+                (PLAYER_INTERFACE, {name: self.variant(name) for name in names}, []),
+            ),
+        )
+
+    def set(self, **changes: Any) -> None:
+        """Change the state from the test"""
+        self.bus.run(lambda: self.change(**changes))
+
+    def get(self, name: str) -> Any:
+        return self.bus.run(lambda: self.state[name])
+
+    def quit(self) -> None:
+        """Leave the bus, like a player that is closed"""
+        self.bus.run(lambda: self.connection.close_sync(None))
+
+
+class MprisBackendTest(unittest.TestCase):
+    """The backend against mock players on a private dbus-daemon"""
+
+    def setUp(self) -> None:
+        self.bus = MockBus()
+        self.addCleanup(self.bus.close)
+
+        backend: MprisBackend | None = MprisBackend.create(self.bus.address)
+        assert backend is not None
+        self.backend = backend
+        self.addCleanup(backend.connection.close_sync, None)
+
+    def test_no_player(self) -> None:
+        snapshot = self.backend.get_snapshot()
+
+        self.assertEqual(snapshot.status.playback_state, MediaPlaybackState.NO_PLAYER)
+        self.assertIsNone(snapshot.media)
+
+    def test_snapshot(self) -> None:
+        MockPlayer(
+            self.bus,
+            "vlc",
+            PlaybackStatus="Playing",
+            LoopStatus="Playlist",
+            Position=30_000_000,
+        )
+
+        snapshot = self.backend.get_snapshot()
+
+        self.assertEqual(snapshot.player, "vlc")
+        self.assertEqual(snapshot.status.playback_state, MediaPlaybackState.PLAYING)
+        self.assertEqual(snapshot.status.shuffle_state, ShuffleState.OFF)
+        self.assertEqual(snapshot.status.repeat_state, RepeatState.PLAYLIST)
+        assert snapshot.media is not None
+        self.assertEqual(snapshot.media.title, "Track 1")
+        self.assertEqual(snapshot.media.artists, ("Artist", "Guest"))
+        self.assertEqual(snapshot.media.artist, "Artist, Guest")
+        self.assertEqual(snapshot.media.album, "Album")
+        self.assertEqual(snapshot.media.player, "Vlc")
+        self.assertEqual(snapshot.media.position, 30_000_000)
+        self.assertEqual(snapshot.media.length, 180_000_000)
+        self.assertEqual(snapshot.media.trackid, "/org/mpris/MediaPlayer2/track/1")
+
+    def test_active_player_from_playerctld(self) -> None:
+        playerctld = MockPlayerctld(self.bus)
+        MockPlayer(self.bus, "vlc", playerctld)
+        MockPlayer(self.bus, "mpv", playerctld)
+
+        self.assertEqual(self.backend.get_snapshot().player, "mpv")
+        self.assertEqual(sorted(self.backend.get_media_players()), ["mpv", "vlc"])
+        self.assertEqual(sorted(self.backend.get_player_snapshots()), ["mpv", "vlc"])
+
+    def test_playpause(self) -> None:
+        player = MockPlayer(self.bus, "vlc")
+
+        self.backend.playpause()
+
+        self.assertEqual(player.get("PlaybackStatus"), "Playing")
+        self.assertEqual(
+            self.backend.get_snapshot().status.playback_state,
+            MediaPlaybackState.PLAYING,
+        )
+
+    def test_next(self) -> None:
+        player = MockPlayer(self.bus, "vlc", PlaybackStatus="Playing")
+
+        self.backend.next()
+
+        self.assertEqual(player.get("track"), 2)
+        media = self.backend.get_snapshot().media
+        assert media is not None
+        self.assertEqual(media.title, "Track 2")
+
+    def test_next_unsupported(self) -> None:
+        MockPlayer(self.bus, "vlc", CanGoNext=False)
+
+        with self.assertRaises(UnsupportedError):
+            self.backend.next()
+
+    def test_set_position(self) -> None:
+        player = MockPlayer(self.bus, "vlc", PlaybackStatus="Playing")
+
+        self.backend.set_position(player.track_id, 90_000_000)
+
+        self.assertEqual(player.get("Position"), 90_000_000)
+
+        with self.assertRaises(BackendError):
+            self.backend.set_position(None, 0)
+
+    def test_shuffle_and_repeat(self) -> None:
+        player = MockPlayer(self.bus, "vlc")
+
+        self.backend.shuffle(ShuffleState.OFF)
+        self.backend.repeat(RepeatState.TRACK)
+
+        self.assertTrue(player.get("Shuffle"))
+        self.assertEqual(player.get("LoopStatus"), "Track")
+
+    def test_change_player(self) -> None:
+        playerctld = MockPlayerctld(self.bus)
+        mpv = MockPlayer(self.bus, "mpv", playerctld)
+        vlc = MockPlayer(self.bus, "vlc", playerctld, PlaybackStatus="Playing")
+
+        snapshot = self.backend.change_player("mpv")
+
+        self.assertEqual(snapshot.player, "mpv")
+        self.assertEqual(snapshot.status.playback_state, MediaPlaybackState.PLAYING)
+        self.assertEqual(vlc.get("PlaybackStatus"), "Paused")
+        self.assertEqual(playerctld.active, mpv.bus_name)
+
+    def test_change_to_playing_player(self) -> None:
+        playerctld = MockPlayerctld(self.bus)
+        mpv = MockPlayer(self.bus, "mpv", playerctld, PlaybackStatus="Playing")
+        vlc = MockPlayer(self.bus, "vlc", playerctld, PlaybackStatus="Playing")
+
+        # Already playing, so only the restart gets it promoted
+        snapshot = self.backend.change_player("mpv")
+
+        self.assertEqual(snapshot.player, "mpv")
+        self.assertEqual(mpv.get("PlaybackStatus"), "Playing")
+        self.assertEqual(vlc.get("PlaybackStatus"), "Paused")
+        self.assertEqual(playerctld.active, mpv.bus_name)
+
+    def follow(
+        self, on_change: Callable[[], None]
+    ) -> tuple[threading.Thread, threading.Event]:
+        """Follow the players in a thread, stopped when the test ends"""
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self.backend.follow, args=(on_change, stop), daemon=True
+        )
+        thread.start()
+        self.addCleanup(thread.join, WAIT)
+        self.addCleanup(stop.set)
+
+        return thread, stop
+
+    def test_follow_properties_changed(self) -> None:
+        player = MockPlayer(self.bus, "vlc")
+        changed = threading.Event()
+        thread, stop = self.follow(changed.set)
+        deadline: float = time.monotonic() + WAIT
+
+        # Changes before the follower subscribed are missed, so keep changing
+        while not changed.wait(0.05) and time.monotonic() < deadline:
+            player.set(PlaybackStatus="Playing")
+
+        self.assertTrue(changed.is_set())
+
+        stop.set()
+        thread.join(WAIT)
+        self.assertFalse(thread.is_alive())
+
+    def test_follow_name_owner_changed(self) -> None:
+        player = MockPlayer(self.bus, "vlc")
+        changed = threading.Event()
+        thread, _ = self.follow(changed.set)
+        deadline: float = time.monotonic() + WAIT
+
+        while not changed.wait(0.05) and time.monotonic() < deadline:
+            player.set(PlaybackStatus="Playing")
+
+        # A player that goes away ends following, so that it is started again
+        player.quit()
+        thread.join(WAIT)
+
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
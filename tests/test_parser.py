@@ -0,0 +1,178 @@
+from random import Random
+import re
+import unittest
+
+from audio_controller.parser import Parser
+
+"Pieces the generated values are made of, weighted towards what breaks framing"
+PIECES: tuple[str, ...] = (
+    "a",
+    "Z",
+    "7",
+    " ",
+    "é",
+    "🎵",
+    ":",
+    "\\",
+    "\t",
+    "\r",
+    "\n",
+    "{{",
+    "}}",
+    "{{xesam:title}}",
+    "title:",
+    Parser.FIELD_SEPARATOR,
+    Parser.RECORD_SEPARATOR,
+)
+"The number of generated cases each property is checked with"
+CASES: int = 500
+
+
+class ParserPropertyTest(unittest.TestCase):
+    """Generated records, with hostile values, are split back into what was printed"""
+
+    def setUp(self) -> None:
+        # Seeded, so a failure can be reproduced
+        self.random = Random(0x1F1E)
+
+    def text(self, *forbidden: str) -> str:
+        """Generate a value, without any of the forbidden substrings"""
+        while True:
+            value: str = "".join(
+                self.random.choices(PIECES, k=self.random.randint(0, 12))
+            )
+
+            if not any(part in value for part in forbidden):
+                return value
+
+    def keys(self) -> tuple[str, ...]:
+        return tuple(f"key{index}" for index in range(self.random.randint(1, 8)))
+
+    def values(self, keys: tuple[str, ...], *forbidden: str) -> dict[str, str]:
+        """
+        Generate the values of a record. Only the last one may hold the field
+        separator, as the fields are told apart by it.
+        """
+        values: dict[str, str] = {
+            key: self.text(Parser.FIELD_SEPARATOR, *forbidden) for key in keys
+        }
+        values[keys[-1]] = self.text(*forbidden)
+
+        return values
+
+    @staticmethod
+    def render(keys: tuple[str, ...], values: dict[str, str]) -> str:
+        """Fill in the frame format like playerctl, in one pass"""
+        return re.sub(
+            r"\{\{(.+?)\}\}",
+            lambda match: values[match.group(1)],
+            Parser.frame_format(keys),
+        )
+
+    def test_frame_format(self) -> None:
+        for _ in range(CASES):
+            keys = self.keys()
+            values = self.values(keys)
+            output: str = self.render(keys, values) + self.random.choice(("", "\n"))
+
+            self.assertEqual(Parser.parse_frame(keys, output), values, repr(output))
+
+    def test_parse_frame(self) -> None:
+        for _ in range(CASES):
+            keys = self.keys()
+            values = self.values(keys)
+            output: str = (
+                Parser.FIELD_SEPARATOR.join(values.values())
+                + Parser.RECORD_SEPARATOR
+                + self.random.choice(("", "\n"))
+            )
+
+            self.assertEqual(Parser.parse_frame(keys, output), values, repr(output))
+
+    def test_parse_frame_without_record(self) -> None:
+        for _ in range(CASES):
+            keys = self.keys()
+            output: str = self.text(Parser.RECORD_SEPARATOR)
+
+            self.assertIsNone(Parser.parse_frame(keys, output), repr(output))
+
+    def test_parse_frames(self) -> None:
+        terminator: str = Parser.RECORD_SEPARATOR + "\n"
+
+        for _ in range(CASES):
+            keys = self.keys()
+            records: list[dict[str, str]] = []
+            output: str = ""
+
+            for _ in range(self.random.randint(0, 4)):
+                # Warnings of players that could not be read come on their own line
+                if self.random.random() < 0.3:
+                    output += "Could not read player\n"
+
+                values = self.values(keys, terminator)
+                values[keys[0]] = self.text("\n", Parser.FIELD_SEPARATOR, terminator)
+                records.append(values)
+                output += Parser.FIELD_SEPARATOR.join(values.values()) + terminator
+
+            if records and self.random.random() < 0.5:
+                output = output.removesuffix("\n")
+
+            self.assertEqual(Parser.parse_frames(keys, output), records, repr(output))
+
+    def test_split_frames(self) -> None:
+        terminator: bytes = (Parser.RECORD_SEPARATOR + "\n").encode()
+
+        for _ in range(CASES):
+            keys = self.keys()
+            records: list[bytes] = []
+            stream: bytes = b""
+
+            for _ in range(self.random.randint(0, 6)):
+                # playerctl prints an empty line when the player goes away
+                if self.random.random() < 0.2:
+                    records.append(b"")
+                    stream += b"\n"
+                    continue
+
+                values = self.values(keys, Parser.RECORD_SEPARATOR + "\n")
+                values[keys[0]] = self.text("\n", Parser.FIELD_SEPARATOR)
+                record: bytes = Parser.FIELD_SEPARATOR.join(values.values()).encode()
+
+                # Empty records are only told apart from the empty line by length
+                if not record:
+                    continue
+
+                records.append(record)
+                stream += record + terminator
+
+            split: list[bytes] = []
+            buffer: bytes = b""
+
+            # Read in chunks that may end anywhere, even within a character
+            while stream:
+                size: int = self.random.randint(1, 16)
+                found, buffer = Parser.split_frames(buffer + stream[:size])
+                split.extend(found)
+                stream = stream[size:]
+
+            self.assertEqual(split, records)
+            self.assertEqual(buffer, b"")
+
+    def test_split_frames_keeps_unfinished_record(self) -> None:
+        for _ in range(CASES):
+            keys = self.keys()
+            values = self.values(keys, Parser.RECORD_SEPARATOR + "\n")
+            values[keys[0]] = self.text("\n", Parser.FIELD_SEPARATOR)
+            record: bytes = Parser.FIELD_SEPARATOR.join(values.values()).encode()
+
+            if not record:
+                continue
+
+            records, rest = Parser.split_frames(record)
+
+            self.assertEqual(records, [])
+            self.assertEqual(rest, record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+from pathlib import Path
+from unittest import mock
+import tempfile
+import unittest
+
+from audio_controller.playback_history import PlaybackHistory
+from data_classes import CurrentMedia
+
+"Breaks the full-text index, as if SQLite was built without FTS5"
+NO_FTS5: str = "CREATE VIRTUAL TABLE history_search USING missing_fts5(title);"
+
+
+def media(title: str, artist: str = "", album: str = "") -> CurrentMedia:
+    return CurrentMedia(
+        thumbnail_path=f"file:///art/{title}.png",
+        artist=artist,
+        title=title,
+        player="spotify",
+        album=album or None,
+        position=None,
+    )
+
+
+class PlaybackHistoryTest(unittest.TestCase):
+    """The history in a temporary database, written by flushing by hand"""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.history = self.create(Path(directory.name, "history.sqlite3"))
+
+    def create(self, path: Path, max_entries: int = 100) -> PlaybackHistory:
+        history = PlaybackHistory(path, max_entries)
+        history.open()
+        self.addCleanup(history.close)
+
+        return history
+
+    def play(self, *tracks: CurrentMedia) -> None:
+        for track in tracks:
+            self.history.record(track)
+
+        self.history.flush()
+
+    def titles(self, text: str = "", limit: int = 10) -> list[str]:
+        return [entry.media.title for entry in self.history.search(text, limit)]
+
+    def test_recent_first(self) -> None:
+        self.play(media("One"), media("Two"), media("Three"))
+
+        self.assertEqual(self.titles(), ["Three", "Two", "One"])
+        self.assertEqual(self.titles(limit=2), ["Three", "Two"])
+
+    def test_entry(self) -> None:
+        self.play(media("Song", "Artist", "Album"))
+
+        (entry,) = self.history.search()
+
+        self.assertEqual(entry.media, media("Song", "Artist", "Album"))
+        self.assertLessEqual(entry.first_seen, entry.last_seen)
+
+    def test_seen_again_moves_to_newest(self) -> None:
+        self.play(media("One"), media("Two"))
+        (first,) = [
+            entry for entry in self.history.search() if entry.media.title == "One"
+        ]
+
+        self.play(media("One"))
+
+        self.assertEqual(self.titles(), ["One", "Two"])
+        entry, _ = self.history.search()
+        self.assertEqual(entry.first_seen, first.first_seen)
+        self.assertGreaterEqual(entry.last_seen, first.last_seen)
+
+    def test_same_track_on_another_player(self) -> None:
+        self.play(media("Song"), CurrentMedia("", "", "Song", "vlc", None, None))
+
+        self.assertEqual(
+            [entry.media.player for entry in self.history.search()], ["vlc", "spotify"]
+        )
+
+    def test_evicts_least_recently_seen(self) -> None:
+        self.history = self.create(self.history.path.with_name("small.sqlite3"), 3)
+
+        self.play(*(media(f"Track {number}") for number in range(5)))
+        self.play(media("Track 2"), media("Another"))
+
+        self.assertEqual(self.titles(), ["Another", "Track 2", "Track 4"])
+
+    def test_prefix_search(self) -> None:
+        self.play(
+            media("Bohemian Rhapsody", "Queen", "A Night at the Opera"),
+            media("Under Pressure", "Queen & David Bowie"),
+            media("Heroes", "David Bowie", '"Heroes"'),
+        )
+
+        self.assertEqual(self.titles("queen"), ["Under Pressure", "Bohemian Rhapsody"])
+        self.assertEqual(
+            self.titles("bo"), ["Heroes", "Under Pressure", "Bohemian Rhapsody"]
+        )
+        self.assertEqual(self.titles("q pr"), ["Under Pressure"])
+        self.assertEqual(self.titles("DAVID her"), ["Heroes"])
+        self.assertEqual(self.titles("opera"), ["Bohemian Rhapsody"])
+        # Only words are matched from their start
+        self.assertEqual(self.titles("ueen"), [])
+        # Quotes and operators are matched as typed
+        self.assertEqual(self.titles('"heroes'), ["Heroes"])
+        self.assertEqual(self.titles("rhapsody", limit=0), [])
+
+    def test_search_without_fts5(self) -> None:
+        with mock.patch.object(PlaybackHistory, "SEARCH_SCHEMA", NO_FTS5):
+            self.history = self.create(self.history.path.with_name("plain.sqlite3"))
+
+        self.play(
+            media("Bohemian Rhapsody", "Queen"),
+            media("Under Pressure", "Queen & David Bowie"),
+        )
+
+        self.assertEqual(self.titles("queen"), ["Under Pressure", "Bohemian Rhapsody"])
+        # Without the index the words are found anywhere
+        self.assertEqual(self.titles("ueen press"), ["Under Pressure"])
+        # Wildcards are matched as typed
+        self.assertEqual(self.titles("%"), [])
+        self.assertEqual(self.titles("_"), [])
+        self.assertEqual(self.titles("\\"), [])
+        self.assertEqual(self.titles(""), ["Under Pressure", "Bohemian Rhapsody"])
+
+    def test_kept_across_opening(self) -> None:
+        self.play(media("One"), media("Two"))
+        self.history.close()
+
+        self.history = self.create(self.history.path)
+
+        self.assertEqual(self.titles("tw"), ["Two"])
+
+    def test_unwritable(self) -> None:
+        with self.assertLogs("audio_controller.playback_history", "ERROR"):
+            self.history = self.create(Path("/proc/history/history.sqlite3"))
+            self.play(media("One"))
+
+            self.assertEqual(self.titles(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
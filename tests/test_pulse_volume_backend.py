@@ -0,0 +1,152 @@
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import mock
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+from audio_controller import AudioController, BackendError, PulseVolumeBackend
+
+if find_spec("pulsectl") is None:
+    raise unittest.SkipTest("pulsectl is not installed")
+
+if shutil.which("pulseaudio") is None:
+    raise unittest.SkipTest("pulseaudio is not installed")
+
+"Seconds to wait for the sound server to listen"
+WAIT: float = 5.0
+
+
+class PulseServer:
+    """A PulseAudio instance with a null sink only, in a directory of its own"""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.socket = Path(directory, "native")
+        self.address: str = f"unix:{self.socket}"
+        self.process: subprocess.Popen[bytes] | None = None
+
+    def start(self) -> None:
+        # Keeps the instance away from the state and sockets of the user
+        environment: dict[str, str] = {
+            **os.environ,
+            "HOME": str(self.directory),
+            "XDG_RUNTIME_DIR": str(self.directory),
+            "XDG_CONFIG_HOME": str(self.directory),
+            "PULSE_RUNTIME_PATH": str(self.directory),
+            "PULSE_STATE_PATH": str(self.directory),
+        }
+        self.process = subprocess.Popen(
+            [
+                "pulseaudio",
+                "-n",
+                "--daemonize=no",
+                "--use-pid-file=no",
+                "--exit-idle-time=-1",
+                "--load=module-null-sink sink_name=test",
+                f"--load=module-native-protocol-unix socket={self.socket}"
+                " auth-anonymous=1",
+            ],
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline: float = time.monotonic() + WAIT
+
+        while not self.socket.exists():
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise unittest.SkipTest("pulseaudio could not be started")
+
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+
+        self.socket.unlink(missing_ok=True)
+
+
+class PulseVolumeBackendTest(unittest.TestCase):
+    """The backend against a null sink of a PulseAudio instance"""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.server = PulseServer(Path(directory.name))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        backend: PulseVolumeBackend | None = PulseVolumeBackend.create(
+            self.server.address
+        )
+        assert backend is not None
+        self.backend = backend
+        self.addCleanup(backend.close)
+
+    def test_set_volume(self) -> None:
+        for level, expected in ((40, 40), (0, 0), (150, 100), (-5, 0)):
+            with self.subTest(level=level):
+                self.backend.set_volume(level)
+
+                self.assertEqual(self.backend.get_volume().level, expected)
+
+    def test_change_volume(self) -> None:
+        for level, delta, expected in (
+            (50, 5, 55),
+            (50, -5, 45),
+            (98, 5, 100),
+            (2, -5, 0),
+        ):
+            with self.subTest(level=level, delta=delta):
+                self.backend.set_volume(level)
+
+                self.assertEqual(self.backend.change_volume(delta).level, expected)
+                self.assertEqual(self.backend.get_volume().level, expected)
+
+    def test_mute(self) -> None:
+        self.backend.set_volume(40)
+
+        self.backend.set_mute(True)
+        volume = self.backend.get_volume()
+        self.assertTrue(volume.muted)
+        self.assertEqual(volume.level, 40)
+
+        self.backend.set_mute(False)
+        self.assertFalse(self.backend.get_volume().muted)
+
+    def test_toggle_mute_restores_level(self) -> None:
+        with mock.patch.object(AudioController, "volume_backend", self.backend):
+            with mock.patch.object(AudioController, "volume_before_mute", None):
+                self.backend.set_volume(60)
+
+                AudioController.toggle_mute()
+                self.assertTrue(self.backend.get_volume().muted)
+
+                # Turned all the way down while muted, unmuting brings it back
+                self.backend.set_volume(0)
+                AudioController.toggle_mute()
+
+                volume = self.backend.get_volume()
+                self.assertFalse(volume.muted)
+                self.assertEqual(volume.level, 60)
+
+    def test_reconnects_after_restart(self) -> None:
+        self.backend.get_volume()
+
+        self.server.stop()
+        with self.assertRaises(BackendError):
+            self.backend.get_volume()
+
+        self.server.start()
+        self.backend.set_volume(25)
+        self.assertEqual(self.backend.get_volume().level, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
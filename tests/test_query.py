@@ -0,0 +1,61 @@
+import unittest
+
+from data_classes import Query
+
+
+class SeekTargetTest(unittest.TestCase):
+    def test_seek_target(self) -> None:
+        # The typed time, the elapsed seconds and the second jumped to
+        cases: tuple[tuple[str, int | None, int | None], ...] = (
+            ("90", None, 90),
+            ("1:30", None, 90),
+            ("0:05", None, 5),
+            ("1:02:03", None, 3723),
+            ("01:00:00", 10, 3600),
+            ("+30", 100, 130),
+            ("-30", 100, 70),
+            ("-30", 10, 0),
+            ("+1:00", 5, 65),
+            ("-1:00:00", 4000, 400),
+            ("+30", None, None),
+            ("1:75", None, None),
+            ("1:60", None, None),
+            ("75:00", None, 4500),
+            ("1:2:3:4", None, None),
+            ("+", 10, None),
+            ("-", 10, None),
+            ("+-5", 10, None),
+            ("1:", None, None),
+            (":30", None, None),
+            ("1.5", None, None),
+            ("abc", None, None),
+        )
+
+        for typed, elapsed, expected in cases:
+            with self.subTest(typed=typed, elapsed=elapsed):
+                query = Query("jump", (typed,))
+
+                self.assertEqual(query.get_seek_target(elapsed), expected)
+
+    def test_no_time(self) -> None:
+        self.assertIsNone(Query("jump", ()).get_seek_target(30))
+
+
+class CountTest(unittest.TestCase):
+    def test_count(self) -> None:
+        cases: tuple[tuple[tuple[str, ...], int], ...] = (
+            ((), 1),
+            (("5",), 5),
+            (("0",), 1),
+            (("99",), 10),
+            (("-3",), 1),
+            (("x",), 1),
+        )
+
+        for components, expected in cases:
+            with self.subTest(components=components):
+                self.assertEqual(Query("next", components).get_count(10), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+from importlib.util import find_spec
+from typing import Any
+import unittest
+
+from data_classes import (
+    CurrentMedia,
+    MediaPlaybackState,
+    PlayerSnapshot,
+    PlayerStatus,
+    RepeatState,
+    ShuffleState,
+    VolumeState,
+)
+from instrumentation import PhaseSummary
+
+if find_spec("ulauncher") is None:
+    raise unittest.SkipTest("Ulauncher is not installed")
+
+from menu_builder import MenuBuilder, RenderCache, render_cache
+
+
+def describe(value: Any) -> Any:
+    """The attributes of a built item and of its actions, to compare them by value"""
+    if isinstance(value, (list, tuple)):
+        return [describe(element) for element in value]
+
+    if hasattr(value, "__dict__"):
+        return (
+            type(value).__name__,
+            {name: describe(field) for name, field in vars(value).items()},
+        )
+
+    return value
+
+
+class MemoizeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = RenderCache()
+        self.calls: list[tuple[str, int]] = []
+
+        @self.cache.memoize
+        def build(theme: str, count: int = 1) -> tuple[str, int]:
+            self.calls.append((theme, count))
+            return theme, count
+
+        self.build = build
+
+    def test_keyword_arguments(self) -> None:
+        self.assertEqual(self.build("dark", count=3), ("dark", 3))
+        self.assertEqual(self.build(theme="dark", count=3), ("dark", 3))
+
+    def test_calls_share_one_entry(self) -> None:
+        self.build("dark")
+        self.build("dark", 1)
+        self.build("dark", count=1)
+        self.build(theme="dark")
+
+        self.assertEqual(self.calls, [("dark", 1)])
+        self.assertEqual(self.cache.hits, 3)
+
+    def test_arguments_are_told_apart(self) -> None:
+        self.build("dark", 1)
+        self.build("dark", 2)
+        self.build("light", count=1)
+
+        self.assertEqual(self.calls, [("dark", 1), ("dark", 2), ("light", 1)])
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(TypeError):
+            self.build("dark", amount=1)
+
+
+class CachedPagesTest(unittest.TestCase):
+    """The pages are the same whether their items come from the cache or not"""
+
+    def setUp(self) -> None:
+        self.enabled: bool = render_cache.enabled
+        render_cache.clear()
+
+        playing = PlayerStatus(
+            playback_state=MediaPlaybackState.PLAYING,
+            shuffle_state=ShuffleState.ON,
+            repeat_state=RepeatState.PLAYLIST,
+        )
+        paused = PlayerStatus(
+            playback_state=MediaPlaybackState.PAUSED,
+            shuffle_state=ShuffleState.UNAVAILABLE,
+            repeat_state=RepeatState.UNAVAILABLE,
+        )
+        self.status: PlayerStatus = playing
+        self.media = CurrentMedia(
+            thumbnail_path="https://art.example/1",
+            artist="Artist",
+            title="Track",
+            player="spotify",
+            album="Album",
+            position=None,
+            length=240,
+        )
+        self.volume = VolumeState(level=40, muted=False)
+        self.snapshots: dict[str, PlayerSnapshot] = {
+            "spotify": PlayerSnapshot(status=playing, media=self.media),
+            "vlc": PlayerSnapshot(status=paused, media=None),
+        }
+
+    def tearDown(self) -> None:
+        render_cache.enabled = self.enabled
+        render_cache.clear()
+
+    def render(self) -> list[Any]:
+        pages: list[list[Any]] = [
+            MenuBuilder.build_main_page(
+                "dark",
+                self.status,
+                self.media,
+                "/tmp/art.png",
+                volume=self.volume,
+                elapsed=30,
+            ),
+            MenuBuilder.build_main_page(
+                "dark", self.status, self.media, "/tmp/art.png", keep_open=True
+            ),
+            MenuBuilder.build_player_select(
+                "dark", self.snapshots, {"spotify": "/tmp/art.png"}
+            ),
+            MenuBuilder.build_stats(
+                "dark",
+                [PhaseSummary(phase="menu", count=3, p50=0.001, p95=0.002)],
+                {"spawn": 4},
+                {"menu": 0.5},
+            ),
+        ]
+
+        return [describe(page) for page in pages]
+
+    def test_pages_match(self) -> None:
+        render_cache.enabled = True
+        built: list[Any] = self.render()
+        cached: list[Any] = self.render()
+
+        render_cache.enabled = False
+        uncached: list[Any] = self.render()
+
+        self.assertGreater(render_cache.hits, 0)
+        self.assertEqual(built, cached)
+        self.assertEqual(cached, uncached)
+
+
+if __name__ == "__main__":
+    unittest.main()
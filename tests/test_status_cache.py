@@ -0,0 +1,177 @@
+from collections.abc import Callable
+from unittest import mock
+import unittest
+
+from audio_controller import AudioController, PlayerBackend
+from audio_controller.circuit_breaker import CircuitBreaker
+from audio_controller.status_cache import StatusCache
+from data_classes import (
+    MediaPlaybackState,
+    PlayerSnapshot,
+    PlayerStatus,
+    RepeatState,
+    ShuffleState,
+)
+
+
+def snapshot(player: str) -> PlayerSnapshot:
+    return PlayerSnapshot(
+        status=PlayerStatus(
+            playback_state=MediaPlaybackState.PLAYING,
+            shuffle_state=ShuffleState.OFF,
+            repeat_state=RepeatState.OFF,
+        ),
+        media=None,
+        player=player,
+    )
+
+
+class FakeReader:
+    """Reads a new snapshot every call, counting the calls"""
+
+    def __init__(self) -> None:
+        self.reads: int = 0
+        # Called while reading, like an action sent from another thread
+        self.during_read: list[Callable[[], None]] = []
+
+    def __call__(self) -> PlayerSnapshot:
+        self.reads += 1
+
+        for action in self.during_read:
+            action()
+
+        return snapshot(f"read {self.reads}")
+
+
+class StatusCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now: float = 100.0
+        self.cache = StatusCache(ttl=0.5, clock=lambda: self.now)
+        self.read = FakeReader()
+
+    def test_reused_within_ttl(self) -> None:
+        first = self.cache.get(self.read)
+        self.now += 0.4
+
+        self.assertIs(self.cache.get(self.read), first)
+        self.assertEqual(self.read.reads, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_read_again_after_ttl(self) -> None:
+        self.cache.get(self.read)
+        self.now += 0.5
+
+        self.assertEqual(self.cache.get(self.read).player, "read 2")
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_disabled(self) -> None:
+        self.cache.ttl = 0
+
+        self.cache.get(self.read)
+        self.cache.get(self.read)
+
+        self.assertEqual(self.read.reads, 2)
+        self.assertEqual(self.cache.hit_rate, 0.0)
+
+    def test_invalidate(self) -> None:
+        self.cache.get(self.read)
+        generation: int = self.cache.generation
+
+        self.cache.invalidate()
+
+        self.assertEqual(self.cache.generation, generation + 1)
+        self.assertEqual(self.cache.get(self.read).player, "read 2")
+        self.assertEqual(self.cache.get(self.read).player, "read 2")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_action_during_read(self) -> None:
+        # The read may have started before the action took effect
+        self.read.during_read.append(self.cache.invalidate)
+        self.cache.get(self.read)
+        self.read.during_read.clear()
+
+        self.assertEqual(self.cache.get(self.read).player, "read 2")
+        self.assertEqual(self.read.reads, 2)
+
+    def test_update(self) -> None:
+        self.cache.get(self.read)
+        generation: int = self.cache.generation
+
+        self.cache.update(snapshot("changed"))
+
+        self.assertEqual(self.cache.generation, generation + 1)
+        self.assertEqual(self.cache.get(self.read).player, "changed")
+        self.assertEqual(self.read.reads, 1)
+
+    def test_peek(self) -> None:
+        self.assertIsNone(self.cache.peek())
+        self.assertEqual(self.cache.misses, 0)
+
+        first = self.cache.get(self.read)
+
+        self.assertIs(self.cache.peek(), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_hit_rate(self) -> None:
+        self.assertEqual(self.cache.hit_rate, 0.0)
+
+        for _ in range(4):
+            self.cache.get(self.read)
+
+        self.assertEqual(self.cache.hit_rate, 0.75)
+
+
+class ActionInvalidatesTest(unittest.TestCase):
+    """Every action on the player makes the next read a fresh one"""
+
+    def setUp(self) -> None:
+        self.now: float = 100.0
+        self.cache = StatusCache(ttl=60, clock=lambda: self.now)
+        self.read = FakeReader()
+        backend = mock.create_autospec(PlayerBackend, instance=True)
+        backend.change_player.return_value = snapshot("changed")
+
+        for patch in (
+            mock.patch.object(AudioController, "backend", backend),
+            mock.patch.object(AudioController, "follower", None),
+            mock.patch.object(AudioController, "status_cache", self.cache),
+            mock.patch.object(AudioController, "breaker", CircuitBreaker()),
+            mock.patch.object(AudioController, "media_players", (0.0, [])),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_actions(self) -> None:
+        status: PlayerStatus = snapshot("").status
+        actions = {
+            "playpause": AudioController.playpause,
+            "next": AudioController.next,
+            "prev": lambda: AudioController.prev(3),
+            "set_position": lambda: AudioController.set_position("/track/1", 0),
+            "shuffle": lambda: AudioController.shuffle(status),
+            "repeat": lambda: AudioController.repeat(status),
+        }
+
+        for name, action in actions.items():
+            with self.subTest(action=name):
+                self.cache.get(self.read)
+                reads: int = self.read.reads
+                generation: int = self.cache.generation
+
+                action()
+
+                self.assertGreater(self.cache.generation, generation)
+                self.cache.get(self.read)
+                self.assertEqual(self.read.reads, reads + 1)
+
+    def test_change_player(self) -> None:
+        self.cache.get(self.read)
+
+        AudioController.change_player("vlc")
+
+        self.assertEqual(self.cache.get(self.read).player, "changed")
+        self.assertEqual(self.read.reads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()